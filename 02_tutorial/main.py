@@ -9,8 +9,11 @@ OutGameメニューから開始し、SAVEスロットを選択してゲームを
 
 Usage:
     python main.py
+    python main.py --server --port 7777   # 多人数用ゲームサーバー
+    python main.py --profile-startup --stage step_09   # 起動時間の内訳
 """
 
+import argparse
 import sys
 from pathlib import Path
 
@@ -19,7 +22,6 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from src.outgame.menu import OutGameMenu
 from src.outgame.save_manager import SlotName
-from src.ingame.runner import run_game
 
 
 def on_play(slot: SlotName, slot_path: Path) -> None:
@@ -27,12 +29,165 @@ def on_play(slot: SlotName, slot_path: Path) -> None:
     ゲーム開始時のコールバック
 
     SAVEディレクトリ内のingame/game.pyを実行します。
+    ランナーはメニューの表示後に使うので、ここで読み込みます。
     """
+    from src.ingame.runner import run_game
+
     run_game(slot_path)
 
 
+# ============================================
+# 起動時間の計測（--profile-startup）
+# ============================================
+
+# 起動時間の予算（ミリ秒）。超えていれば --profile-startup が終了コード1を返す
+# tests/test_core/test_startup_budget.py でも確認する
+STARTUP_BUDGET_MS = {"menu": 150, "game": 300}
+
+# 計測する処理（子プロセスで python -X importtime -c として実行する）
+# "# start" を出力した後のインポートと経過時間だけを数え、最後に経過時間と sys.modules をJSONで出力する
+_PROFILE_CODE = {
+    "menu": """
+import json, sys, time
+sys.path.insert(0, {root!r})
+print("# start", file=sys.stderr)
+start = time.perf_counter()
+from src.outgame.menu import OutGameMenu
+OutGameMenu()
+elapsed_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{"elapsed_ms": elapsed_ms, "modules": sorted(sys.modules)}}))
+""",
+    "game": """
+import json, sys, tempfile, time
+from pathlib import Path
+sys.path.insert(0, {root!r})
+from src.outgame.save_manager import SaveManager
+saves = tempfile.mkdtemp()
+manager = SaveManager(Path({root!r}), saves_path=Path(saves))
+manager.setup("PROFILE", {stage!r})
+print("# start", file=sys.stderr)
+start = time.perf_counter()
+from src.ingame.runner import load_game_module
+load_game_module(manager.get_slot_path("PROFILE"))
+elapsed_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{"elapsed_ms": elapsed_ms, "modules": sorted(sys.modules)}}))
+import shutil
+shutil.rmtree(saves, ignore_errors=True)
+""",
+}
+
+
+def measure_startup(stage: str) -> dict[str, dict]:
+    """
+    メニューの起動とゲームのロードを子プロセスで -X importtime 付きで計測する
+
+    Args:
+        stage: ゲームのロードを計測するStage ID
+
+    Returns:
+        フェーズ名 → {"elapsed_ms": 経過時間,
+                      "imports": [(self [us], cumulative [us], モジュール名), ...],
+                      "modules": 計測後の sys.modules のモジュール名}
+
+    Raises:
+        RuntimeError: 子プロセスが失敗した
+    """
+    import json
+    import subprocess
+
+    root = str(Path(__file__).parent)
+    results = {}
+
+    for phase, code in _PROFILE_CODE.items():
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code.format(root=root, stage=stage)],
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"[{phase}] failed:\n{result.stderr}")
+
+        # "import time: self [us] | cumulative | imported package" の行を集める
+        _, _, measured = result.stderr.partition("# start\n")
+        imports = []
+        for line in measured.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            imports.append((int(self_us), int(cumulative_us), name.rstrip()))
+
+        report = json.loads(result.stdout.splitlines()[-1])
+        results[phase] = {
+            "elapsed_ms": report["elapsed_ms"],
+            "imports": imports,
+            "modules": set(report["modules"]),
+        }
+
+    return results
+
+
+def profile_startup(stage: str, top: int = 15) -> bool:
+    """
+    メニューの起動とゲームのロードにかかる時間の内訳を表示する
+
+    Args:
+        stage: ゲームのロードを計測するStage ID
+        top: 表示するモジュール数
+
+    Returns:
+        すべて予算内ならTrue
+    """
+    try:
+        results = measure_startup(stage)
+    except RuntimeError as e:
+        print(e)
+        return False
+
+    within_budget = True
+    for phase, measured in results.items():
+        elapsed_ms = measured["elapsed_ms"]
+        rows = measured["imports"]
+        budget_ms = STARTUP_BUDGET_MS[phase]
+        status = "OK" if elapsed_ms <= budget_ms else "OVER BUDGET"
+        within_budget = within_budget and elapsed_ms <= budget_ms
+
+        label = f"{phase} ({stage})" if phase == "game" else phase
+        print(f"=== {label}: {elapsed_ms:.1f} ms / budget {budget_ms} ms [{status}] ===")
+        print(f"  {len(rows)} modules imported, {sum(r[0] for r in rows) / 1000:.1f} ms in imports")
+        print(f"  {'self [us]':>10} | {'cumulative':>10} | imported package")
+        for self_us, cumulative_us, name in sorted(rows, key=lambda r: r[0], reverse=True)[:top]:
+            print(f"  {self_us:>10} | {cumulative_us:>10} | {name}")
+        print()
+
+    return within_budget
+
+
 def main() -> None:
     """メインエントリーポイント"""
+    parser = argparse.ArgumentParser(description="AI × Game Development Tutorial")
+    parser.add_argument("--server", action="store_true", help="run multi-session game server")
+    parser.add_argument("--host", default="127.0.0.1", help="server host")
+    parser.add_argument("--port", type=int, default=7777, help="server port")
+    parser.add_argument("--stage", default=None, help="server: stage for new slots")
+    parser.add_argument(
+        "--profile-startup", action="store_true",
+        help="show import-time breakdown of startup and exit (1 if over budget)",
+    )
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        sys.exit(0 if profile_startup(args.stage or "step_09") else 1)
+
+    if args.server:
+        import asyncio
+        from src.server import serve
+
+        try:
+            asyncio.run(serve(args.host, args.port, default_stage=args.stage))
+        except KeyboardInterrupt:
+            print("\nServer stopped.")
+        return
+
     print()
     print("Starting AI × Game Development Tutorial...")
     print()
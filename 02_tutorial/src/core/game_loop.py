@@ -3,9 +3,13 @@
 
 ターン制のゲームループを提供します。
 1入力 = 1更新 = 1描画 のサイクルを繰り返します。
+
+run_game_loop_async は asyncio 版で、入力待ちの間も
+一定間隔でAIティックを進めることができます。
+asyncio は読み込みに時間がかかるので、async 版を使う時だけインポートします。
 """
 
-from typing import Callable, TypeVar
+from typing import Awaitable, Callable, TypeVar
 
 # 汎用的なState型
 T = TypeVar("T")
@@ -117,3 +121,95 @@ def run_game_loop_with_logging(
 
     log(f"[GAME] Ended after {turn} turns. Final state: {state}")
     return state
+
+
+async def _resolve(value: T | Awaitable[T]) -> T:
+    """コルーチンならawaitし、そうでなければそのまま返す"""
+    import inspect
+
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+async def run_game_loop_async(
+    initial_state: T,
+    get_input: Callable[[], Awaitable[str]],
+    update: Callable[[T, str], T | Awaitable[T]],
+    render: Callable[[T], str],
+    output: Callable[[str], None],
+    tick: Callable[[T], T | Awaitable[T]] | None = None,
+    tick_interval: float = 1.0,
+    quit_commands: tuple[str, ...] = ("quit", "exit", "q"),
+) -> T:
+    """
+    非同期ゲームループを実行する。
+
+    入力待ちはタスクとして走らせたまま、tick_interval秒ごとに
+    tick（敵AIなど）を実行します。入力とティックは同じループ内で
+    順番に適用されるため、状態の更新が競合することはありません。
+
+    Args:
+        initial_state: ゲームの初期状態
+        get_input: 入力を取得するコルーチン関数
+        update: 状態を更新する関数（コルーチンでも可）
+        render: 状態を文字列に変換する関数（副作用なし）
+        output: 文字列を出力する関数
+        tick: 一定間隔で呼ばれる状態更新関数（コルーチンでも可、Noneなら無効）
+        tick_interval: ティック間隔（秒）
+        quit_commands: ループ終了コマンド
+
+    Returns:
+        最終的なゲーム状態
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    state = initial_state
+
+    output(render(state))
+
+    input_task: asyncio.Task[str] | None = None
+    next_tick = loop.time() + tick_interval
+
+    try:
+        while True:
+            if input_task is None:
+                input_task = asyncio.ensure_future(get_input())
+
+            timeout = None
+            if tick is not None:
+                timeout = max(0.0, next_tick - loop.time())
+
+            done, _ = await asyncio.wait({input_task}, timeout=timeout)
+
+            # 1. 入力が来ていれば処理
+            if input_task in done:
+                cmd = input_task.result()
+                input_task = None
+
+                # 空入力は無視
+                if not cmd.strip():
+                    continue
+
+                # 終了コマンドチェック
+                if cmd.lower() in quit_commands:
+                    break
+
+                state = await _resolve(update(state, cmd))
+                output(render(state))
+
+            # 2. ティックの時刻になっていればAIを進める
+            if tick is not None and loop.time() >= next_tick:
+                state = await _resolve(tick(state))
+                output(render(state))
+
+                # 固定スケジュール（大きく遅れた場合は追いつこうとせず仕切り直す）
+                next_tick += tick_interval
+                if next_tick < loop.time():
+                    next_tick = loop.time() + tick_interval
+    finally:
+        if input_task is not None and not input_task.done():
+            input_task.cancel()
+
+    return state
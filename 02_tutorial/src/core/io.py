@@ -8,7 +8,10 @@ print, input などの副作用を持つ操作はここにのみ存在します
 
 import os
 import sys
-from typing import Callable, Iterator
+from pathlib import Path
+from typing import Awaitable, Callable, Iterator
+
+from src.core.log_writer import get_log_writer
 
 
 # ============================================
@@ -89,6 +92,90 @@ def create_interactive_input(
     return interactive_input
 
 
+async def _read_stdin_line() -> str:
+    """
+    標準入力から1行を読む（イベントループをブロックしない）
+
+    POSIXではファイルディスクリプタの読み込み可能通知を使い、
+    使えない環境（Windows等）ではスレッドで読み込みます。
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    try:
+        fd = sys.stdin.fileno()
+        future: asyncio.Future[str] = loop.create_future()
+
+        def on_readable() -> None:
+            loop.remove_reader(fd)
+            if not future.done():
+                future.set_result(sys.stdin.readline())
+
+        loop.add_reader(fd, on_readable)
+    except (NotImplementedError, ValueError, OSError, AttributeError):
+        return await loop.run_in_executor(None, sys.stdin.readline)
+
+    try:
+        return await future
+    finally:
+        loop.remove_reader(fd)
+
+
+def create_async_input(prompt: str = "> ") -> Callable[[], Awaitable[str]]:
+    """
+    ノンブロッキングの入力コルーチン関数を作成する
+
+    run_game_loop_async と組み合わせて使います。
+    入力待ちの間もイベントループ上の他の処理（AIティック等）が進みます。
+
+    Args:
+        prompt: 入力プロンプト
+
+    Returns:
+        入力コルーチン関数（前後の空白を除去した文字列を返す）
+    """
+
+    async def async_input() -> str:
+        print(prompt, end="", flush=True)
+        try:
+            line = await _read_stdin_line()
+        except KeyboardInterrupt:
+            print()  # 改行
+            return "quit"
+        # 空文字列はEOF
+        if not line:
+            return "quit"
+        return line.strip()
+
+    return async_input
+
+
+def create_async_mock_input(
+    commands: list[str],
+    delay: float = 0.0,
+) -> Callable[[], Awaitable[str]]:
+    """
+    テスト用の非同期モック入力関数を作成する
+
+    Args:
+        commands: 順番に返すコマンドのリスト
+        delay: 各コマンドを返すまでの待ち時間（秒）
+
+    Returns:
+        非同期モック入力関数
+    """
+    mock_input = create_mock_input(commands)
+
+    async def async_mock_input() -> str:
+        import asyncio
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return mock_input()
+
+    return async_mock_input
+
+
 # ============================================
 # 出力関数
 # ============================================
@@ -136,6 +223,36 @@ def create_mock_output() -> tuple[Callable[[str], None], list[str]]:
     return mock_output, captured
 
 
+class OutputSink:
+    """
+    止められる出力先
+
+    update関数ごとに1つ持たせ、ジャーナルの再実行中など表示したくない間だけ
+    muted にする（出力関数そのものを差し替えないので、他のセッションに影響しない）。
+
+    Example:
+        >>> mock_out, captured = create_mock_output()
+        >>> sink = OutputSink(mock_out)
+        >>> sink("shown")
+        >>> sink.muted = True
+        >>> sink("hidden")
+        >>> captured
+        ['shown']
+    """
+
+    def __init__(self, write: Callable[[str], None]) -> None:
+        """
+        Args:
+            write: 実際に表示する出力関数
+        """
+        self.write = write
+        self.muted = False
+
+    def __call__(self, text: str) -> None:
+        if not self.muted:
+            self.write(text)
+
+
 # ============================================
 # 画面制御
 # ============================================
@@ -184,6 +301,8 @@ def show_cursor() -> None:
 def create_logger(
     prefix: str = "[LOG]",
     enabled: bool = True,
+    path: Path | None = None,
+    json_lines: bool = False,
 ) -> Callable[[str], None]:
     """
     ロガー関数を作成する
@@ -191,10 +310,20 @@ def create_logger(
     Args:
         prefix: ログメッセージの接頭辞
         enabled: ログ出力を有効にするかどうか
+        path: 指定するとstderrではなくこのファイルへバッファ付きで書く
+        json_lines: ファイル出力時にJSON Lines形式で書くかどうか
 
     Returns:
         ロガー関数
     """
+    if path is not None:
+        writer = get_log_writer(path, json_lines=json_lines)
+
+        def file_log(message: str) -> None:
+            if enabled:
+                writer.write(f"{prefix} {message}")
+
+        return file_log
 
     def log(message: str) -> None:
         if enabled:
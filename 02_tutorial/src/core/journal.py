@@ -0,0 +1,123 @@
+"""
+コマンドのジャーナル（先行書き込みログ）
+
+プレイヤーが入力したコマンドを、ゲームに適用する前に journal.log へ
+1行ずつ追記します。各コマンドには通し番号（seq）が付き、セーブ
+（savelog）には「どの番号のコマンドまで反映した状態か」が記録されます。
+
+ゲームが途中で落ちても、次の起動時に「最後のセーブより後のコマンド」を
+ジャーナルから読み出してもう一度実行すれば、落ちる直前の状態に戻せます。
+そのため毎ターン保存しなくても進行が失われません。
+
+ファイル形式（1行1レコードのJSON）:
+    {"seq": 12, "cmd": "w"}
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import TextIO
+
+from src.core.safe_io import atomic_write_bytes
+
+
+JOURNAL_FILE = "journal.log"
+
+
+def read_journal(slot_path: Path) -> list[tuple[int, str]]:
+    """
+    ジャーナルのコマンドを順番に読む
+
+    書き込み途中でクラッシュした最後の行は無視します。
+
+    Args:
+        slot_path: SAVEディレクトリのパス
+
+    Returns:
+        (seq, コマンド) のリスト
+    """
+    path = Path(slot_path) / JOURNAL_FILE
+    if not path.exists():
+        return []
+
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            entries.append((record["seq"], record["cmd"]))
+    return entries
+
+
+class CommandJournal:
+    """
+    スロット1つ分のジャーナルライター
+
+    ファイルは開いたままにし、fsync は fsync_every 件ごとにまとめて行います
+    （プロセスが落ちるだけならflush済みの行は失われません）。
+    """
+
+    def __init__(self, slot_path: Path, fsync_every: int = 16, start_seq: int = 0) -> None:
+        """
+        Args:
+            slot_path: SAVEディレクトリのパス
+            fsync_every: 何件ごとにfsyncするか
+            start_seq: セーブ済みの最後の番号（ジャーナルが空の時の続き番号）
+        """
+        self.path = Path(slot_path) / JOURNAL_FILE
+        self.fsync_every = fsync_every
+
+        entries = read_journal(slot_path)
+        last = entries[-1][0] if entries else 0
+        # 実行中（または最後に実行した）コマンドの番号
+        self.current_seq = max(last, start_seq)
+        self.entry_count = len(entries)
+
+        self._file: TextIO | None = None
+        self._unsynced = 0
+
+    def record(self, cmd: str) -> int:
+        """
+        コマンドを適用する前に記録する
+
+        Returns:
+            このコマンドの番号
+        """
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+
+        self.current_seq += 1
+        line = json.dumps({"seq": self.current_seq, "cmd": cmd}, ensure_ascii=False)
+        self._file.write(line + "\n")
+        self._file.flush()
+        self.entry_count += 1
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self.sync()
+        return self.current_seq
+
+    def sync(self) -> None:
+        """未fsyncの書き込みをディスクに確定させる"""
+        if self._file is not None and self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def reset(self) -> None:
+        """
+        ジャーナルを空にする
+
+        現在のコマンドまでを反映した状態がディスクに確定した後に呼びます。
+        """
+        self.close()
+        atomic_write_bytes(self.path, b"")
+        self.entry_count = 0
+
+    def close(self) -> None:
+        """確定して閉じる"""
+        self.sync()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,258 @@
+"""
+バッファ付きログライター
+
+log.txt への書き込みを1行ごとに open/close せず、メモリに溜めて
+まとめて書き出します。
+
+- 1ファイルにつき1つだけハンドルを開いたまま使う（get_log_writer）
+- 共有のバックグラウンドスレッドが0.5秒ごとにまとめて書き出す
+- max_bytes を超えたら log.txt.1, log.txt.2 ... にローテーション
+- json_lines=True なら1行1レコードのJSON形式で書く
+
+Usage（1行ごとにopen/closeする方式との比較ベンチマーク）:
+    python -m src.core.log_writer --events 10000
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, TextIO
+
+
+class BufferedLogWriter:
+    """1ファイル分のバッファ付きログライター"""
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int = 1_000_000,
+        backup_count: int = 3,
+        json_lines: bool = False,
+        max_buffered: int = 1000,
+    ) -> None:
+        """
+        Args:
+            path: ログファイルのパス
+            max_bytes: これを超えたらローテーション（0なら無効）
+            backup_count: 残す古いログの数
+            json_lines: TrueならJSON Lines形式で書く
+            max_buffered: バッファがこの行数に達したら即座に書き出す
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.json_lines = json_lines
+        self.max_buffered = max_buffered
+
+        self._lock = threading.Lock()
+        self._buffer: list[str] = []
+        self._file: TextIO | None = None
+        self._size = 0
+
+        # タイムスタンプ文字列は秒が変わった時だけ作り直す
+        self._ts_second = -1
+        self._ts_text = ""
+
+        _flusher.register(self)
+
+    def _timestamp(self) -> str:
+        now = int(time.time())
+        if now != self._ts_second:
+            self._ts_second = now
+            self._ts_text = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        return self._ts_text
+
+    def write(self, message: str, **fields: Any) -> None:
+        """
+        ログを1件追加する（ディスクへの書き込みは後でまとめて行う）
+
+        Args:
+            message: ログメッセージ
+            **fields: JSON Lines形式の時に追加する項目
+        """
+        with self._lock:
+            timestamp = self._timestamp()
+            if self.json_lines:
+                record = {"ts": timestamp, "msg": message, **fields}
+                line = json.dumps(record, ensure_ascii=False) + "\n"
+            else:
+                line = f"[{timestamp}] {message}\n"
+            self._buffer.append(line)
+            if len(self._buffer) >= self.max_buffered:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """バッファをファイルに書き出す"""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        """書き出してファイルを閉じる"""
+        with self._lock:
+            self._flush_locked()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        _flusher.unregister(self)
+
+    def _open(self) -> TextIO:
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+            self._size = self._file.tell()
+        return self._file
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        data = "".join(self._buffer)
+        self._buffer.clear()
+        size = len(data.encode("utf-8"))
+
+        f = self._open()
+        # 書くと上限を超える場合は先にローテーション（log.txt は常に最新を持つ）
+        if self.max_bytes and self._size > 0 and self._size + size > self.max_bytes:
+            self._rotate()
+            f = self._open()
+
+        f.write(data)
+        f.flush()
+        self._size += size
+
+    def _rotate(self) -> None:
+        """log.txt → log.txt.1 → log.txt.2 ... とずらす"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                src = self.path.with_name(f"{self.path.name}.{index}")
+                if src.exists():
+                    os.replace(src, self.path.with_name(f"{self.path.name}.{index + 1}"))
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink(missing_ok=True)
+        self._size = 0
+
+
+class _BackgroundFlusher:
+    """全ライターを定期的に書き出す共有スレッド"""
+
+    def __init__(self, interval: float = 0.5) -> None:
+        self.interval = interval
+        self._writers: "weakref.WeakSet[BufferedLogWriter]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def register(self, writer: BufferedLogWriter) -> None:
+        with self._lock:
+            self._writers.add(writer)
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="log-flusher", daemon=True)
+                self._thread.start()
+
+    def unregister(self, writer: BufferedLogWriter) -> None:
+        with self._lock:
+            self._writers.discard(writer)
+
+    def flush_all(self) -> None:
+        with self._lock:
+            writers = list(self._writers)
+        for writer in writers:
+            writer.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush_all()
+
+
+_flusher = _BackgroundFlusher()
+atexit.register(_flusher.flush_all)
+
+
+# ============================================
+# ファイルごとのライター管理
+# ============================================
+
+_writers: dict[Path, BufferedLogWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_log_writer(path: Path, **options: Any) -> BufferedLogWriter:
+    """
+    ファイルのログライターを取得する（同じファイルには同じライターを返す）
+
+    Args:
+        path: ログファイルのパス
+        **options: 初回作成時に BufferedLogWriter に渡すオプション
+
+    Returns:
+        BufferedLogWriter
+    """
+    path = Path(path).resolve()
+    with _writers_lock:
+        writer = _writers.get(path)
+        if writer is None:
+            writer = _writers[path] = BufferedLogWriter(path, **options)
+        return writer
+
+
+def close_log_writer(path: Path) -> None:
+    """ファイルのログライターを閉じる（開いていなければ何もしない）"""
+    with _writers_lock:
+        writer = _writers.pop(Path(path).resolve(), None)
+    if writer is not None:
+        writer.close()
+
+
+# ============================================
+# ベンチマーク
+# ============================================
+
+
+def benchmark(events: int = 10_000) -> dict[str, float]:
+    """
+    1行ごとにopen/closeする方式とバッファ方式の時間を比較する
+
+    Returns:
+        各方式の所要時間（秒）
+    """
+    import tempfile
+    from datetime import datetime
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        naive_path = Path(tmpdir) / "naive.txt"
+        start = time.perf_counter()
+        for i in range(events):
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            with open(naive_path, "a", encoding="utf-8") as f:
+                f.write(f"[{timestamp}] event {i}\n")
+        naive = time.perf_counter() - start
+
+        writer = BufferedLogWriter(Path(tmpdir) / "buffered.txt")
+        start = time.perf_counter()
+        for i in range(events):
+            writer.write(f"event {i}")
+        writer.close()
+        buffered = time.perf_counter() - start
+
+    return {"events": events, "open_close": naive, "buffered": buffered}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Log writer benchmark")
+    parser.add_argument("--events", type=int, default=10_000)
+    args = parser.parse_args()
+
+    result = benchmark(args.events)
+    print(f"Events: {result['events']}")
+    print(f"open/close per line: {result['open_close'] * 1000:.1f} ms")
+    print(f"buffered writer:     {result['buffered'] * 1000:.1f} ms")
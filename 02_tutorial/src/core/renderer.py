@@ -8,7 +8,7 @@ render(state) -> str  # これだけ！
 """
 
 from dataclasses import dataclass, field
-from typing import Callable, TYPE_CHECKING
+from typing import Callable, Iterable, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from src.core.state import GameState, Entity
@@ -147,6 +147,180 @@ def add_border(grid: TextGrid, char: str = "#") -> TextGrid:
     return new_grid
 
 
+# 動かないエンティティ（静的レイヤーに描画される）
+STATIC_ENTITY_IDS: tuple[str, ...] = ("wall", "obstacle")
+
+
+class LayeredRenderer:
+    """
+    レイヤー分割されたキャッシュ付きマップレンダラー
+
+    マップを次のレイヤーに分けて描画します。
+    - 静的レイヤー: 壁・障害物（ほとんど動かないのでキャッシュ）
+    - 動的レイヤー: 敵・アイテムなど動くエンティティ
+    - オーバーレイ: A*経路の * マーカーなど（毎回上書き）
+    - プレイヤー: 常に最前面
+
+    各レイヤーは独立して無効化されるため、
+    1ターンあたりのコストは「変化した部分」に比例します。
+    キャッシュは内部のメモ化だけで、出力は副作用なしの
+    render(state) と同じく入力のみで決まります。
+    """
+
+    def __init__(
+        self,
+        char_mapping: dict[str, str],
+        fill: str = ".",
+        border: str = "#",
+        player_char: str = "@",
+        static_ids: tuple[str, ...] = STATIC_ENTITY_IDS,
+    ) -> None:
+        """
+        Args:
+            char_mapping: エンティティID→描画文字のマッピング
+            fill: 床の文字
+            border: 枠線の文字
+            player_char: プレイヤーの描画文字
+            static_ids: 静的レイヤーに描画するエンティティID
+        """
+        self.char_mapping = dict(char_mapping)
+        self.fill = fill
+        self.border = border
+        self.player_char = player_char
+        self.static_ids = frozenset(static_ids)
+
+        # 各レイヤーの再構築回数（キャッシュの効き具合の確認用）
+        self.rebuild_counts: dict[str, int] = {"static": 0, "dynamic": 0}
+
+        self._entities_ref: tuple["Entity", ...] | None = None
+        self._static_cells: tuple[tuple[int, int, str], ...] = ()
+        self._dynamic_cells: tuple[tuple[int, int, str], ...] = ()
+
+        self._static_key: tuple | None = None
+        self._static_rows: list[str] = []
+        self._dynamic_key: tuple | None = None
+        self._dynamic_rows: list[str] = []
+
+    def invalidate(self, layer: str | None = None) -> None:
+        """
+        キャッシュを無効化する
+
+        Args:
+            layer: "static" / "dynamic"（Noneなら全レイヤー）
+        """
+        if layer in (None, "static"):
+            self._static_key = None
+            self._entities_ref = None
+        if layer in (None, "static", "dynamic"):
+            # 動的レイヤーは静的レイヤーの上に構築されるので一緒に無効化
+            self._dynamic_key = None
+
+    def _char_for(self, entity_id: str) -> str:
+        char = self.char_mapping.get(entity_id, "?")
+        return char[0] if char else self.fill
+
+    def _split_entities(self, state: "GameState") -> None:
+        """エンティティを静的/動的に振り分ける（タプルが同一なら何もしない）"""
+        if state.entities is self._entities_ref:
+            return
+
+        static_cells = []
+        dynamic_cells = []
+        for entity in state.entities:
+            if not entity.is_active:
+                continue
+            cell = (entity.pos.x, entity.pos.y, self._char_for(entity.id))
+            if entity.id in self.static_ids:
+                static_cells.append(cell)
+            else:
+                dynamic_cells.append(cell)
+
+        self._entities_ref = state.entities
+        self._static_cells = tuple(static_cells)
+        self._dynamic_cells = tuple(dynamic_cells)
+
+    def _paint(
+        self,
+        rows: list[str],
+        cells: Iterable[tuple[int, int, str]],
+        width: int,
+        height: int,
+    ) -> list[str]:
+        """
+        行リストに文字を重ねた新しい行リストを返す
+
+        変更のある行だけを再構築します（元のリストは変更しない）。
+        TextGrid.set と同じく、2文字以上の文字列は先頭の1文字だけを使います。
+        """
+        dirty: dict[int, list[tuple[int, str]]] = {}
+        for x, y, char in cells:
+            if 0 <= x < width and 0 <= y < height:
+                dirty.setdefault(y, []).append((x, char))
+
+        if not dirty:
+            return rows
+
+        new_rows = list(rows)
+        for y, row_cells in dirty.items():
+            row = list(new_rows[y + 1])
+            for x, char in row_cells:
+                row[x + 1] = char[0] if char else self.fill
+            new_rows[y + 1] = "".join(row)
+        return new_rows
+
+    def _update_static(self, state: "GameState") -> None:
+        """静的レイヤー（枠線 + 床 + 壁）を必要な時だけ再構築"""
+        key = (state.map_width, state.map_height, self._static_cells)
+        if key == self._static_key:
+            return
+
+        width, height = state.map_width, state.map_height
+        edge = self.border * (width + 2)
+        floor = self.border + self.fill * width + self.border
+        base = [edge] + [floor] * height + [edge]
+
+        self._static_rows = self._paint(base, self._static_cells, width, height)
+        self._static_key = key
+        self._dynamic_key = None
+        self.rebuild_counts["static"] += 1
+
+    def _update_dynamic(self, state: "GameState") -> None:
+        """動的レイヤー（動くエンティティ）を必要な時だけ再構築"""
+        key = self._dynamic_cells
+        if key == self._dynamic_key:
+            return
+
+        self._dynamic_rows = self._paint(
+            self._static_rows, self._dynamic_cells, state.map_width, state.map_height
+        )
+        self._dynamic_key = key
+        self.rebuild_counts["dynamic"] += 1
+
+    def render_map(
+        self,
+        state: "GameState",
+        overlay: Iterable[tuple[int, int, str]] = (),
+    ) -> str:
+        """
+        枠付きのマップ文字列を生成する
+
+        Args:
+            state: ゲーム状態
+            overlay: 重ねて描画する (x, y, 文字) の列（例: A*経路）
+
+        Returns:
+            枠付きマップの文字列表現
+        """
+        self._split_entities(state)
+        self._update_static(state)
+        self._update_dynamic(state)
+
+        top = list(overlay)
+        top.append((state.player.pos.x, state.player.pos.y, self.player_char))
+        rows = self._paint(self._dynamic_rows, top, state.map_width, state.map_height)
+        return "\n".join(rows)
+
+
 def create_game_renderer(
     char_mapping: dict[str, str] | None = None,
     show_status: bool = True,
@@ -171,6 +345,11 @@ def create_game_renderer(
         "floor": ".",
     }
     mapping = {**default_mapping, **(char_mapping or {})}
+    layers = LayeredRenderer(
+        char_mapping=mapping,
+        fill=mapping["floor"],
+        player_char=mapping["player"],
+    )
 
     def render(state: "GameState") -> str:
         """状態を文字列に変換する（副作用なし！）"""
@@ -181,21 +360,8 @@ def create_game_renderer(
             lines.append(f"Turn: {state.turn}  Score: {state.score}  HP: {state.player.hp}")
             lines.append("")
 
-        # マップ描画
-        grid = TextGrid(state.map_width, state.map_height, mapping["floor"])
-
-        # エンティティを描画
-        for entity in state.entities:
-            if entity.is_active:
-                char = mapping.get(entity.id, "?")
-                grid.set(entity.pos.x, entity.pos.y, char)
-
-        # プレイヤーを描画（最後に描画して上書き優先）
-        grid.set(state.player.pos.x, state.player.pos.y, mapping["player"])
-
-        # 枠付きで出力
-        bordered = add_border(grid)
-        lines.append(bordered.render())
+        # マップ描画（静的レイヤーはキャッシュされ、変化した部分だけ再描画）
+        lines.append(layers.render_map(state))
 
         # ログ
         if show_log and state.log_messages:
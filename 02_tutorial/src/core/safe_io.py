@@ -0,0 +1,102 @@
+"""
+クラッシュに強いファイル書き込み
+
+セーブファイルは「一時ファイルに書く → fsync → rename で置き換え」で
+書き込みます。途中でプロセスが落ちても、古い内容か新しい内容の
+どちらかが必ず残り、半端なファイルにはなりません。
+
+JSONファイルには内容の checksum（SHA-256）を埋め込み、読み込み時に検証します。
+checksum の無いファイル（テンプレートや手で書いたファイル）は検証せずに読みます。
+手でセーブを編集する場合は "checksum" の行を消してください。
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+
+CHECKSUM_KEY = "checksum"
+
+
+class CorruptFileError(ValueError):
+    """ファイルが壊れている（JSONとして読めない、またはchecksumが一致しない）"""
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """
+    一時ファイル + rename でファイルを書き込む
+
+    Args:
+        path: 書き込み先
+        data: 書き込む内容
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def json_checksum(data: dict[str, Any]) -> str:
+    """辞書の内容から checksum を計算する（checksum キー自体は除く）"""
+    body = {k: v for k, v in data.items() if k != CHECKSUM_KEY}
+    canonical = json.dumps(body, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def write_json_checked(path: Path, data: dict[str, Any]) -> None:
+    """
+    checksum を付けてJSONをアトミックに書き込む
+
+    Args:
+        path: 書き込み先
+        data: 書き込む辞書（checksum キーは上書きされる）
+    """
+    body = {k: v for k, v in data.items() if k != CHECKSUM_KEY}
+    body[CHECKSUM_KEY] = json_checksum(body)
+    atomic_write_bytes(path, json.dumps(body, ensure_ascii=False, indent=2).encode("utf-8"))
+
+
+def parse_json_checked(text: str | bytes, name: str = "<json>") -> dict[str, Any]:
+    """
+    JSON文字列を読み、checksum があれば検証する
+
+    Args:
+        text: JSONの内容
+        name: エラーメッセージ用の名前
+
+    Returns:
+        checksum キーを除いた辞書
+
+    Raises:
+        CorruptFileError: JSONとして読めない、またはchecksumが一致しない
+    """
+    try:
+        data = json.loads(text)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise CorruptFileError(f"{name}: invalid JSON ({e})") from e
+
+    if not isinstance(data, dict):
+        raise CorruptFileError(f"{name}: expected a JSON object")
+
+    expected = data.pop(CHECKSUM_KEY, None)
+    if expected is not None and expected != json_checksum(data):
+        raise CorruptFileError(f"{name}: checksum mismatch")
+
+    return data
+
+
+def read_json_checked(path: Path) -> dict[str, Any]:
+    """
+    JSONファイルを読み、checksum があれば検証する
+
+    Raises:
+        FileNotFoundError: ファイルがない
+        CorruptFileError: JSONとして読めない、またはchecksumが一致しない
+    """
+    path = Path(path)
+    return parse_json_checked(path.read_bytes(), path.name)
@@ -0,0 +1,518 @@
+"""
+スナップショット + 差分ログによるセーブ
+
+毎ターン state.json 全体を書き直す代わりに、変化したエンティティだけを
+追記型のログ（state.NNNNNN.log）に書き込みます。
+
+ファイル構成（SAVEディレクトリ内）:
+    state.json          ベースとなる完全なスナップショット
+                        （"log_generation" 以降のログを重ねて読む）
+    state.bin           バイナリ形式のスナップショット（あればstate.jsonより優先）
+    state.000001.log    世代1のログ（先頭は完全スナップショット、以降は差分）
+    state.000002.log    世代2のログ ...
+
+snapshot_every 回ごとに新しい世代のログを開始し、先頭に完全スナップショットを
+書きます。古い世代は、バックグラウンドで state.json へ畳み込んだ後に削除されます
+（コンパクション）。途中でクラッシュしても、残っているログを順番に
+重ねれば最後に書いたターンまで復元できます。
+
+コマンドジャーナル（src.core.journal）と併用する時は、各レコードに
+「どの番号のコマンドまで反映したか」（"j"、スナップショットでは
+"journal_seq"）を記録します。
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Iterator, TextIO
+
+from src.core.state import GameState, Entity, Position
+from src.core.state_codec import encode_state
+from src.core.safe_io import atomic_write_bytes, write_json_checked
+
+
+# 差分として記録するGameStateのスカラー項目
+SCALAR_FIELDS = ("turn", "score", "is_game_over", "map_width", "map_height")
+
+LOG_PREFIX = "state."
+LOG_SUFFIX = ".log"
+
+
+# ============================================
+# 辞書形式への変換
+# ============================================
+
+
+def entity_to_dict(entity: Entity) -> dict[str, Any]:
+    """EntityをJSON用の辞書に変換する"""
+    data = {
+        "id": entity.id,
+        "name": entity.name,
+        "x": entity.pos.x,
+        "y": entity.pos.y,
+        "hp": entity.hp,
+        "is_active": entity.is_active,
+    }
+    # FSM状態は拡張属性（frozen dataclassに後付けされる）
+    if hasattr(entity, "fsm_state"):
+        data["fsm_state"] = entity.fsm_state
+    return data
+
+
+def player_to_dict(player: Entity) -> dict[str, Any]:
+    """プレイヤーをJSON用の辞書に変換する"""
+    return {
+        "id": player.id,
+        "name": player.name,
+        "x": player.pos.x,
+        "y": player.pos.y,
+        "hp": player.hp,
+    }
+
+
+def state_to_dict(state: GameState) -> dict[str, Any]:
+    """GameStateを state.json 形式の辞書に変換する"""
+    return {
+        "version": "1.0",
+        "player": player_to_dict(state.player),
+        "entities": [entity_to_dict(e) for e in state.entities],
+        **{name: getattr(state, name) for name in SCALAR_FIELDS},
+    }
+
+
+def entity_from_dict(data: dict[str, Any]) -> Entity:
+    """辞書からEntityを復元する"""
+    entity = Entity(
+        id=data.get("id", ""),
+        name=data.get("name", ""),
+        pos=Position(x=data.get("x", 0), y=data.get("y", 0)),
+        hp=data.get("hp", 100),
+        is_active=data.get("is_active", True),
+    )
+    # FSM状態を拡張属性として設定（frozen dataclass対応）
+    if "fsm_state" in data:
+        object.__setattr__(entity, "fsm_state", data.get("fsm_state", "IDLE"))
+    return entity
+
+
+def player_from_dict(
+    data: dict[str, Any],
+    start: tuple[int, int] = (5, 5),
+    hp: int = 100,
+) -> Entity:
+    """
+    辞書からプレイヤーを復元する
+
+    Args:
+        data: プレイヤーの辞書
+        start: 座標がない場合の初期位置
+        hp: HPがない場合の初期HP
+    """
+    return Entity(
+        id=data.get("id", "player"),
+        name=data.get("name", "Player"),
+        pos=Position(x=data.get("x", start[0]), y=data.get("y", start[1])),
+        hp=data.get("hp", hp),
+    )
+
+
+def state_from_dict(
+    data: dict[str, Any],
+    player_start: tuple[int, int] = (5, 5),
+    player_hp: int = 100,
+    map_size: tuple[int, int] = (20, 10),
+) -> GameState:
+    """
+    state.json 形式の辞書からGameStateを復元する
+
+    Args:
+        data: state.json の内容
+        player_start: プレイヤー座標がない場合の初期位置
+        player_hp: プレイヤーHPがない場合の初期HP
+        map_size: マップサイズがない場合の (幅, 高さ)
+    """
+    return GameState(
+        player=player_from_dict(data.get("player", {}), player_start, player_hp),
+        entities=tuple(entity_from_dict(e) for e in data.get("entities", [])),
+        turn=data.get("turn", 0),
+        score=data.get("score", 0),
+        is_game_over=data.get("is_game_over", False),
+        map_width=data.get("map_width", map_size[0]),
+        map_height=data.get("map_height", map_size[1]),
+    )
+
+
+# ============================================
+# ログの読み込み（リプレイ）
+# ============================================
+
+
+def _log_path(slot_path: Path, generation: int) -> Path:
+    return slot_path / f"{LOG_PREFIX}{generation:06d}{LOG_SUFFIX}"
+
+
+def list_log_generations(slot_path: Path) -> list[int]:
+    """SAVEディレクトリ内のログ世代番号を昇順で返す"""
+    generations = []
+    for path in slot_path.glob(f"{LOG_PREFIX}*{LOG_SUFFIX}"):
+        number = path.name[len(LOG_PREFIX):-len(LOG_SUFFIX)]
+        if number.isdigit():
+            generations.append(int(number))
+    return sorted(generations)
+
+
+def apply_record(data: dict[str, Any], record: dict[str, Any]) -> dict[str, Any]:
+    """
+    ログの1レコードを state.json 形式の辞書に適用する
+
+    Args:
+        data: 現在の状態（辞書形式、変更される）
+        record: スナップショット {"snap": {...}} または差分
+
+    Returns:
+        適用後の辞書
+    """
+    if "snap" in record:
+        return dict(record["snap"])
+
+    if "j" in record:
+        data["journal_seq"] = record["j"]
+
+    for name in SCALAR_FIELDS:
+        if name in record:
+            data[name] = record[name]
+
+    if "player" in record:
+        data["player"] = record["player"]
+
+    if "n" in record:
+        entities = list(data.get("entities", []))
+        del entities[record["n"]:]
+        for index, entity_data in record.get("e", []):
+            if index < len(entities):
+                entities[index] = entity_data
+            else:
+                entities.append(entity_data)
+        data["entities"] = entities
+
+    return data
+
+
+def read_log_records(slot_path: Path, base_generation: int) -> Iterator[dict[str, Any]]:
+    """
+    スナップショットより新しいログレコードを順番に返す
+
+    基準世代の先頭スナップショットはスナップショット本体と同じ内容なので
+    読み飛ばします。書き込み途中でクラッシュした最後の行は無視します。
+
+    Args:
+        slot_path: SAVEディレクトリのパス
+        base_generation: スナップショットが対応するログ世代
+    """
+    for generation in list_log_generations(slot_path):
+        if generation < base_generation:
+            continue
+        with open(_log_path(slot_path, generation), encoding="utf-8") as f:
+            for line_no, line in enumerate(f):
+                if line_no == 0 and generation == base_generation and line.startswith('{"snap"'):
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # 書き込み途中の行
+                    break
+
+
+def replay_save_log(slot_path: Path, data: dict[str, Any]) -> dict[str, Any]:
+    """
+    state.json の内容にログを重ねて最新の状態を復元する
+
+    Args:
+        slot_path: SAVEディレクトリのパス
+        data: state.json の内容
+
+    Returns:
+        最新状態の辞書（state.json 形式）
+    """
+    for record in read_log_records(slot_path, data.get("log_generation", 0)):
+        data = apply_record(data, record)
+    return data
+
+
+def replay_onto_state(
+    slot_path: Path,
+    state: GameState,
+    base_generation: int,
+    player_start: tuple[int, int] = (5, 5),
+    player_hp: int = 100,
+) -> GameState:
+    """
+    復元済みのGameStateにログを重ねる（バイナリスナップショット用）
+
+    差分だけならエンティティを辞書に戻さず、変化した要素だけ置き換えます。
+
+    Args:
+        slot_path: SAVEディレクトリのパス
+        state: スナップショットから復元したGameState
+        base_generation: スナップショットが対応するログ世代
+        player_start: プレイヤー座標がない場合の初期位置
+        player_hp: プレイヤーHPがない場合の初期HP
+    """
+    records = list(read_log_records(slot_path, base_generation))
+    if not records:
+        return state
+
+    # 畳み込まれていない世代がある（コンパクション前に終了した）場合は辞書で重ねる
+    if any("snap" in record for record in records):
+        data = state_to_dict(state)
+        for record in records:
+            data = apply_record(data, record)
+        return state_from_dict(data, player_start, player_hp, (state.map_width, state.map_height))
+
+    player = state.player
+    entities = list(state.entities)
+    changes: dict[str, Any] = {}
+    for record in records:
+        for name in SCALAR_FIELDS:
+            if name in record:
+                changes[name] = record[name]
+        if "player" in record:
+            player = player_from_dict(record["player"], player_start, player_hp)
+        if "n" in record:
+            del entities[record["n"]:]
+            for index, entity_data in record.get("e", []):
+                if index < len(entities):
+                    entities[index] = entity_from_dict(entity_data)
+                else:
+                    entities.append(entity_from_dict(entity_data))
+
+    return state.replace(player=player, entities=tuple(entities), **changes)
+
+
+def saved_journal_seq(slot_path: Path) -> int:
+    """
+    セーブに反映済みの最後のコマンド番号を返す
+
+    ログの各世代（先頭のスナップショットを含む）を順に見て、最後に
+    記録された番号を使います。ログがなければ state.json の値を使います。
+
+    Args:
+        slot_path: SAVEディレクトリのパス
+
+    Returns:
+        コマンド番号（ジャーナルを使っていなければ0）
+    """
+    slot_path = Path(slot_path)
+    generations = list_log_generations(slot_path)
+    if not generations:
+        state_file = slot_path / "state.json"
+        if not state_file.exists():
+            return 0
+        try:
+            return json.loads(state_file.read_bytes()).get("journal_seq", 0)
+        except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+            return 0
+
+    seq = 0
+    for generation in generations:
+        with open(_log_path(slot_path, generation), encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if "snap" in record:
+                    seq = record["snap"].get("journal_seq", seq)
+                else:
+                    seq = record.get("j", seq)
+    return seq
+
+
+# ============================================
+# ログの書き込み
+# ============================================
+
+
+class SaveLog:
+    """
+    スロット1つ分の差分ログライター
+
+    append() のたびに前回との差分を1行追記します。
+    ファイルは開いたままにし、fsync は fsync_every 件ごとにまとめて行います。
+    """
+
+    def __init__(
+        self,
+        slot_path: Path,
+        snapshot_every: int = 200,
+        fsync_every: int = 16,
+        snapshot_format: str = "json",
+    ) -> None:
+        """
+        Args:
+            slot_path: SAVEディレクトリのパス
+            snapshot_every: 何件ごとに新しい世代（完全スナップショット）を始めるか
+            fsync_every: 何件ごとにfsyncするか
+            snapshot_format: コンパクション先の形式（"json" = state.json, "binary" = state.bin）
+        """
+        self.slot_path = Path(slot_path)
+        self.snapshot_every = snapshot_every
+        self.fsync_every = fsync_every
+        self.snapshot_format = snapshot_format
+
+        generations = list_log_generations(self.slot_path)
+        self._generation = generations[-1] if generations else 0
+        self._file: TextIO | None = None
+        self._last: GameState | None = None
+        self._records_in_generation = 0
+        self._unsynced = 0
+        self._compactor: threading.Thread | None = None
+        self.journal_seq: int | None = None
+
+    @property
+    def last_state(self) -> GameState | None:
+        """最後に記録した状態（まだ何も記録していなければNone）"""
+        return self._last
+
+    def append(self, state: GameState, journal_seq: int | None = None) -> None:
+        """
+        状態を記録する（前回からの差分だけを書く）
+
+        Args:
+            state: 記録する状態
+            journal_seq: この状態に反映済みの最後のコマンド番号
+        """
+        if self._last is None or self._records_in_generation >= self.snapshot_every:
+            if journal_seq is not None:
+                self.journal_seq = journal_seq
+            self._start_generation(state)
+            return
+
+        record = self._diff(self._last, state)
+        self._last = state
+        if journal_seq is not None and journal_seq != self.journal_seq:
+            record["j"] = self.journal_seq = journal_seq
+        if record:
+            self._write(record)
+
+    def sync(self) -> None:
+        """未fsyncの書き込みをディスクに確定させる"""
+        if self._file is not None and self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def close(self) -> None:
+        """ログを確定して閉じる（コンパクションの完了も待つ）"""
+        self.sync()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+
+    def _write(self, record: dict[str, Any]) -> None:
+        assert self._file is not None
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self._records_in_generation += 1
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self.sync()
+
+    def _diff(self, old: GameState, new: GameState) -> dict[str, Any]:
+        """2つの状態の差分レコードを作る（Entityは不変なので同一性で比較）"""
+        record: dict[str, Any] = {}
+
+        for name in SCALAR_FIELDS:
+            value = getattr(new, name)
+            if value != getattr(old, name):
+                record[name] = value
+
+        if new.player is not old.player and new.player != old.player:
+            record["player"] = player_to_dict(new.player)
+
+        if new.entities is not old.entities:
+            changed = []
+            for index, entity in enumerate(new.entities):
+                if index < len(old.entities):
+                    previous = old.entities[index]
+                    if entity is previous or (
+                        entity == previous
+                        and getattr(entity, "fsm_state", None) == getattr(previous, "fsm_state", None)
+                    ):
+                        continue
+                changed.append([index, entity_to_dict(entity)])
+            if changed or len(new.entities) != len(old.entities):
+                record["n"] = len(new.entities)
+                record["e"] = changed
+
+        return record
+
+    def _start_generation(self, state: GameState) -> None:
+        """新しい世代のログを開始し、古い世代をバックグラウンドで畳み込む"""
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+
+        # 前回のコンパクションが終わっていなければ待つ（世代の順序を保つため）
+        if self._compactor is not None:
+            self._compactor.join()
+
+        self._generation += 1
+        snapshot = state_to_dict(state)
+        if self.journal_seq is not None:
+            snapshot["journal_seq"] = self.journal_seq
+
+        self._file = open(_log_path(self.slot_path, self._generation), "a", encoding="utf-8")
+        self._records_in_generation = 0
+        self._last = state
+        self._write({"snap": snapshot})
+        self.sync()
+
+        self._compactor = threading.Thread(
+            target=compact,
+            args=(self.slot_path, state, snapshot, self._generation, self.snapshot_format),
+            daemon=True,
+        )
+        self._compactor.start()
+
+
+def compact(
+    slot_path: Path,
+    state: GameState,
+    snapshot: dict[str, Any],
+    generation: int,
+    snapshot_format: str = "json",
+) -> None:
+    """
+    スナップショットを state.json（または state.bin）に書き、古いログを削除する
+
+    一時ファイルに書いてから置き換えるので、途中で止まっても
+    スナップショットが壊れることはありません。読み込み時に検証できるよう
+    checksum も書き込みます。
+
+    Args:
+        slot_path: SAVEディレクトリのパス
+        state: 世代 generation の先頭の状態
+        snapshot: state を辞書にしたもの
+        generation: このスナップショットが対応するログ世代
+        snapshot_format: "json" または "binary"
+    """
+    if snapshot_format == "binary":
+        atomic_write_bytes(slot_path / "state.bin", encode_state(state, log_generation=generation))
+    else:
+        write_json_checked(slot_path / "state.json", {**snapshot, "log_generation": generation})
+
+    # JSONに戻した場合、古いバイナリスナップショットが優先されないよう削除
+    if snapshot_format != "binary":
+        (slot_path / "state.bin").unlink(missing_ok=True)
+
+    for old_generation in list_log_generations(slot_path):
+        if old_generation < generation:
+            try:
+                _log_path(slot_path, old_generation).unlink()
+            except FileNotFoundError:
+                pass
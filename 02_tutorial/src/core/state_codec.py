@@ -0,0 +1,259 @@
+"""
+GameState のバイナリコーデック
+
+JSONの代わりに、固定長のエンティティレコードと文字列テーブルで
+GameStateを保存します。エンティティ数が多いセーブで読み込みを速くするためのものです。
+
+レイアウト（リトルエンディアン）:
+    ヘッダー         HEADER（マジック, バージョン, ログ世代, ターン, スコア, ...）
+    文字列テーブル   各文字列の長さ（uint32 × 個数）+ UTF-8バイト列を連結したもの
+    プレイヤー       ENTITY_RECORD × 1
+    エンティティ     ENTITY_RECORD × エンティティ数
+    チェックサム     ここまでの全バイトの CRC32（uint32、バージョン2以降）
+
+ENTITY_RECORD の id / name / fsm_state は文字列テーブルの番号です。
+
+Usage（JSONとの比較ベンチマーク）:
+    python -m src.core.state_codec --entities 100000
+"""
+
+import gc
+import struct
+import zlib
+from typing import Any
+
+from src.core.state import GameState, Entity, Position
+
+
+MAGIC = b"GSTB"
+VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)
+
+# magic, version, log_generation, turn, score, map_width, map_height,
+# is_game_over, entity_count, string_count
+HEADER = struct.Struct("<4sHIqqiiBII")
+
+# id, name, x, y, hp, flags, fsm_state
+ENTITY_RECORD = struct.Struct("<IIiiiBI")
+
+CHECKSUM = struct.Struct("<I")
+
+FLAG_ACTIVE = 0x01
+FLAG_FSM = 0x02
+
+
+class StateCodecError(ValueError):
+    """バイナリ形式が不正"""
+
+
+def is_binary_state(data: bytes) -> bool:
+    """バイト列がバイナリ形式のGameStateかどうか（先頭のマジックで判定）"""
+    return data[:len(MAGIC)] == MAGIC
+
+
+def encode_state(state: GameState, log_generation: int = 0) -> bytes:
+    """
+    GameStateをバイナリにエンコードする
+
+    Args:
+        state: ゲーム状態
+        log_generation: 差分ログの世代（savelog 用）
+
+    Returns:
+        エンコードされたバイト列
+    """
+    strings: dict[str, int] = {}
+
+    def intern(text: str) -> int:
+        index = strings.get(text)
+        if index is None:
+            index = strings[text] = len(strings)
+        return index
+
+    def pack_entity(entity: Entity) -> bytes:
+        flags = FLAG_ACTIVE if entity.is_active else 0
+        fsm_index = 0
+        if hasattr(entity, "fsm_state"):
+            flags |= FLAG_FSM
+            fsm_index = intern(entity.fsm_state)
+        return ENTITY_RECORD.pack(
+            intern(entity.id), intern(entity.name),
+            entity.pos.x, entity.pos.y, entity.hp,
+            flags, fsm_index,
+        )
+
+    records = [pack_entity(state.player)]
+    records.extend(pack_entity(e) for e in state.entities)
+
+    encoded = [text.encode("utf-8") for text in strings]
+    header = HEADER.pack(
+        MAGIC, VERSION, log_generation,
+        state.turn, state.score,
+        state.map_width, state.map_height,
+        1 if state.is_game_over else 0,
+        len(state.entities), len(encoded),
+    )
+    lengths = struct.pack(f"<{len(encoded)}I", *(len(b) for b in encoded))
+
+    body = b"".join([header, lengths, *encoded, *records])
+    return body + CHECKSUM.pack(zlib.crc32(body))
+
+
+def decode_state(data: bytes) -> tuple[GameState, int]:
+    """
+    バイナリからGameStateを復元する
+
+    Args:
+        data: encode_state で作ったバイト列
+
+    Returns:
+        (GameState, ログ世代)
+
+    Raises:
+        StateCodecError: マジック・バージョン・長さ・チェックサムが不正
+    """
+    if len(data) < HEADER.size or not is_binary_state(data):
+        raise StateCodecError("not a binary GameState")
+
+    (
+        _, version, log_generation, turn, score,
+        map_width, map_height, is_game_over, entity_count, string_count,
+    ) = HEADER.unpack_from(data, 0)
+
+    if version not in SUPPORTED_VERSIONS:
+        raise StateCodecError(f"unsupported version: {version}")
+
+    size = len(data)
+    if version >= 2:
+        size -= CHECKSUM.size
+        (expected,) = CHECKSUM.unpack_from(data, size)
+        if zlib.crc32(memoryview(data)[:size]) != expected:
+            raise StateCodecError("checksum mismatch")
+
+    # 文字列テーブル
+    offset = HEADER.size
+    lengths = struct.unpack_from(f"<{string_count}I", data, offset)
+    offset += 4 * string_count
+    strings = []
+    for length in lengths:
+        strings.append(data[offset:offset + length].decode("utf-8"))
+        offset += length
+
+    # 固定長レコード
+    end = offset + ENTITY_RECORD.size * (entity_count + 1)
+    if end != size:
+        raise StateCodecError("truncated or corrupted entity records")
+
+    # frozen dataclass の __init__ は1フィールドずつ object.__setattr__ するので遅い。
+    # 大量に復元する時は __dict__ に直接詰める（結果は通常の生成と同じ）。
+    # 循環参照のない大量生成なので、その間はGCも止めておく
+    new = object.__new__
+    entities = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for id_index, name_index, x, y, hp, flags, fsm_index in ENTITY_RECORD.iter_unpack(
+            memoryview(data)[offset:end]
+        ):
+            pos = new(Position)
+            pos.__dict__.update(x=x, y=y)
+            entity = new(Entity)
+            entity.__dict__.update(
+                id=strings[id_index],
+                name=strings[name_index],
+                pos=pos,
+                hp=hp,
+                is_active=bool(flags & FLAG_ACTIVE),
+            )
+            if flags & FLAG_FSM:
+                entity.__dict__["fsm_state"] = strings[fsm_index]
+            entities.append(entity)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    state = GameState(
+        player=entities[0],
+        entities=tuple(entities[1:]),
+        turn=turn,
+        score=score,
+        is_game_over=bool(is_game_over),
+        map_width=map_width,
+        map_height=map_height,
+    )
+    return state, log_generation
+
+
+# ============================================
+# ベンチマーク
+# ============================================
+
+
+def benchmark(entity_count: int = 100_000, repeat: int = 3) -> dict[str, Any]:
+    """
+    JSON形式とバイナリ形式の保存・読み込み時間を比較する
+
+    Args:
+        entity_count: エンティティ数
+        repeat: 計測回数（最速値を採用）
+
+    Returns:
+        計測結果の辞書（秒・バイト数）
+    """
+    import json
+    import time
+
+    from src.core.savelog import state_to_dict, state_from_dict
+
+    state = GameState(
+        entities=tuple(
+            Entity(
+                id="enemy" if i % 3 else "wall",
+                name=f"Enemy{i % 100}",
+                pos=Position(x=i % 1000, y=i // 1000),
+                hp=100 - i % 50,
+            )
+            for i in range(entity_count)
+        ),
+        map_width=1000,
+        map_height=max(1, entity_count // 1000),
+    )
+
+    def best(func) -> float:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    json_text = json.dumps(state_to_dict(state), ensure_ascii=False, indent=2)
+    binary = encode_state(state)
+
+    return {
+        "entities": entity_count,
+        "json_save": best(lambda: json.dumps(state_to_dict(state), ensure_ascii=False, indent=2)),
+        "json_load": best(lambda: state_from_dict(json.loads(json_text))),
+        "json_bytes": len(json_text.encode("utf-8")),
+        "binary_save": best(lambda: encode_state(state)),
+        "binary_load": best(lambda: decode_state(binary)),
+        "binary_bytes": len(binary),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="GameState codec benchmark")
+    parser.add_argument("--entities", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    result = benchmark(args.entities, args.repeat)
+    print(f"Entities: {result['entities']}")
+    print(f"{'format':<8} {'save (ms)':>10} {'load (ms)':>10} {'size (KB)':>10}")
+    for fmt in ("json", "binary"):
+        print(
+            f"{fmt:<8} {result[f'{fmt}_save'] * 1000:>10.1f} "
+            f"{result[f'{fmt}_load'] * 1000:>10.1f} {result[f'{fmt}_bytes'] / 1024:>10.0f}"
+        )
@@ -10,7 +10,7 @@ ASTを実際に実行し、GameStateを変更します。
 """
 
 from dataclasses import dataclass, replace
-from typing import Any, Callable
+from typing import Any, Callable, Iterable
 
 from src.core.state import GameState, Entity, Position
 from src.dsl.parser import (
@@ -407,6 +407,74 @@ class Interpreter:
             logs=self.logs,
         )
 
+    def execute_batch(self, programs: Iterable[Program], state: GameState) -> ExecutionResult:
+        """
+        複数のプログラムを1回のトランザクションとして順番に実行
+
+        AIターンのように多数のエンティティの move をまとめて適用する時に使う。
+        エンティティの move は名前・IDの索引を使ってリスト上で書き換え、
+        新しいStateは最後に1回だけ作る（execute を1件ずつ呼ぶと、
+        移動のたびにエンティティのタプル全体を作り直すことになる）。
+        move 以外のコマンドは execute_command でそのまま実行する。
+
+        Args:
+            programs: 実行するプログラムの列
+            state: 初期ゲーム状態
+
+        Returns:
+            実行結果（新しい状態、全プログラム分のエラーとログ）
+        """
+        self.errors = []
+        self.logs = []
+
+        current_state = state
+        entities = list(state.entities)
+        index: dict[str, list[int]] | None = None
+        pending = False  # entities に current_state へ未反映の変更がある
+
+        for program in programs:
+            for stmt in program.statements:
+                if isinstance(stmt, MoveCommand) and stmt.target != "player":
+                    if index is None:
+                        index = _entity_index(entities)
+                    self._log(f"Moving {stmt.target} to ({stmt.x}, {stmt.y})")
+                    targets = index.get(stmt.target)
+                    if not targets:
+                        self._error(f"Entity not found: {stmt.target}", stmt)
+                        continue
+                    for i in targets:
+                        entities[i] = entities[i].move_to(stmt.x, stmt.y)
+                    pending = True
+                    continue
+
+                if pending:
+                    current_state = current_state.replace(entities=tuple(entities))
+                    pending = False
+                before = current_state.entities
+                current_state = self.execute_command(stmt, current_state)
+                if current_state.entities is not before:
+                    entities = list(current_state.entities)
+                    index = None
+
+        if pending:
+            current_state = current_state.replace(entities=tuple(entities))
+
+        return ExecutionResult(
+            state=current_state,
+            errors=self.errors,
+            logs=self.logs,
+        )
+
+
+def _entity_index(entities: list[Entity]) -> dict[str, list[int]]:
+    """名前とIDからエンティティの位置（entities のインデックス）を引く索引"""
+    index: dict[str, list[int]] = {}
+    for i, entity in enumerate(entities):
+        index.setdefault(entity.name, []).append(i)
+        if entity.id != entity.name:
+            index.setdefault(entity.id, []).append(i)
+    return index
+
 
 # ============================================
 # 簡易関数
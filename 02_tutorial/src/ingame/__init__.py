@@ -4,6 +4,8 @@ InGameモジュール
 SAVEスロットからゲームを実行するためのランナー。
 """
 
-from src.ingame.runner import run_game
+from src.ingame.runner import run_game, load_game_module
 
-__all__ = ["run_game"]
+# リプレイ（src.ingame.replay）は python -m src.ingame.replay で実行するので、
+# パッケージの読み込み時には import しない
+__all__ = ["run_game", "load_game_module"]
@@ -0,0 +1,206 @@
+"""
+AIターンのまとめ処理
+
+1ターン分の全エンティティの行動を、1つの読み取り専用ビューから
+まとめて決める。
+
+- ゲーム状態のビュー（辞書）はターンごとに1回だけ作る
+  （以前はエンティティごとに全エンティティの辞書を作り直していた: O(n²)）
+- ai.py に decide_actions(entities, state) があれば1回の呼び出しで全員分を決める。
+  なければ decide_action(entity, state) を同じビューで1体ずつ呼ぶ
+- 決まった行動は Interpreter.execute_batch で1回のトランザクションとして適用する
+
+Usage（1ターンあたりの時間を測るベンチマーク）:
+    python -m src.ingame.ai_batch --entities 1000 10000
+"""
+
+from types import MappingProxyType, ModuleType
+from typing import Any, Callable, Mapping
+
+from src.core.state import GameState
+
+
+EntityView = Mapping[str, Any]
+
+
+def build_state_view(state: GameState) -> tuple[list[EntityView], Mapping[str, Any]]:
+    """
+    AIに渡す読み取り専用のビューを作る
+
+    Returns:
+        (行動するエンティティのビュー, ゲーム状態のビュー)
+        エンティティのビューはゲーム状態のビューの "entities" と同じオブジェクト
+    """
+    all_entities = tuple(
+        MappingProxyType({
+            "name": e.name,
+            "id": e.id,
+            "x": e.pos.x,
+            "y": e.pos.y,
+            "hp": e.hp,
+            "is_active": e.is_active,
+        })
+        for e in state.entities
+    )
+    player = state.player
+    state_view = MappingProxyType({
+        "player": MappingProxyType({"x": player.pos.x, "y": player.pos.y, "hp": player.hp}),
+        "entities": all_entities,
+        "map_width": state.map_width,
+        "map_height": state.map_height,
+    })
+    active = [view for view in all_entities if view["is_active"]]
+    return active, state_view
+
+
+def decide_ai_actions(
+    ai_module: ModuleType,
+    entities: list[EntityView],
+    state_view: Mapping[str, Any],
+    on_error: Callable[[EntityView, Exception], None] = lambda entity, e: None,
+) -> list[str]:
+    """
+    全エンティティの行動を決める
+
+    Args:
+        ai_module: ai モジュール
+        entities: 行動するエンティティのビュー
+        state_view: ゲーム状態のビュー
+        on_error: decide_action が例外を出した時に呼ばれる（そのエンティティは何もしない）
+
+    Returns:
+        entities と同じ順の DSL 文字列（何もしないなら ""）
+
+    Raises:
+        ValueError: decide_actions の戻り値の数が entities と合わない
+        Exception: decide_actions が出した例外
+    """
+    decide_actions = getattr(ai_module, "decide_actions", None)
+    if decide_actions is not None:
+        actions = list(decide_actions(entities, state_view))
+        if len(actions) != len(entities):
+            raise ValueError(
+                f"decide_actions returned {len(actions)} actions for {len(entities)} entities"
+            )
+        return [action or "" for action in actions]
+
+    actions = []
+    for entity in entities:
+        try:
+            actions.append(ai_module.decide_action(entity, state_view) or "")
+        except Exception as e:
+            on_error(entity, e)
+            actions.append("")
+    return actions
+
+
+# ============================================
+# ベンチマーク
+# ============================================
+
+
+def benchmark(counts: list[int], turns: int = 3, legacy_max: int = 2000) -> list[dict[str, Any]]:
+    """
+    1ターンあたりの時間を、以前の1体ずつの処理とまとめ処理で比べる
+
+    AIの中身の時間を除くため、プレイヤーに1歩近づくだけのAIを使う。
+
+    Args:
+        counts: エンティティ数のリスト
+        turns: 計測するターン数（平均を取る）
+        legacy_max: 以前の処理（O(n²)）を計測する最大のエンティティ数
+
+    Returns:
+        エンティティ数ごとの結果（ミリ秒、legacy は計測しなければNone）
+    """
+    import time
+    from types import SimpleNamespace
+
+    from src.core.state import Entity, Position
+    from src.dsl.interpreter import Interpreter
+    from src.dsl.parser import parse
+
+    def step_toward(entity: EntityView, state: Mapping[str, Any]) -> str:
+        player = state["player"]
+        x = entity["x"] + (player["x"] > entity["x"]) - (player["x"] < entity["x"])
+        y = entity["y"] + (player["y"] > entity["y"]) - (player["y"] < entity["y"])
+        return f"move {entity['id']} {x} {y}"
+
+    ai = SimpleNamespace(
+        decide_action=step_toward,
+        decide_actions=lambda entities, state: [step_toward(e, state) for e in entities],
+    )
+
+    def legacy_turn(state: GameState, interpreter: Interpreter) -> GameState:
+        # 以前の execute_ai_turn と同じ処理（エンティティごとに状態の辞書を作り、1件ずつ実行）
+        current_state = state
+        for entity in state.entities:
+            if not entity.is_active:
+                continue
+            entity_dict = {
+                "name": entity.name, "id": entity.id, "x": entity.pos.x, "y": entity.pos.y,
+                "hp": entity.hp, "is_active": entity.is_active,
+            }
+            state_dict = {
+                "player": {
+                    "x": current_state.player.pos.x,
+                    "y": current_state.player.pos.y,
+                    "hp": current_state.player.hp,
+                },
+                "entities": [
+                    {"name": e.name, "id": e.id, "x": e.pos.x, "y": e.pos.y, "is_active": e.is_active}
+                    for e in current_state.entities
+                ],
+                "map_width": current_state.map_width,
+                "map_height": current_state.map_height,
+            }
+            action = ai.decide_action(entity_dict, state_dict)
+            current_state = interpreter.execute(parse(action), current_state).state
+        return current_state.next_turn()
+
+    def batched_turn(state: GameState, interpreter: Interpreter) -> GameState:
+        entities, state_view = build_state_view(state)
+        actions = decide_ai_actions(ai, entities, state_view)
+        programs = [parse(action) for action in actions if action]
+        return interpreter.execute_batch(programs, state).state.next_turn()
+
+    results = []
+    for count in counts:
+        side = max(10, int(count ** 0.5) * 2)
+        state = GameState(
+            player=Entity(id="player", name="Player", pos=Position(side // 2, side // 2)),
+            entities=tuple(
+                Entity(id=f"enemy_{i}", name=f"enemy_{i}", pos=Position(i % side, (i // side) % side))
+                for i in range(count)
+            ),
+            map_width=side,
+            map_height=side,
+        )
+        row: dict[str, Any] = {"entities": count, "legacy": None}
+        runs = [("batched", batched_turn)]
+        if count <= legacy_max:
+            runs.append(("legacy", legacy_turn))
+        for label, turn in runs:
+            current = state
+            start = time.perf_counter()
+            for _ in range(turns):
+                current = turn(current, Interpreter())
+            row[label] = (time.perf_counter() - start) / turns * 1000
+        results.append(row)
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AI turn benchmark")
+    parser.add_argument("--entities", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--legacy-max", type=int, default=2000,
+                        help="skip the O(n^2) legacy loop above this many entities")
+    args = parser.parse_args()
+
+    print(f"{'entities':>8} {'legacy (ms/turn)':>17} {'batched (ms/turn)':>18}")
+    for row in benchmark(args.entities, args.turns, args.legacy_max):
+        legacy = f"{row['legacy']:.1f}" if row["legacy"] is not None else "skipped"
+        print(f"{row['entities']:>8} {legacy:>17} {row['batched']:>18.1f}")
@@ -0,0 +1,175 @@
+"""
+ai.py のホットリロード
+
+ゲームを終了しなくても、保存した ai.py が次のコマンドから使われます。
+
+- 各コマンド（とAIティック）の前にファイルの mtime を確認する（os.stat のみ）
+- 変わっていれば ai モジュールだけを読み直し、game モジュールの ai_module を差し替える
+- rules.py / hooks.py は game.py からは使われない。ai.py が import している場合だけ
+  ai モジュールと一緒に読み直し、そうでなければ「使われていない」と表示する
+- メモリ上の GameState はそのまま（セーブから読み直さない）
+- 読み直しに失敗したら（SyntaxError など）、前の ai モジュールを使い続ける
+"""
+
+import os
+import random
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Callable
+
+from src.core.state import GameState
+from src.ingame.runner import AI_SOURCES, ai_sources, load_ai_module
+
+
+@dataclass(frozen=True)
+class ReloadResult:
+    """1回の読み直しの結果"""
+
+    files: tuple[str, ...]      # 変更されたファイル
+    reload_ms: float            # 読み直しにかかった時間
+    latency_ms: float           # ファイルの保存から読み直し完了までの時間
+    error: str | None = None    # 失敗した場合の理由
+    reloaded: bool = True       # False: ゲームで使われていないファイルなので読み直していない
+
+    def describe(self) -> str:
+        """画面に表示する1行"""
+        files = ", ".join(self.files)
+        if not self.reloaded:
+            return f"[Reload] {files}: not used by the game (ai.py does not import it), nothing reloaded"
+        if self.error:
+            return f"[Reload] {files}: failed, keeping previous AI ({self.error})"
+        return (
+            f"[Reload] {files} reloaded in {self.reload_ms:.1f} ms "
+            f"({self.latency_ms / 1000:.1f} s after save)"
+        )
+
+
+class SourceWatcher:
+    """ファイルの mtime を見て変更を検出する"""
+
+    def __init__(self, directory: Path, names: frozenset[str] = AI_SOURCES) -> None:
+        """
+        Args:
+            directory: 監視するディレクトリ（スロットの ingame/）
+            names: 監視するファイル名
+        """
+        self.directory = Path(directory)
+        self.names = sorted(names)
+        self._signatures = self._snapshot()
+
+    def _snapshot(self) -> dict[str, tuple[int, int] | None]:
+        """各ファイルの (mtime_ns, サイズ)。ファイルがなければNone"""
+        signatures: dict[str, tuple[int, int] | None] = {}
+        for name in self.names:
+            try:
+                info = os.stat(self.directory / name)
+                signatures[name] = (info.st_mtime_ns, info.st_size)
+            except OSError:
+                signatures[name] = None
+        return signatures
+
+    def poll(self) -> list[str]:
+        """
+        前回から変わったファイルを返す
+
+        Returns:
+            変更（作成・削除を含む）されたファイル名
+        """
+        current = self._snapshot()
+        changed = [name for name in self.names if current[name] != self._signatures[name]]
+        self._signatures = current
+        return changed
+
+    def newest_mtime(self, names: list[str]) -> float:
+        """names のうち最も新しい mtime（秒、time.time() と同じ基準）"""
+        mtimes = [sig[0] for name in names if (sig := self._signatures[name]) is not None]
+        return max(mtimes) / 1e9 if mtimes else time.time()
+
+
+def reload_ai(
+    ingame_dir: Path,
+    files: list[str],
+    get_ai: Callable[[], ModuleType | None],
+    set_ai: Callable[[ModuleType | None], None],
+    saved_at: float,
+) -> ReloadResult:
+    """
+    ai モジュールを読み直して差し替える
+
+    Args:
+        ingame_dir: スロットの ingame/
+        files: 変更されたファイル名
+        get_ai: 今の ai モジュールを返す関数
+        set_ai: ai モジュールを差し替える関数
+        saved_at: ファイルが保存された時刻（time.time() の基準）
+
+    Returns:
+        ReloadResult
+    """
+    start = time.perf_counter()
+    try:
+        new_ai = load_ai_module(ingame_dir)
+    except Exception as e:
+        return ReloadResult(
+            files=tuple(files),
+            reload_ms=(time.perf_counter() - start) * 1000,
+            latency_ms=max(0.0, time.time() - saved_at) * 1000,
+            error=f"{type(e).__name__}: {e}",
+        )
+
+    # セッションの記録が差し込んだ乱数生成器を引き継ぐ（replay.install_rng を参照）
+    old_ai = get_ai()
+    old_rng = getattr(old_ai, "random", None)
+    if isinstance(old_rng, random.Random) and new_ai is not None and hasattr(new_ai, "random"):
+        new_ai.random = old_rng
+
+    set_ai(new_ai)
+    return ReloadResult(
+        files=tuple(files),
+        reload_ms=(time.perf_counter() - start) * 1000,
+        latency_ms=max(0.0, time.time() - saved_at) * 1000,
+    )
+
+
+def create_hot_reload_update(
+    update: Callable[[GameState, str], GameState],
+    slot_path: Path,
+    get_ai: Callable[[], ModuleType | None],
+    set_ai: Callable[[ModuleType | None], None],
+    report: Callable[[ReloadResult], None],
+) -> Callable[[GameState, str], GameState]:
+    """
+    コマンドの前に ai.py（と ai.py が import した rules.py / hooks.py）の変更を確認し、
+    変わっていれば読み直すupdate関数を作る
+
+    Args:
+        update: 元のupdate関数
+        slot_path: SAVEディレクトリのパス
+        get_ai: 今の ai モジュールを返す関数
+        set_ai: ai モジュールを差し替える関数
+        report: 読み直した結果を受け取る関数（画面表示・ログ用）
+
+    Returns:
+        ホットリロード付きのupdate関数
+    """
+    ingame_dir = Path(slot_path) / "ingame"
+    watcher = SourceWatcher(ingame_dir)
+
+    def hot_reload_update(state: GameState, cmd: str) -> GameState:
+        changed = watcher.poll()
+        if changed:
+            saved_at = watcher.newest_mtime(changed)
+            if ai_sources(get_ai()).isdisjoint(changed):
+                report(ReloadResult(
+                    files=tuple(changed),
+                    reload_ms=0.0,
+                    latency_ms=max(0.0, time.time() - saved_at) * 1000,
+                    reloaded=False,
+                ))
+            else:
+                report(reload_ai(ingame_dir, changed, get_ai, set_ai, saved_at))
+        return update(state, cmd)
+
+    return hot_reload_update
@@ -0,0 +1,440 @@
+"""
+セッションの記録と決定的リプレイ
+
+プレイ中に入力したコマンドを replays/ に記録し、後から同じ update 関数に
+流し直して、敵AIの不具合などを再現するための仕組みです。
+
+- ai.py の乱数（_random_move）は、コマンドごとに (セッションのシード, コマンド番号)
+  から初期化するので、リプレイでも同じ動きになる
+- リプレイ中は画面出力・セーブ・ログ書き込みを行わない
+- checkpoint_every コマンドごとにキーフレーム（状態 + update 関数内の変数）を
+  保存するので、任意の位置へ途中から移動できる
+- bisect() で「条件が初めて成り立つコマンド」を二分探索できる
+
+記録ファイル（replays/YYYYmmdd-HHMMSS-ffffff.jsonl、1行1レコードのJSON）:
+    {"version": 1, "seed": 123, "meta": {...}, "state": {...}}   先頭（開始時の状態）
+    {"cmd": "w"}                                                  以降1コマンド1行
+
+Usage:
+    python -m src.ingame.replay saves/SAVE_A                 # 最新の記録を最後まで再生
+    python -m src.ingame.replay saves/SAVE_A --turn 50000    # ターン50000の状態を表示
+    python -m src.ingame.replay saves/SAVE_A --until-hp 0    # プレイヤーHPが0以下になる最初のコマンド
+"""
+
+import copy
+import json
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, TextIO
+
+from src.core.state import GameState
+from src.core.savelog import state_to_dict, state_from_dict
+
+
+RECORDING_VERSION = 1
+REPLAYS_DIR = "replays"
+
+# 乱数シードを (シード, コマンド番号) から作る時の係数
+_SEED_STRIDE = 0x9E3779B1
+
+
+def command_seed(seed: int, index: int) -> int:
+    """index 番目のコマンドを実行する前に使う乱数シード"""
+    return seed + index * _SEED_STRIDE
+
+
+def install_rng(ai_module: ModuleType | None) -> random.Random:
+    """
+    ai.py に専用の乱数生成器を差し込む
+
+    ai.py の ``random.choice(...)`` は、モジュールの ``random`` を
+    random.Random インスタンスに置き換えることでそのまま専用の乱数になる
+    （生徒が書き換えた ai.py でも同じように働く）。
+
+    Args:
+        ai_module: game モジュールがロードした ai モジュール（なければNone）
+
+    Returns:
+        差し込んだ乱数生成器
+    """
+    rng = random.Random()
+    if ai_module is not None and hasattr(ai_module, "random"):
+        ai_module.random = rng
+    return rng
+
+
+# ============================================
+# 記録
+# ============================================
+
+
+class SessionRecorder:
+    """1セッション分のコマンドを記録する"""
+
+    def __init__(
+        self,
+        path: Path,
+        initial_state: GameState,
+        meta: dict[str, Any],
+        seed: int | None = None,
+    ) -> None:
+        """
+        Args:
+            path: 記録ファイルのパス
+            initial_state: セッション開始時の状態
+            meta: meta.json の内容（create_update に渡したもの）
+            seed: 乱数シード（省略時はランダム）
+        """
+        self.path = Path(path)
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.command_count = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # 落ちた時にも残るよう1行ごとに書き出す
+        self._file: TextIO | None = open(self.path, "w", encoding="utf-8", buffering=1)
+        header = {
+            "version": RECORDING_VERSION,
+            "seed": self.seed,
+            "meta": meta,
+            "state": state_to_dict(initial_state),
+        }
+        self._file.write(json.dumps(header, ensure_ascii=False) + "\n")
+
+    def wrap(self, update: Callable, ai_module: ModuleType | None) -> Callable:
+        """
+        コマンドを記録し、乱数を初期化してから update を呼ぶ関数を作る
+
+        Args:
+            update: 元のupdate関数
+            ai_module: game モジュールがロードした ai モジュール
+
+        Returns:
+            記録付きのupdate関数
+        """
+        rng = install_rng(ai_module)
+
+        def recorded_update(state: GameState, cmd: str) -> GameState:
+            if self._file is not None:
+                self._file.write(json.dumps({"cmd": cmd}, ensure_ascii=False) + "\n")
+            rng.seed(command_seed(self.seed, self.command_count))
+            self.command_count += 1
+            return update(state, cmd)
+
+        return recorded_update
+
+    def close(self) -> None:
+        """記録ファイルを閉じる"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def start_recording(
+    replays_dir: Path,
+    initial_state: GameState,
+    meta: dict[str, Any],
+    keep: int = 10,
+) -> SessionRecorder:
+    """
+    新しい記録ファイルを作って記録を始める（古い記録は keep 個だけ残す）
+
+    Args:
+        replays_dir: 記録を置くディレクトリ（SAVEディレクトリの replays/）
+        initial_state: セッション開始時の状態
+        meta: meta.json の内容
+        keep: 残す記録の数（今回の分を含む）
+
+    Returns:
+        SessionRecorder
+    """
+    replays_dir = Path(replays_dir)
+    name = datetime.now().strftime("%Y%m%d-%H%M%S-%f") + ".jsonl"
+    recorder = SessionRecorder(replays_dir / name, initial_state, meta)
+
+    if keep > 0:
+        for old in list_recordings(replays_dir)[:-keep]:
+            old.unlink(missing_ok=True)
+    return recorder
+
+
+def list_recordings(replays_dir: Path) -> list[Path]:
+    """記録ファイルを古い順に返す"""
+    return sorted(Path(replays_dir).glob("*.jsonl"))
+
+
+# ============================================
+# 読み込み
+# ============================================
+
+
+@dataclass(frozen=True)
+class Recording:
+    """読み込んだ記録"""
+
+    seed: int
+    meta: dict[str, Any]
+    initial: dict[str, Any]
+    commands: tuple[str, ...]
+
+
+def load_recording(path: Path) -> Recording:
+    """
+    記録ファイルを読み込む（書き込み途中の最後の行は無視する）
+
+    Raises:
+        ValueError: 記録ファイルの形式が不正
+    """
+    with open(path, encoding="utf-8") as f:
+        try:
+            header = json.loads(f.readline())
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: invalid recording header") from e
+        if header.get("version") != RECORDING_VERSION:
+            raise ValueError(f"{path}: unsupported recording version {header.get('version')}")
+
+        commands = []
+        for line in f:
+            try:
+                commands.append(json.loads(line)["cmd"])
+            except (json.JSONDecodeError, KeyError):
+                break
+
+    return Recording(
+        seed=header["seed"],
+        meta=header.get("meta", {}),
+        initial=header.get("state", {}),
+        commands=tuple(commands),
+    )
+
+
+# ============================================
+# リプレイ
+# ============================================
+
+
+def _closure_cells(func: Callable) -> list[Any]:
+    """update 関数とその内側の関数が参照するクロージャ変数のセルを集める"""
+    cells: list[Any] = []
+    seen: set[int] = set()
+    pending = [func]
+    while pending:
+        for cell in getattr(pending.pop(), "__closure__", None) or ():
+            if id(cell) in seen:
+                continue
+            seen.add(id(cell))
+            try:
+                value = cell.cell_contents
+            except ValueError:
+                continue  # まだ代入されていない変数
+            if callable(value) and hasattr(value, "__closure__"):
+                pending.append(value)
+            elif not isinstance(value, (ModuleType, type)):
+                cells.append(cell)
+    return cells
+
+
+@dataclass(frozen=True)
+class _Keyframe:
+    index: int
+    state: GameState
+    locals: list[Any]
+
+
+class ReplayEngine:
+    """
+    記録したコマンド列を update 関数に流し直す
+
+    渡した game モジュールはリプレイ専用になります（出力・セーブ・ログを
+    何もしない関数に置き換えるため）。load_game_module(..., cache=False) で
+    新しくロードしたものを渡してください。
+    """
+
+    def __init__(
+        self,
+        game_module: ModuleType,
+        recording: Recording,
+        checkpoint_every: int = 1000,
+    ) -> None:
+        """
+        Args:
+            game_module: リプレイに使う game モジュール
+            recording: load_recording で読み込んだ記録
+            checkpoint_every: 何コマンドごとにキーフレームを保存するか
+        """
+        self.recording = recording
+        self.checkpoint_every = max(1, checkpoint_every)
+
+        # I/Oをすべて無効化（update 内からはモジュールのグローバル名で呼ばれる）
+        def _noop(*args: Any, **kwargs: Any) -> None:
+            return None
+
+        for name in ("output", "print", "append_log", "save_state", "save_game", "update_meta"):
+            setattr(game_module, name, _noop)
+
+        config = game_module.config
+        meta = recording.meta
+        initial = state_from_dict(
+            recording.initial,
+            player_start=(config.PLAYER_START_X, config.PLAYER_START_Y),
+            player_hp=config.PLAYER_START_HP,
+            map_size=(config.MAP_WIDTH, config.MAP_HEIGHT),
+        )
+
+        self._rng = install_rng(getattr(game_module, "ai_module", None))
+        self._update = game_module.create_update(None, game_module.Interpreter(), meta)
+        self._cells = _closure_cells(self._update)
+
+        self.index = 0
+        self.state = initial
+        self._keyframes: dict[int, _Keyframe] = {}
+        self._save_keyframe()
+
+    def __len__(self) -> int:
+        return len(self.recording.commands)
+
+    def _save_keyframe(self) -> None:
+        # update 内の変数（goto の移動キュー、AIのON/OFFなど）も一緒に保存する
+        snapshot = copy.deepcopy([cell.cell_contents for cell in self._cells])
+        self._keyframes[self.index] = _Keyframe(self.index, self.state, snapshot)
+
+    def _restore_keyframe(self, keyframe: _Keyframe) -> None:
+        values = copy.deepcopy(keyframe.locals)
+        for cell, value in zip(self._cells, values):
+            cell.cell_contents = value
+        self.index = keyframe.index
+        self.state = keyframe.state
+
+    def step(self) -> GameState:
+        """次のコマンドを1つ実行する"""
+        cmd = self.recording.commands[self.index]
+        self._rng.seed(command_seed(self.recording.seed, self.index))
+        try:
+            self.state = self._update(self.state, cmd)
+        except Exception:
+            # ライブのセッションと同じく、失敗したコマンドは状態を変えない
+            pass
+        self.index += 1
+        if self.index % self.checkpoint_every == 0 and self.index not in self._keyframes:
+            self._save_keyframe()
+        return self.state
+
+    def seek(self, index: int) -> GameState:
+        """
+        index 個のコマンドを実行した直後の状態に移動する
+
+        後ろに戻る時や大きく進む時は、一番近いキーフレームから再生します。
+
+        Args:
+            index: 0 〜 len(self)
+
+        Returns:
+            その時点の状態
+        """
+        index = max(0, min(index, len(self)))
+        nearest = max(i for i in self._keyframes if i <= index)
+        if index < self.index or nearest > self.index:
+            self._restore_keyframe(self._keyframes[nearest])
+        while self.index < index:
+            self.step()
+        return self.state
+
+    def run(self) -> GameState:
+        """最後まで再生する"""
+        return self.seek(len(self))
+
+    def bisect(self, predicate: Callable[[GameState], bool]) -> int | None:
+        """
+        predicate が初めて True になるコマンド位置を二分探索で探す
+
+        predicate は一度 True になったら以降も True である（単調）ことを前提とします。
+
+        Args:
+            predicate: GameState を受け取る条件
+
+        Returns:
+            条件が成り立つ最小の位置（seek に渡せる値）。最後まで成り立たなければNone
+        """
+        if not predicate(self.seek(len(self))):
+            return None
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if predicate(self.seek(middle)):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def seek_turn(self, turn: int) -> GameState:
+        """GameState.turn が turn に達した最初の状態に移動する"""
+        index = self.bisect(lambda s: s.turn >= turn)
+        return self.seek(len(self) if index is None else index)
+
+
+def replay_slot(
+    slot_path: Path,
+    recording_path: Path | None = None,
+    checkpoint_every: int = 1000,
+) -> ReplayEngine:
+    """
+    SAVEスロットのゲームをロードして、記録のリプレイを準備する
+
+    Args:
+        slot_path: SAVEディレクトリのパス
+        recording_path: 記録ファイル（省略時は最新の記録）
+        checkpoint_every: キーフレームの間隔
+
+    Raises:
+        FileNotFoundError: 記録ファイルがない
+    """
+    from src.ingame.runner import load_game_module
+
+    slot_path = Path(slot_path)
+    if recording_path is None:
+        recordings = list_recordings(slot_path / REPLAYS_DIR)
+        if not recordings:
+            raise FileNotFoundError(f"No recordings in {slot_path / REPLAYS_DIR}")
+        recording_path = recordings[-1]
+
+    return ReplayEngine(
+        load_game_module(slot_path, cache=False),
+        load_recording(recording_path),
+        checkpoint_every=checkpoint_every,
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay a recorded game session")
+    parser.add_argument("slot", type=Path, help="SAVE directory (e.g. saves/SAVE_A)")
+    parser.add_argument("--recording", type=Path, help="recording file (default: latest)")
+    parser.add_argument("--checkpoint-every", type=int, default=1000)
+    parser.add_argument("--turn", type=int, help="show the state when this turn is reached")
+    parser.add_argument("--until-hp", type=int, help="find the first command where player HP <= value")
+    args = parser.parse_args()
+
+    engine = replay_slot(args.slot, args.recording, args.checkpoint_every)
+    start = time.perf_counter()
+
+    if args.until_hp is not None:
+        found = engine.bisect(lambda s: s.player.hp <= args.until_hp)
+        if found is None:
+            print(f"Player HP never reached {args.until_hp}")
+        elif found == 0:
+            print("Already reached at the start of the recording")
+        else:
+            print(f"First reached after command #{found}: {engine.recording.commands[found - 1]!r}")
+    elif args.turn is not None:
+        engine.seek_turn(args.turn)
+    else:
+        engine.run()
+
+    elapsed = time.perf_counter() - start
+    state = engine.state
+    print(f"Commands: {engine.index}/{len(engine)} in {elapsed * 1000:.1f} ms")
+    print(f"Turn: {state.turn}  Score: {state.score}  Player: ({state.player.pos.x}, {state.player.pos.y}) HP {state.player.hp}")
@@ -2,40 +2,231 @@
 InGameランナー
 
 SAVEディレクトリからゲームを動的にロードして実行します。
+
+ロードした game モジュールはスロットごとにキャッシュし、ingame/ の
+ファイルの内容が変わっていなければ次のプレイでもそのまま使います。
+ai.py が変わった場合は ai モジュールだけを読み直します（ホットリロード）。
+rules.py / hooks.py は game.py からは使われないので、ai.py が import して
+いる場合だけ ai モジュールと一緒に読み直します。
 """
 
+import hashlib
+import os
 import sys
 import importlib.util
+from collections import OrderedDict
 from pathlib import Path
+from types import ModuleType
 from typing import Callable
 
 
-def run_game(slot_path: Path) -> None:
+# ingame/ のロード時に一時的にsys.modulesへ登録するモジュール名
+# （スロット間で混ざらないよう、ロード後に必ず取り除く）
+_SLOT_MODULE_NAMES = (
+    "ingame", "ingame.game", "ingame.config", "config", "ai", "rules", "hooks",
+)
+
+
+# ============================================
+# モジュールキャッシュ
+# ============================================
+
+# キャッシュしておくスロット数（古いものから捨てる）
+MODULE_CACHE_SIZE = 32
+
+# 変わっても game モジュールを作り直さないファイル（ai_sources を参照）
+AI_SOURCES = frozenset({"ai.py", "rules.py", "hooks.py"})
+
+# ai.py が import した場合だけ ai モジュールの一部になるモジュール
+_AI_DEPENDENCIES = ("rules", "hooks")
+
+# ファイルパス → ((mtime_ns, サイズ, inode), SHA-256)
+_file_digests: dict[str, tuple[tuple[int, int, int], str]] = {}
+
+# スロットのパス → (ingame/ の各ファイルのハッシュ, game モジュール)
+_module_cache: "OrderedDict[Path, tuple[dict[str, str], ModuleType]]" = OrderedDict()
+
+
+def source_digests(ingame_dir: Path) -> dict[str, str]:
     """
-    SAVEスロットからゲームを実行
+    ingame/ 直下の .py ファイルの内容のハッシュを返す
+
+    ハッシュは mtime・サイズ・inode が変わったファイルだけ計算し直す。
+
+    Returns:
+        ファイル名 → SHA-256
+    """
+    digests: dict[str, str] = {}
+    try:
+        entries = list(os.scandir(ingame_dir))
+    except FileNotFoundError:
+        return digests
+
+    for entry in entries:
+        if not entry.name.endswith(".py") or not entry.is_file():
+            continue
+        info = entry.stat()
+        signature = (info.st_mtime_ns, info.st_size, info.st_ino)
+        cached = _file_digests.get(entry.path)
+        if cached is None or cached[0] != signature:
+            with open(entry.path, "rb") as f:
+                cached = (signature, hashlib.sha256(f.read()).hexdigest())
+            _file_digests[entry.path] = cached
+        digests[entry.name] = cached[1]
+    return digests
+
+
+def clear_module_cache(slot_path: Path | None = None) -> None:
+    """
+    キャッシュしたモジュールを捨てる
 
     Args:
-        slot_path: SAVEディレクトリのパス（例: saves/SAVE_A）
+        slot_path: このスロットの分だけ捨てる（省略時はすべて）
+    """
+    if slot_path is None:
+        _module_cache.clear()
+        _file_digests.clear()
+    else:
+        _module_cache.pop(Path(slot_path).resolve(), None)
+
+
+def load_game_module(slot_path: Path, cache: bool = True) -> ModuleType:
+    """
+    SAVEスロットの ingame/game.py をロードする
+
+    ロード中だけ ingame/ を sys.path と sys.modules に登録し、
+    終わったら取り除きます。返されたモジュールは自分の config / ai を
+    保持しているので、複数スロットのモジュールを同時に持てます。
+
+    cache=True の場合、同じスロットで ingame/ の内容が前回と同じなら
+    前回のモジュールを返します（スロットごとに別のモジュール）。
+    AI_SOURCES だけが変わっていれば、ai モジュールが使っているファイル
+    （ai_sources）が変わった場合だけ ai モジュールを読み直して差し替えます。
+    モジュールのグローバルを書き換えて使う場合
+    （リプレイなど）は cache=False で専用のモジュールをロードしてください。
+
+    Args:
+        slot_path: SAVEディレクトリのパス
+        cache: キャッシュを使うかどうか
+
+    Returns:
+        実行済みの game モジュール
+
+    Raises:
+        FileNotFoundError: game.py が存在しない
+        ImportError: game.py をロードできない
     """
     slot_path = Path(slot_path)
     ingame_dir = slot_path / "ingame"
     game_file = ingame_dir / "game.py"
 
     if not game_file.exists():
-        print(f"Error: {game_file} not found")
-        print("Please run 'setup' from Manage Saves menu first.")
+        raise FileNotFoundError(f"{game_file} not found")
+
+    if not cache:
+        return _exec_game_module(ingame_dir)
+
+    key = slot_path.resolve()
+    digests = source_digests(ingame_dir)
+    cached = _module_cache.get(key)
+    if cached is not None:
+        old_digests, game_module = cached
+        changed = {
+            name for name in old_digests.keys() | digests.keys()
+            if old_digests.get(name) != digests.get(name)
+        }
+        if changed and changed <= AI_SOURCES and hasattr(game_module, "ai_module"):
+            if changed & ai_sources(game_module.ai_module):
+                game_module.ai_module = load_ai_module(ingame_dir)
+            changed = set()
+        if not changed:
+            _module_cache[key] = (digests, game_module)
+            _module_cache.move_to_end(key)
+            return game_module
+
+    game_module = _exec_game_module(ingame_dir)
+    _module_cache[key] = (digests, game_module)
+    _module_cache.move_to_end(key)
+    while len(_module_cache) > MODULE_CACHE_SIZE:
+        _module_cache.popitem(last=False)
+    return game_module
+
+
+def ai_sources(ai_module: ModuleType | None) -> frozenset[str]:
+    """
+    ai モジュールが読み込んだ ingame/ のファイル
+
+    ai.py と、ai.py が import した rules.py / hooks.py。
+    game.py は rules.py / hooks.py を使わないので、ai.py が import して
+    いなければ、これらを変更してもゲームには影響しない。
+
+    Args:
+        ai_module: ai モジュール（ai.py がなければNone）
+
+    Returns:
+        ファイル名の集合
+    """
+    return getattr(ai_module, "__ingame_sources__", frozenset({"ai.py"}))
+
+
+def _record_ai_sources(ai_module: ModuleType | None) -> None:
+    """ロード直後（sys.modules を片付ける前）に ai モジュールが import したファイルを記録する"""
+    if ai_module is None:
         return
+    ai_module.__ingame_sources__ = frozenset(
+        {"ai.py"} | {f"{name}.py" for name in _AI_DEPENDENCIES if name in sys.modules}
+    )
+
+
+def load_ai_module(ingame_dir: Path) -> ModuleType | None:
+    """
+    ingame/ai.py だけをロードする（game.py の import ai と同じ扱い）
+
+    Returns:
+        ai モジュール。ai.py がなければNone
+
+    Raises:
+        ImportError: ai.py をロードできない
+        Exception: ai.py の実行中のエラー（SyntaxError など）
+    """
+    ai_file = ingame_dir / "ai.py"
+    if not ai_file.exists():
+        return None
+
+    spec = importlib.util.spec_from_file_location("ai", ai_file)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load {ai_file}")
 
-    # ingameディレクトリをsys.pathに追加（モジュールインポート用）
     ingame_str = str(ingame_dir)
     if ingame_str not in sys.path:
         sys.path.insert(0, ingame_str)
 
+    ai_module = importlib.util.module_from_spec(spec)
+    sys.modules["ai"] = ai_module
+    try:
+        spec.loader.exec_module(ai_module)
+        _record_ai_sources(ai_module)
+        return ai_module
+    finally:
+        for name in _SLOT_MODULE_NAMES:
+            sys.modules.pop(name, None)
+        if ingame_str in sys.path:
+            sys.path.remove(ingame_str)
+
+
+def _exec_game_module(ingame_dir: Path) -> ModuleType:
+    """ingame/game.py を新しいモジュールとして実行する（load_game_module を参照）"""
+    game_file = ingame_dir / "game.py"
+
     # game.pyを動的にロード
     spec = importlib.util.spec_from_file_location("ingame.game", game_file)
     if spec is None or spec.loader is None:
-        print(f"Error: Cannot load {game_file}")
-        return
+        raise ImportError(f"Cannot load {game_file}")
+
+    # ingameディレクトリをsys.pathに追加（モジュールインポート用）
+    ingame_str = str(ingame_dir)
+    if ingame_str not in sys.path:
+        sys.path.insert(0, ingame_str)
 
     game_module = importlib.util.module_from_spec(spec)
 
@@ -43,22 +234,51 @@ def run_game(slot_path: Path) -> None:
     sys.modules["ingame"] = game_module
     sys.modules["ingame.game"] = game_module
 
-    # configもロード
-    config_file = ingame_dir / "config.py"
-    if config_file.exists():
-        config_spec = importlib.util.spec_from_file_location("ingame.config", config_file)
-        if config_spec and config_spec.loader:
-            config_module = importlib.util.module_from_spec(config_spec)
-            sys.modules["ingame.config"] = config_module
-            sys.modules["config"] = config_module  # 直接インポート用
-            try:
-                config_spec.loader.exec_module(config_module)
-            except Exception as e:
-                print(f"Warning: Error loading config: {e}")
-
-    # game.pyを実行
     try:
+        # configもロード
+        config_file = ingame_dir / "config.py"
+        if config_file.exists():
+            config_spec = importlib.util.spec_from_file_location("ingame.config", config_file)
+            if config_spec and config_spec.loader:
+                config_module = importlib.util.module_from_spec(config_spec)
+                sys.modules["ingame.config"] = config_module
+                sys.modules["config"] = config_module  # 直接インポート用
+                try:
+                    config_spec.loader.exec_module(config_module)
+                except Exception as e:
+                    print(f"Warning: Error loading config: {e}")
+
+        # game.pyを実行
         spec.loader.exec_module(game_module)
+        _record_ai_sources(getattr(game_module, "ai_module", None))
+        return game_module
+
+    finally:
+        # クリーンアップ
+        for name in _SLOT_MODULE_NAMES:
+            sys.modules.pop(name, None)
+        # sys.pathからingameディレクトリを削除
+        if ingame_str in sys.path:
+            sys.path.remove(ingame_str)
+
+
+def run_game(slot_path: Path) -> None:
+    """
+    SAVEスロットからゲームを実行
+
+    Args:
+        slot_path: SAVEディレクトリのパス（例: saves/SAVE_A）
+    """
+    slot_path = Path(slot_path)
+    game_file = slot_path / "ingame" / "game.py"
+
+    if not game_file.exists():
+        print(f"Error: {game_file} not found")
+        print("Please run 'setup' from Manage Saves menu first.")
+        return
+
+    try:
+        game_module = load_game_module(slot_path)
 
         # run関数を呼び出し
         if hasattr(game_module, "run"):
@@ -70,17 +290,3 @@ def run_game(slot_path: Path) -> None:
         print(f"Error running game: {e}")
         import traceback
         traceback.print_exc()
-
-    finally:
-        # クリーンアップ
-        if "ingame" in sys.modules:
-            del sys.modules["ingame"]
-        if "ingame.game" in sys.modules:
-            del sys.modules["ingame.game"]
-        if "ingame.config" in sys.modules:
-            del sys.modules["ingame.config"]
-        if "config" in sys.modules:
-            del sys.modules["config"]
-        # sys.pathからingameディレクトリを削除
-        if ingame_str in sys.path:
-            sys.path.remove(ingame_str)
@@ -5,14 +5,36 @@ OutGameメニュー
 InGame直起動を禁止し、必ずOutGameメニューから開始する。
 """
 
+from fnmatch import fnmatchcase
 from pathlib import Path
 from typing import Callable
 
-from src.outgame.save_manager import SaveManager, SlotName, SLOTS
+from src.outgame.save_manager import SaveManager, SlotName, SlotStatus, is_valid_slot_name
 from src.outgame.stage_manager import StageManager, StageInfo
 from src.outgame.readme_viewer import display_readme
 
 
+# メイン画面に表示する最近のスロット数と、スロット選択画面の1ページの件数
+RECENT_SLOTS = 5
+SLOT_PAGE_SIZE = 10
+
+
+def normalize_slot_name(name: str) -> SlotName:
+    """入力されたスロット名を整える（1文字の名前は a → A のように大文字にする）"""
+    name = name.strip()
+    return name.upper() if len(name) == 1 else name
+
+
+def describe_slot(status: SlotStatus) -> str:
+    """スロットの状態を1行で表す"""
+    if status.error:
+        return "[Broken] (reset to recover)"
+    if not status.ready:
+        return "[Empty]"
+    stage_name = status.loaded_stage or "default"
+    return f"[{stage_name}] Turn {status.turn}"
+
+
 class OutGameMenu:
     """OutGameメニュークラス"""
 
@@ -47,15 +69,15 @@ class OutGameMenu:
         print()
 
     def show_slot_status(self) -> None:
-        """スロット状態を表示"""
-        print("--- SAVE Slots ---")
-        for status in self.save_manager.status():
-            if not status.exists or not status.ready:
-                state = "[Empty]"
-            else:
-                stage_name = status.loaded_stage or "default"
-                state = f"[{stage_name}] Turn {status.turn}"
-            print(f"  {status.name}: {state}")
+        """最近プレイしたスロットの状態を表示"""
+        recent = self.save_manager.list_slots(sort="last_played", page_size=RECENT_SLOTS)
+        print(f"--- SAVE Slots ({recent.total}) ---")
+        if not recent.items:
+            print("  (no slots yet)")
+        for status in recent.items:
+            print(f"  {status.name}: {describe_slot(status)}")
+        if recent.total > len(recent.items):
+            print(f"  ... and {recent.total - len(recent.items)} more")
         print()
 
     def show_main_menu(self) -> str:
@@ -66,18 +88,89 @@ class OutGameMenu:
 
         print("--- Menu ---")
         print("  1) New Game")
-        print("  2) Continue A")
-        print("  3) Continue B")
-        print("  4) Continue C")
-        print("  5) Manage Saves")
-        print("  6) Readme")
-        print("  7) Quit")
+        print("  2) Continue")
+        print("  3) Manage Saves")
+        print("  4) Readme")
+        print("  5) Quit")
         print()
 
-        return input("Select (1-7): ").strip()
+        return input("Select (1-5): ").strip()
+
+    def select_slot(self, title: str, ready_only: bool = False, allow_new: bool = False) -> SlotName | None:
+        """
+        スロット選択画面（ページ送り・Stageでの絞り込み付き）
+
+        Args:
+            title: 画面のタイトル
+            ready_only: プレイ可能なスロットだけを表示する
+            allow_new: 存在しない新しいスロット名の入力を受け付ける
+
+        Returns:
+            選ばれたスロット名。戻る場合はNone
+        """
+        page = 0
+        stage_filter = None
+
+        while True:
+            result = self.save_manager.list_slots(
+                stage=stage_filter,
+                ready_only=ready_only,
+                sort="last_played",
+                page=page,
+                page_size=SLOT_PAGE_SIZE,
+            )
+
+            self.clear_screen()
+            self.show_header()
+            print(f"=== {title} ===")
+            if stage_filter:
+                print(f"Stage filter: {stage_filter}")
+            print(f"Page {result.page + 1}/{result.pages} ({result.total} slots)")
+            print()
+            for status in result.items:
+                print(f"  {status.name}: {describe_slot(status)}")
+            if not result.items:
+                print("  (no slots)")
+            print()
+            print("  <name>        : select slot" + (" (new name creates a slot)" if allow_new else ""))
+            print("  n / p         : next / previous page")
+            print("  /<stage>      : filter by stage (/ alone clears)")
+            print("  0             : back")
+            print()
+
+            choice = input("Slot> ").strip()
+
+            if choice == "0" or not choice:
+                return None
+            if choice.lower() == "n":
+                page = min(page + 1, result.pages - 1)
+                continue
+            if choice.lower() == "p":
+                page = max(page - 1, 0)
+                continue
+            if choice.startswith("/"):
+                stage_filter = choice[1:].strip() or None
+                page = 0
+                continue
+
+            name = normalize_slot_name(choice)
+            status = self.save_manager.registry.get(name)
+            if status is not None and (status.ready or not ready_only):
+                return name
+
+            if allow_new and status is None and is_valid_slot_name(name):
+                return name
+
+            print(f"Invalid selection: {choice}")
+            input("Press Enter to continue...")
+
+    def handle_continue(self, slot: SlotName | None = None) -> None:
+        """Continue処理（slot 未指定ならスロット選択画面を出す）"""
+        if slot is None:
+            slot = self.select_slot("Continue", ready_only=True)
+            if slot is None:
+                return
 
-    def handle_continue(self, slot: SlotName) -> None:
-        """Continue処理"""
         if not self.save_manager.is_ready(slot):
             print(f"\nSAVE_{slot} is not ready.")
             print("Use 'New Game' to start a new game, or 'Manage Saves' to setup.")
@@ -91,6 +184,8 @@ class OutGameMenu:
 
         if self.on_play:
             self.on_play(slot, slot_path)
+            # プレイ後の meta.json を一覧に反映
+            self.save_manager.get_slot_status(slot)
         else:
             print("(No game handler registered)")
             input("Press Enter to continue...")
@@ -109,7 +204,7 @@ class OutGameMenu:
 
         # Step 3: 確認と実行
         status = self.save_manager.get_slot_status(slot)
-        if status.ready:
+        if status.exists:
             confirm = input(f"\nSAVE_{slot} will be overwritten. Continue? (y/N): ")
             if confirm.lower() != "y":
                 print("Cancelled.")
@@ -126,6 +221,7 @@ class OutGameMenu:
             slot_path = self.save_manager.get_slot_path(slot)
             if self.on_play:
                 self.on_play(slot, slot_path)
+                self.save_manager.get_slot_status(slot)
         else:
             print("Failed to setup slot.")
             input("Press Enter to continue...")
@@ -170,40 +266,8 @@ class OutGameMenu:
         return None
 
     def show_slot_selection(self, stage: StageInfo) -> SlotName | None:
-        """Slot選択画面"""
-        self.clear_screen()
-        self.show_header()
-
-        print(f"=== {stage.name} ===")
-        if stage.description_ja:
-            print(f"{stage.description_ja}")
-        print()
-        print("Select Slot:")
-        print()
-
-        for slot in SLOTS:
-            status = self.save_manager.get_slot_status(slot)
-            if status.ready:
-                stage_name = status.loaded_stage or "default"
-                print(f"  {slot}) SAVE_{slot} [{stage_name}] Turn {status.turn} <- OVERWRITE")
-            else:
-                print(f"  {slot}) SAVE_{slot} [Empty]")
-
-        print()
-        print("  0) Back")
-        print()
-
-        choice = input("Slot> ").strip().upper()
-
-        if choice == "0" or not choice:
-            return None
-
-        if choice in SLOTS:
-            return choice  # type: ignore
-
-        print(f"Invalid selection: {choice}")
-        input("Press Enter to continue...")
-        return None
+        """Slot選択画面（既存スロットへの上書き、または新しいスロット名）"""
+        return self.select_slot(f"{stage.name} - Select Slot", allow_new=True)
 
     def show_manage_menu(self) -> None:
         """Manage Savesメニュー"""
@@ -214,37 +278,88 @@ class OutGameMenu:
 
             print("--- Manage Saves ---")
             print("Commands:")
-            print("  status      : Show slot status")
-            print("  setup A|B|C : Initialize slot from template")
-            print("  reset A|B|C : Reset slot to template state")
-            print("  delete A|B|C: Delete slot data")
-            print("  copy A B    : Copy slot A to B")
-            print("  back        : Return to main menu")
+            print("  list [stage]              : List slots (paged)")
+            print("  status <name|pattern>...  : Show slot details")
+            print("  setup <name>... [@stage]  : Initialize slots from template")
+            print("  reset <name|pattern>...   : Reset slots to template state")
+            print("  delete <name|pattern>...  : Delete slots")
+            print("  copy <src> <dest>         : Copy slot")
+            print("  unshare <name|pattern>... : Make shared files (game.py) editable")
+            print("  back                      : Return to main menu")
+            print("  (patterns like LAB_* select many slots)")
             print()
 
-            cmd = input("Command: ").strip().lower()
+            line = input("Command: ").strip()
+            cmd, _, args = line.partition(" ")
+            cmd = cmd.lower()
+            args = args.strip()
 
             if cmd == "back" or cmd == "":
                 break
+            elif cmd == "list":
+                self._cmd_list(args or None)
             elif cmd == "status":
-                self._cmd_status()
-            elif cmd.startswith("setup "):
-                self._cmd_setup(cmd[6:].strip().upper())
-            elif cmd.startswith("reset "):
-                self._cmd_reset(cmd[6:].strip().upper())
-            elif cmd.startswith("delete "):
-                self._cmd_delete(cmd[7:].strip().upper())
-            elif cmd.startswith("copy "):
-                self._cmd_copy(cmd[5:].strip().upper())
+                self._cmd_status(args)
+            elif cmd == "setup":
+                self._cmd_setup(args)
+            elif cmd == "reset":
+                self._cmd_reset(args)
+            elif cmd == "delete":
+                self._cmd_delete(args)
+            elif cmd == "copy":
+                self._cmd_copy(args)
+            elif cmd == "unshare":
+                self._cmd_unshare(args)
             else:
-                print(f"Unknown command: {cmd}")
+                print(f"Unknown command: {line}")
                 input("Press Enter to continue...")
 
-    def _cmd_status(self) -> None:
+    def _expand_slots(self, args: str) -> list[SlotName]:
+        """スロット名とパターン（LAB_* など）を既存のスロット名に展開する"""
+        names = self.save_manager.registry.names()
+        selected: list[SlotName] = []
+        for pattern in args.split():
+            if any(ch in pattern for ch in "*?["):
+                selected.extend(name for name in names if fnmatchcase(name, pattern))
+            elif normalize_slot_name(pattern) in names:
+                selected.append(normalize_slot_name(pattern))
+        return list(dict.fromkeys(selected))
+
+    @staticmethod
+    def _preview(slots: list[SlotName]) -> str:
+        """確認メッセージ用にスロット名を短く並べる"""
+        more = " ..." if len(slots) > 5 else ""
+        return f"{len(slots)} slot(s) ({', '.join(slots[:5])}{more})"
+
+    def _cmd_list(self, stage: str | None) -> None:
+        """list コマンド"""
+        page = 0
+        while True:
+            result = self.save_manager.list_slots(stage=stage, page=page, page_size=SLOT_PAGE_SIZE)
+            print()
+            label = f" [{stage}]" if stage else ""
+            print(f"=== Slots{label} page {result.page + 1}/{result.pages} ({result.total}) ===")
+            for status in result.items:
+                print(f"  {status.name}: {describe_slot(status)}")
+            if result.page + 1 >= result.pages:
+                break
+            if input("Enter for next page, q to stop: ").strip().lower() == "q":
+                return
+            page += 1
+        input("Press Enter to continue...")
+
+    def _cmd_status(self, args: str) -> None:
         """status コマンド"""
+        slots = self._expand_slots(args)
+        if not slots:
+            print("Usage: status <name>  (name or pattern of an existing slot)")
+            input("Press Enter to continue...")
+            return
+
         print()
         print("=== Detailed Status ===")
-        for status in self.save_manager.status():
+        for slot in slots:
+            status = self.save_manager.get_slot_status(slot)
             print(f"\nSAVE_{status.name}:")
             print(f"  Exists: {status.exists}")
             print(f"  Ready: {status.ready}")
@@ -255,52 +370,67 @@ class OutGameMenu:
             if status.last_played:
                 print(f"  Last Played: {status.last_played}")
             print(f"  Turn: {status.turn}")
+            if status.error:
+                print(f"  Error: {status.error}")
+            shared = self.save_manager.shared_files(slot)
+            if shared:
+                print(f"  Shared (read-only): {', '.join(shared)}")
         print()
         input("Press Enter to continue...")
 
-    def _cmd_setup(self, slot: str) -> None:
-        """setup コマンド"""
-        if slot not in SLOTS:
-            print(f"Invalid slot: {slot}. Use A, B, or C.")
+    def _report(self, action: str, results: dict[SlotName, bool]) -> None:
+        """一括操作の結果を表示"""
+        done = [slot for slot, ok in results.items() if ok]
+        failed = [slot for slot, ok in results.items() if not ok]
+        print(f"{action}: {len(done)} succeeded, {len(failed)} failed.")
+        if failed:
+            print(f"  Failed: {', '.join(failed[:20])}{' ...' if len(failed) > 20 else ''}")
+
+    def _cmd_setup(self, args: str) -> None:
+        """setup コマンド（setup LAB_01 LAB_02 @step_09）"""
+        stage_id = None
+        names = []
+        for word in args.split():
+            if word.startswith("@"):
+                stage_id = word[1:] or None
+            else:
+                names.append(normalize_slot_name(word))
+
+        invalid = [name for name in names if not is_valid_slot_name(name)]
+        if not names or invalid:
+            print(f"Invalid slot name: {' '.join(invalid)}" if invalid else "Usage: setup <name>... [@stage]")
             input("Press Enter to continue...")
             return
 
-        if self.save_manager.setup(slot):  # type: ignore
-            print(f"SAVE_{slot} initialized successfully.")
-        else:
-            print(f"Failed to setup SAVE_{slot}. It may already exist.")
+        self._report("Setup", self.save_manager.bulk_setup(names, stage_id))
         input("Press Enter to continue...")
 
-    def _cmd_reset(self, slot: str) -> None:
+    def _cmd_reset(self, args: str) -> None:
         """reset コマンド"""
-        if slot not in SLOTS:
-            print(f"Invalid slot: {slot}. Use A, B, or C.")
+        slots = self._expand_slots(args)
+        if not slots:
+            print("No matching slots.")
             input("Press Enter to continue...")
             return
 
-        confirm = input(f"Reset SAVE_{slot}? All data will be lost. (y/N): ")
+        confirm = input(f"Reset {self._preview(slots)}? All data will be lost. (y/N): ")
         if confirm.lower() == "y":
-            if self.save_manager.reset(slot):  # type: ignore
-                print(f"SAVE_{slot} reset successfully.")
-            else:
-                print(f"Failed to reset SAVE_{slot}.")
+            self._report("Reset", self.save_manager.bulk_reset(slots))
         else:
             print("Cancelled.")
         input("Press Enter to continue...")
 
-    def _cmd_delete(self, slot: str) -> None:
+    def _cmd_delete(self, args: str) -> None:
         """delete コマンド"""
-        if slot not in SLOTS:
-            print(f"Invalid slot: {slot}. Use A, B, or C.")
+        slots = self._expand_slots(args)
+        if not slots:
+            print("No matching slots.")
             input("Press Enter to continue...")
             return
 
-        confirm = input(f"Delete SAVE_{slot}? All data will be lost. (y/N): ")
+        confirm = input(f"Delete {self._preview(slots)}? All data will be lost. (y/N): ")
         if confirm.lower() == "y":
-            if self.save_manager.delete(slot):  # type: ignore
-                print(f"SAVE_{slot} deleted.")
-            else:
-                print(f"Failed to delete SAVE_{slot}.")
+            self._report("Delete", self.save_manager.bulk_delete(slots))
         else:
             print("Cancelled.")
         input("Press Enter to continue...")
@@ -309,13 +439,13 @@ class OutGameMenu:
         """copy コマンド"""
         parts = args.split()
         if len(parts) != 2:
-            print("Usage: copy A B")
+            print("Usage: copy <src> <dest>")
             input("Press Enter to continue...")
             return
 
-        src, dest = parts
-        if src not in SLOTS or dest not in SLOTS:
-            print(f"Invalid slots. Use A, B, or C.")
+        src, dest = (normalize_slot_name(part) for part in parts)
+        if not is_valid_slot_name(src) or not is_valid_slot_name(dest):
+            print("Invalid slot name.")
             input("Press Enter to continue...")
             return
 
@@ -326,7 +456,7 @@ class OutGameMenu:
 
         confirm = input(f"Copy SAVE_{src} to SAVE_{dest}? (y/N): ")
         if confirm.lower() == "y":
-            if self.save_manager.copy(src, dest):  # type: ignore
+            if self.save_manager.copy(src, dest):
                 print(f"Copied SAVE_{src} to SAVE_{dest}.")
             else:
                 print(f"Failed to copy. SAVE_{src} may not exist.")
@@ -334,6 +464,19 @@ class OutGameMenu:
             print("Cancelled.")
         input("Press Enter to continue...")
 
+    def _cmd_unshare(self, args: str) -> None:
+        """unshare コマンド（共有ファイルをスロット専用のコピーにして編集できるようにする）"""
+        slots = self._expand_slots(args)
+        if not slots:
+            print("No matching slots.")
+            input("Press Enter to continue...")
+            return
+
+        for slot in slots:
+            files = self.save_manager.materialize(slot)
+            print(f"SAVE_{slot}: {', '.join(files) if files else 'nothing shared'}")
+        input("Press Enter to continue...")
+
     def run(self) -> None:
         """メニューループを実行"""
         self.running = True
@@ -344,16 +487,12 @@ class OutGameMenu:
             if choice == "1":
                 self.handle_new_game()
             elif choice == "2":
-                self.handle_continue("A")
+                self.handle_continue()
             elif choice == "3":
-                self.handle_continue("B")
-            elif choice == "4":
-                self.handle_continue("C")
-            elif choice == "5":
                 self.show_manage_menu()
-            elif choice == "6":
+            elif choice == "4":
                 display_readme(self.base_path)
-            elif choice == "7":
+            elif choice == "5":
                 self.running = False
                 print("\nGoodbye!")
             else:
@@ -0,0 +1,98 @@
+"""
+メタデータのインデックス
+
+meta.json や stage.json を毎回読み直さないためのキャッシュです。
+各エントリにはファイルの mtime とサイズなど（シグネチャ）を一緒に保存し、
+シグネチャが変わったエントリだけを読み直します。
+
+インデックスはJSONファイルに保存されるので、次回の起動時にも使われます。
+壊れていたり形式が古かったりした場合は、空のインデックスから作り直します。
+"""
+
+from pathlib import Path
+from typing import Any
+
+from src.core.safe_io import CorruptFileError, read_json_checked, write_json_checked
+
+
+INDEX_VERSION = 1
+
+
+def file_signature(path: Path) -> list[int] | None:
+    """
+    ファイルのシグネチャ（[mtime_ns, サイズ, inode]）を返す
+
+    セーブは一時ファイル + rename で書かれ、書くたびに inode が変わるので、
+    mtime の分解能より短い間隔で同じサイズに書き直されても変更を見逃さない。
+
+    Returns:
+        シグネチャ。ファイルがなければNone
+    """
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size, stat.st_ino]
+
+
+class MetadataIndex:
+    """シグネチャで検証するメタデータのキャッシュ"""
+
+    def __init__(self, index_path: Path) -> None:
+        """
+        Args:
+            index_path: インデックスを保存するJSONファイルのパス
+        """
+        self.index_path = Path(index_path)
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._dirty = False
+
+        try:
+            data = read_json_checked(self.index_path)
+        except (FileNotFoundError, CorruptFileError):
+            return
+        if data.get("version") == INDEX_VERSION:
+            self._entries = data.get("entries", {})
+
+    def lookup(self, key: str, signature: Any) -> Any | None:
+        """
+        シグネチャが一致するキャッシュを返す
+
+        Args:
+            key: エントリのキー（スロット名、Stage ディレクトリ名など）
+            signature: 現在のシグネチャ（JSONにできる値）
+
+        Returns:
+            キャッシュされたデータ。ない、または古ければNone
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry["sig"] != signature:
+            return None
+        return entry["data"]
+
+    def store(self, key: str, signature: Any, data: Any) -> None:
+        """エントリを保存する（ファイルへの書き込みは save() で行う）"""
+        self._entries[key] = {"sig": signature, "data": data}
+        self._dirty = True
+
+    def discard(self, key: str) -> None:
+        """エントリを削除する"""
+        if self._entries.pop(key, None) is not None:
+            self._dirty = True
+
+    def retain(self, keys: set[str]) -> None:
+        """keys 以外のエントリを削除する（消えたスロットやStageの掃除）"""
+        for key in [k for k in self._entries if k not in keys]:
+            self.discard(key)
+
+    def save(self) -> None:
+        """変更があればインデックスをファイルに書き込む"""
+        if not self._dirty:
+            return
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            write_json_checked(self.index_path, {"version": INDEX_VERSION, "entries": self._entries})
+        except OSError:
+            # 書けなくてもキャッシュはメモリ上で使える
+            return
+        self._dirty = False
@@ -0,0 +1,184 @@
+"""
+スロットのプロビジョニング（コピーオンライト）
+
+スロットを作るたびにテンプレートを丸ごとコピーする代わりに、
+変更されないファイル（game.py など）は内容アドレスのストア
+（saves/.store/objects/<sha256>）に1つだけ置き、各スロットからは
+ハードリンクで共有します。
+
+- 共有ファイルは読み取り専用にする（その場で書き換えて他のスロットまで
+  変わってしまう事故を防ぐ）
+- 編集したい時は materialize() でスロット専用のコピーに置き換える
+- ゲームのセーブ（state.json など）は一時ファイル + rename で書かれるので、
+  共有ファイルを上書きすることはない
+- ハードリンクが使えない環境（別のファイルシステムなど）では普通にコピーする
+
+copytree 方式との比較ベンチマークは src/outgame/provision_bench.py を参照。
+"""
+
+import hashlib
+import os
+import shutil
+import stat
+import threading
+from pathlib import Path
+from typing import Iterable
+
+
+STORE_DIR = ".store"
+
+# スロットにコピーしないディレクトリ
+IGNORED_DIRS = frozenset({"__pycache__"})
+
+_READ_ONLY = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+_WRITABLE = _READ_ONLY | stat.S_IWUSR
+
+
+class ObjectStore:
+    """内容（SHA-256）をファイル名にしたオブジェクトストア"""
+
+    def __init__(self, root: Path) -> None:
+        """
+        Args:
+            root: ストアのディレクトリ（スロットと同じファイルシステム上に置く）
+        """
+        self.root = Path(root)
+        self.objects_path = self.root / "objects"
+        # (パス, mtime_ns, サイズ) → オブジェクトのパス
+        self._digests: dict[tuple[str, int, int], Path] = {}
+        self._lock = threading.Lock()
+
+    def put(self, source: Path) -> Path:
+        """
+        ファイルをストアに入れる（同じ内容がすでにあればそれを返す）
+
+        Args:
+            source: 元のファイル
+
+        Returns:
+            ストア内のオブジェクトのパス（読み取り専用）
+        """
+        source = Path(source)
+        info = source.stat()
+        key = (str(source), info.st_mtime_ns, info.st_size)
+        with self._lock:
+            cached = self._digests.get(key)
+        if cached is not None and cached.exists():
+            return cached
+
+        data = source.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        obj = self.objects_path / digest[:2] / digest[2:]
+
+        if not obj.exists():
+            obj.parent.mkdir(parents=True, exist_ok=True)
+            tmp = obj.with_name(f"{obj.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.chmod(tmp, _READ_ONLY)
+            os.replace(tmp, obj)
+
+        with self._lock:
+            self._digests[key] = obj
+        return obj
+
+    def prune(self) -> int:
+        """
+        どのスロットからも使われていない（リンク数1の）オブジェクトを削除する
+
+        put() が書き込み中の一時ファイル（*.tmp）は、同時に動いている
+        プロビジョニングのものなので消さない。
+
+        Returns:
+            削除した数
+        """
+        removed = 0
+        if not self.objects_path.exists():
+            return removed
+        for obj in self.objects_path.glob("*/*"):
+            if obj.suffix == ".tmp":
+                continue
+            try:
+                if obj.stat().st_nlink == 1:
+                    os.chmod(obj, _WRITABLE)
+                    obj.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        with self._lock:
+            self._digests.clear()
+        return removed
+
+
+def link_or_copy(source: Path, dest: Path) -> bool:
+    """
+    ハードリンクを作る（できなければコピーする）
+
+    Returns:
+        リンクできたらTrue
+    """
+    try:
+        os.link(source, dest)
+        return True
+    except OSError:
+        shutil.copyfile(source, dest)
+        os.chmod(dest, _WRITABLE)
+        return False
+
+
+def is_shared(path: Path) -> bool:
+    """ストアと共有している（ハードリンクの）ファイルかどうか"""
+    info = Path(path).stat()
+    return info.st_nlink > 1 and not info.st_mode & stat.S_IWUSR
+
+
+def materialize(path: Path) -> bool:
+    """
+    共有ファイルをスロット専用の書き込み可能なコピーに置き換える
+
+    Returns:
+        置き換えたらTrue（もともと専用ファイルならFalse）
+    """
+    path = Path(path)
+    if not is_shared(path):
+        return False
+    tmp = path.with_name(path.name + ".tmp")
+    shutil.copyfile(path, tmp)
+    os.chmod(tmp, _WRITABLE)
+    os.replace(tmp, path)
+    return True
+
+
+def copy_shared_aware(source: str, dest: str) -> str:
+    """
+    shutil.copytree 用のコピー関数（共有ファイルはリンクを増やすだけにする）
+    """
+    if is_shared(Path(source)) and link_or_copy(Path(source), Path(dest)):
+        return dest
+    return shutil.copy2(source, dest)
+
+
+def remove_tree(path: Path) -> None:
+    """読み取り専用の共有ファイルを含むディレクトリを削除する"""
+
+    def make_writable(func, target, _exc_info) -> None:
+        # Windows では読み取り専用ファイルを消せないので書き込み可にして再試行
+        os.chmod(target, _WRITABLE)
+        func(target)
+
+    shutil.rmtree(path, onerror=make_writable)
+
+
+def template_files(root: Path, prefix: str = "") -> Iterable[tuple[str, Path]]:
+    """
+    テンプレートディレクトリ内のファイルを (相対パス, 実パス) で列挙する
+
+    Args:
+        root: テンプレートのディレクトリ
+        prefix: 相対パスの先頭に付ける文字列（"ingame/" など）
+    """
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in IGNORED_DIRS)
+        relative_dir = Path(dirpath).relative_to(root).as_posix()
+        base = prefix if relative_dir == "." else f"{prefix}{relative_dir}/"
+        for name in sorted(filenames):
+            yield base + name, Path(dirpath) / name
@@ -0,0 +1,92 @@
+"""
+スロットのプロビジョニングのベンチマーク
+
+テンプレートを丸ごとコピーする copytree 方式と、共有ファイルを
+ハードリンクする方式（src/outgame/provision.py）を比較します。
+
+provision は src.outgame パッケージの読み込み時に import されるので、
+ベンチマークはこの別モジュールから実行します。
+
+Usage:
+    python -m src.outgame.provision_bench --slots 500
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from src.core.safe_io import write_json_checked
+from src.outgame.save_manager import SaveManager
+
+
+def benchmark(slot_count: int = 500, stage_id: str = "step_09") -> dict[str, float]:
+    """
+    copytree 方式と共有方式でスロットを作る時間とディスク使用量を比較する
+
+    Returns:
+        各方式の所要時間（秒）とディスク使用量（バイト）
+    """
+
+    def disk_usage(root: Path) -> int:
+        seen: set[tuple[int, int]] = set()
+        total = 0
+        for dirpath, _, filenames in os.walk(root):
+            for name in filenames:
+                info = os.lstat(os.path.join(dirpath, name))
+                if (info.st_dev, info.st_ino) not in seen:
+                    seen.add((info.st_dev, info.st_ino))
+                    total += info.st_size
+        return total
+
+    base_path = Path(__file__).parent.parent.parent
+    templates = base_path / "templates"
+    names = [f"BENCH_{i:04d}" for i in range(slot_count)]
+    result: dict[str, float] = {"slots": slot_count}
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # 従来方式: テンプレートを丸ごとコピーしてStageのファイルを重ねる
+        copy_root = Path(tmpdir) / "copytree"
+        start = time.perf_counter()
+        for name in names:
+            slot_path = copy_root / f"SAVE_{name}"
+            shutil.copytree(templates / "ingame_default", slot_path / "ingame")
+            shutil.copy(templates / "state_default.json", slot_path / "state.json")
+            stage_path = templates / "stages" / stage_id
+            if (stage_path / "state.json").exists():
+                shutil.copy(stage_path / "state.json", slot_path / "state.json")
+            if (stage_path / "ingame").exists():
+                for file in (stage_path / "ingame").iterdir():
+                    if file.is_file() and file.name != "game.py":
+                        shutil.copy(file, slot_path / "ingame" / file.name)
+            # meta.json と log.txt は共有方式と同じように書く
+            write_json_checked(slot_path / "meta.json", {"slot": name, "loaded_stage": stage_id})
+            (slot_path / "log.txt").write_text(f"SAVE_{name} initialized\n", encoding="utf-8")
+        result["copytree"] = time.perf_counter() - start
+        result["copytree_bytes"] = disk_usage(copy_root)
+
+        # 共有方式
+        manager = SaveManager(base_path, saves_path=Path(tmpdir) / "shared")
+        start = time.perf_counter()
+        for name in names:
+            manager._setup(name, stage_id)
+        result["shared"] = time.perf_counter() - start
+        result["shared_bytes"] = disk_usage(manager.saves_path)
+
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Slot provisioning benchmark")
+    parser.add_argument("--slots", type=int, default=500)
+    parser.add_argument("--stage", default="step_09")
+    args = parser.parse_args()
+
+    result = benchmark(args.slots, args.stage)
+    print(f"Slots: {result['slots']}")
+    print(f"{'method':<10} {'time (ms)':>10} {'disk (KB)':>10}")
+    for method in ("copytree", "shared"):
+        print(f"{method:<10} {result[method] * 1000:>10.1f} {result[method + '_bytes'] / 1024:>10.0f}")
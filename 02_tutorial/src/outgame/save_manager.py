@@ -1,24 +1,54 @@
 """
 SAVEスロット管理
 
-SAVE_A, SAVE_B, SAVE_C の3スロットを管理する。
+任意の数のスロット（SAVE_A, SAVE_B, ..., SAVE_LAB_001 ...）を管理する。
+スロット名は英数字・"_"・"-" の32文字まで。
 各スロットには:
 - state.json: ゲーム状態
 - meta.json: メタデータ（作成日時、プレイ時間等）
 - log.txt: ゲームログ
 - ingame/: カスタムゲームロジック
+
+ingame/game.py などの変更しないファイルは saves/.store のファイルを
+ハードリンクで共有する（src/outgame/provision.py を参照）。
 """
 
 import json
+import re
 import shutil
+import threading
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Literal
+from typing import Callable, Iterable
+
+from src.core.safe_io import CorruptFileError, read_json_checked, write_json_checked
+from src.outgame.metadata_index import MetadataIndex, file_signature
+from src.outgame.provision import (
+    IGNORED_DIRS,
+    STORE_DIR,
+    ObjectStore,
+    copy_shared_aware,
+    is_shared,
+    link_or_copy,
+    materialize,
+    remove_tree,
+    template_files,
+)
+from src.outgame.slot_registry import SLOT_DIR_PREFIX, SlotPage, SlotRegistry, SortKey
+
+
+SlotName = str
+SLOT_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,32}$")
 
+# スロット間で共有するファイル（スロットからの相対パス）
+# 学生が編集するファイル（ai.py, rules.py, config.py など）はコピーする
+SHARED_FILES = frozenset({"ingame/game.py", "ingame/__init__.py"})
 
-SlotName = Literal["A", "B", "C"]
-SLOTS: tuple[SlotName, ...] = ("A", "B", "C")
+
+def is_valid_slot_name(slot: str) -> bool:
+    """スロット名として使えるかどうか"""
+    return bool(SLOT_NAME_PATTERN.match(slot))
 
 
 @dataclass
@@ -32,54 +62,104 @@ class SlotStatus:
     last_played: str | None = None
     turn: int = 0
     loaded_stage: str | None = None  # ロードされたStage ID
+    error: str | None = None  # meta.json が壊れている場合の理由
 
 
 class SaveManager:
     """SAVE管理クラス"""
 
-    def __init__(self, base_path: Path | None = None) -> None:
+    def __init__(self, base_path: Path | None = None, saves_path: Path | None = None) -> None:
         """
         Args:
             base_path: SAVEディレクトリの親パス（デフォルトは02_tutorial/）
+            saves_path: SAVEディレクトリの場所（デフォルトは base_path/saves）
         """
         if base_path is None:
             # このファイルから02_tutorial/を見つける
             base_path = Path(__file__).parent.parent.parent
         self.base_path = Path(base_path)
-        self.saves_path = self.base_path / "saves"
+        self.saves_path = Path(saves_path) if saves_path else self.base_path / "saves"
         self.templates_path = self.base_path / "templates"
 
+        # 共有ファイルの置き場所（ハードリンクのため saves/ と同じファイルシステムに置く）
+        self.store = ObjectStore(self.saves_path / STORE_DIR)
+
+        # meta.json の内容のキャッシュ（mtime とサイズが変わった時だけ読み直す）
+        self._index = MetadataIndex(self.saves_path / ".slot_index.json")
+
+        # スロット一覧（一括操作のスレッドと共有するのでロックも共有する）
+        self._lock = threading.RLock()
+        self.registry = SlotRegistry(
+            self.saves_path, self._slot_status, lock=self._lock, is_valid_name=is_valid_slot_name,
+        )
+
     def get_slot_path(self, slot: SlotName) -> Path:
-        """スロットのパスを取得"""
-        return self.saves_path / f"SAVE_{slot}"
+        """
+        スロットのパスを取得
+
+        Raises:
+            ValueError: スロット名が不正
+        """
+        if not is_valid_slot_name(slot):
+            raise ValueError(f"Invalid slot name: {slot!r}")
+        return self.saves_path / f"{SLOT_DIR_PREFIX}{slot}"
 
     def get_slot_status(self, slot: SlotName) -> SlotStatus:
-        """スロットの状態を取得"""
+        """スロットの状態を取得（ディスクを確認して一覧も更新する）"""
+        with self._lock:
+            status = self.registry.refresh_slot(slot)
+            self._index.save()
+        return status
+
+    def _slot_status(self, slot: SlotName) -> SlotStatus:
+        """スロットの状態を取得（インデックスの保存は呼び出し側で行う）"""
         slot_path = self.get_slot_path(slot)
 
         if not slot_path.exists():
+            self._index.discard(slot)
             return SlotStatus(name=slot, exists=False, ready=False)
 
         meta_path = slot_path / "meta.json"
         state_path = slot_path / "state.json"
 
         # ready = state.json と meta.json が両方存在
-        ready = meta_path.exists() and state_path.exists()
+        meta_signature = file_signature(meta_path)
+        ready = meta_signature is not None and state_path.exists()
+
+        cached = self._index.lookup(slot, meta_signature)
+        if cached is not None:
+            return SlotStatus(
+                name=slot,
+                exists=True,
+                ready=ready and cached["error"] is None,
+                **cached,
+            )
 
         created_at = None
         last_played = None
         turn = 0
         loaded_stage = None
+        error = None
 
         if meta_path.exists():
             try:
-                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                meta = read_json_checked(meta_path)
                 created_at = meta.get("created_at")
                 last_played = meta.get("last_played")
                 turn = meta.get("turn", 0)
                 loaded_stage = meta.get("loaded_stage")
-            except (json.JSONDecodeError, KeyError):
-                pass
+            except CorruptFileError as e:
+                # 既定値で「正常」に見せず、壊れていることを報告する
+                ready = False
+                error = str(e)
+
+        self._index.store(slot, meta_signature, {
+            "created_at": created_at,
+            "last_played": last_played,
+            "turn": turn,
+            "loaded_stage": loaded_stage,
+            "error": error,
+        })
 
         return SlotStatus(
             name=slot,
@@ -89,13 +169,151 @@ class SaveManager:
             last_played=last_played,
             turn=turn,
             loaded_stage=loaded_stage,
+            error=error,
         )
 
     def status(self) -> list[SlotStatus]:
-        """全スロットの状態を取得"""
-        return [self.get_slot_status(slot) for slot in SLOTS]
+        """全スロットの状態を取得（名前順）"""
+        with self._lock:
+            statuses = self.registry.all()
+            self._index.save()
+        return statuses
+
+    def list_slots(
+        self,
+        stage: str | None = None,
+        ready_only: bool = False,
+        sort: SortKey = "name",
+        page: int = 0,
+        page_size: int = 20,
+    ) -> SlotPage:
+        """
+        スロットを検索してページ単位で取得（SlotRegistry.query を参照）
+
+        Args:
+            stage: このStage ID のスロットだけにする（部分一致）
+            ready_only: プレイ可能なスロットだけにする
+            sort: "name" / "last_played"（新しい順）/ "turn"（多い順）
+            page: ページ番号（0から）
+            page_size: 1ページの件数
+        """
+        with self._lock:
+            result = self.registry.query(stage, ready_only, sort, page, page_size)
+            self._index.save()
+        return result
 
     def setup(self, slot: SlotName, stage_id: str | None = None) -> bool:
+        """
+        スロットをテンプレートから初期化（_setup を参照）
+
+        Returns:
+            成功したらTrue
+        """
+        return self._after(slot, self._setup(slot, stage_id))
+
+    def reset(self, slot: SlotName, stage_id: str | None = None) -> bool:
+        """
+        スロットをテンプレート状態にリセット（_reset を参照）
+
+        Returns:
+            成功したらTrue
+        """
+        return self._after(slot, self._reset(slot, stage_id))
+
+    def delete(self, slot: SlotName) -> bool:
+        """
+        スロットを削除
+
+        Returns:
+            成功したらTrue
+        """
+        result = self._after(slot, self._delete(slot))
+        self.store.prune()
+        return result
+
+    def copy(self, src: SlotName, dest: SlotName) -> bool:
+        """
+        スロットをコピー
+
+        Returns:
+            成功したらTrue
+        """
+        return self._after(dest, self._copy(src, dest))
+
+    def _after(self, slot: SlotName, result: bool) -> bool:
+        """操作後にスロット一覧を更新する"""
+        with self._lock:
+            self.registry.refresh_slot(slot)
+            self._index.save()
+        return result
+
+    # ----------------------------------------
+    # 一括操作（スレッドプールで並列に実行）
+    # ----------------------------------------
+
+    def bulk_setup(
+        self,
+        slots: Iterable[SlotName],
+        stage_id: str | None = None,
+        max_workers: int = 8,
+    ) -> dict[SlotName, bool]:
+        """
+        複数のスロットをまとめて初期化
+
+        Returns:
+            スロット名 → 成功したかどうか
+        """
+        return self._bulk(lambda slot: self._setup(slot, stage_id), slots, max_workers)
+
+    def bulk_reset(
+        self,
+        slots: Iterable[SlotName],
+        stage_id: str | None = None,
+        max_workers: int = 8,
+    ) -> dict[SlotName, bool]:
+        """複数のスロットをまとめてリセット"""
+        return self._bulk(lambda slot: self._reset(slot, stage_id), slots, max_workers)
+
+    def bulk_delete(self, slots: Iterable[SlotName], max_workers: int = 8) -> dict[SlotName, bool]:
+        """複数のスロットをまとめて削除"""
+        results = self._bulk(self._delete, slots, max_workers)
+        self.store.prune()
+        return results
+
+    def _bulk(
+        self,
+        operation: Callable[[SlotName], bool],
+        slots: Iterable[SlotName],
+        max_workers: int,
+    ) -> dict[SlotName, bool]:
+        """操作を並列に実行し、最後に一覧とインデックスを1回だけ更新する"""
+        # 一括操作の時だけ使うので、起動を速くするためここで読み込む
+        from concurrent.futures import ThreadPoolExecutor
+
+        names = list(dict.fromkeys(slots))
+        for slot in names:
+            self.get_slot_path(slot)  # 名前を先に検証する
+
+        def run(slot: SlotName) -> bool:
+            try:
+                return operation(slot)
+            except OSError:
+                return False
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            results = dict(zip(names, executor.map(run, names)))
+
+        with self._lock:
+            for slot in names:
+                self.registry.refresh_slot(slot)
+            self._index.save()
+        return results
+
+    # ----------------------------------------
+    # 個別操作の本体（一覧の更新は呼び出し側で行う）
+    # ----------------------------------------
+
+    def _setup(self, slot: SlotName, stage_id: str | None = None) -> bool:
         """
         スロットをテンプレートから初期化
 
@@ -107,6 +325,7 @@ class SaveManager:
             1. まず ingame_default をベースとしてコピー（game.py含む核心部分）
             2. Stage固有ファイル（state.json, ingame/config.py等）で上書き
             3. game.py は ingame_default のものを必ず使用（Stageは上書き不可）
+            4. SHARED_FILES はコピーせずストアのファイルをハードリンクする
 
         Returns:
             成功したらTrue
@@ -120,41 +339,13 @@ class SaveManager:
         # ディレクトリ作成
         slot_path.mkdir(parents=True, exist_ok=True)
 
-        # Step 1: ingame_default をベースとしてコピー（核心部分）
-        ingame_default = self.templates_path / "ingame_default"
-        ingame_dest = slot_path / "ingame"
-        if ingame_default.exists():
-            shutil.copytree(ingame_default, ingame_dest)
-
-        # Step 2: state.json をデフォルトからコピー
-        state_default = self.templates_path / "state_default.json"
-        if state_default.exists():
-            shutil.copy(state_default, slot_path / "state.json")
-
-        # Step 3: Stage固有ファイルで上書き（指定時のみ）
-        if stage_id:
-            stage_path = self.templates_path / "stages" / stage_id
-
-            if stage_path.exists():
-                # Stage固有のstate.jsonがあれば上書き
-                stage_state = stage_path / "state.json"
-                if stage_state.exists():
-                    shutil.copy(stage_state, slot_path / "state.json")
-
-                # Stage固有のingame/ファイルで上書き（game.py以外）
-                stage_ingame = stage_path / "ingame"
-                if stage_ingame.exists():
-                    for file in stage_ingame.iterdir():
-                        # game.py はスキップ（核心部分は上書きしない）
-                        if file.name == "game.py":
-                            continue
-                        dest_file = ingame_dest / file.name
-                        if file.is_file():
-                            shutil.copy(file, dest_file)
-                        elif file.is_dir():
-                            if dest_file.exists():
-                                shutil.rmtree(dest_file)
-                            shutil.copytree(file, dest_file)
+        for relative, source in self._provision_plan(stage_id).items():
+            dest = slot_path / relative
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            if relative in SHARED_FILES:
+                link_or_copy(self.store.put(source), dest)
+            else:
+                shutil.copyfile(source, dest)
 
         # meta.json を作成（stage.json の情報も含む）
         now = datetime.now().isoformat()
@@ -185,10 +376,7 @@ class SaveManager:
                 except json.JSONDecodeError:
                     pass
 
-        (slot_path / "meta.json").write_text(
-            json.dumps(meta, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
+        write_json_checked(slot_path / "meta.json", meta)
 
         # log.txt を作成
         stage_name = meta.get("stage_name") or stage_id or "default"
@@ -199,7 +387,82 @@ class SaveManager:
 
         return True
 
-    def reset(self, slot: SlotName, stage_id: str | None = None) -> bool:
+    def _provision_plan(self, stage_id: str | None) -> dict[str, Path]:
+        """
+        スロットに置くファイルの一覧を作る（_setup の手順 1〜3）
+
+        Returns:
+            スロットからの相対パス → コピー元のファイル
+        """
+        plan: dict[str, Path] = {}
+
+        # Step 1: ingame_default をベースにする（核心部分）
+        ingame_default = self.templates_path / "ingame_default"
+        if ingame_default.exists():
+            plan.update(template_files(ingame_default, "ingame/"))
+
+        # Step 2: state.json はデフォルトから
+        state_default = self.templates_path / "state_default.json"
+        if state_default.exists():
+            plan["state.json"] = state_default
+
+        # Step 3: Stage固有ファイルで上書き（指定時のみ）
+        if stage_id:
+            stage_path = self.templates_path / "stages" / stage_id
+
+            # Stage固有のstate.jsonがあれば上書き
+            stage_state = stage_path / "state.json"
+            if stage_state.exists():
+                plan["state.json"] = stage_state
+
+            # Stage固有のingame/ファイルで上書き（game.py以外）
+            stage_ingame = stage_path / "ingame"
+            if stage_ingame.exists():
+                for entry in stage_ingame.iterdir():
+                    # game.py はスキップ（核心部分は上書きしない）
+                    if entry.name == "game.py":
+                        continue
+                    if entry.is_file():
+                        plan[f"ingame/{entry.name}"] = entry
+                    elif entry.is_dir() and entry.name not in IGNORED_DIRS:
+                        # ディレクトリは中身ごと置き換える
+                        prefix = f"ingame/{entry.name}/"
+                        for key in [k for k in plan if k.startswith(prefix)]:
+                            del plan[key]
+                        plan.update(template_files(entry, prefix))
+
+        return plan
+
+    def materialize(self, slot: SlotName, relative: str | None = None) -> list[str]:
+        """
+        共有ファイルをスロット専用の編集できるコピーにする
+
+        Args:
+            slot: スロット名
+            relative: スロットからの相対パス（例: "ingame/game.py"）。
+                      未指定なら共有ファイルをすべて対象にする。
+
+        Returns:
+            専用コピーにしたファイルの相対パス
+        """
+        slot_path = self.get_slot_path(slot)
+        targets = [relative] if relative else sorted(SHARED_FILES)
+        materialized = []
+        for target in targets:
+            path = slot_path / target
+            if path.is_file() and materialize(path):
+                materialized.append(target)
+        return materialized
+
+    def shared_files(self, slot: SlotName) -> list[str]:
+        """スロット内の共有中（読み取り専用）のファイルの相対パス"""
+        slot_path = self.get_slot_path(slot)
+        return [
+            target for target in sorted(SHARED_FILES)
+            if (slot_path / target).is_file() and is_shared(slot_path / target)
+        ]
+
+    def _reset(self, slot: SlotName, stage_id: str | None = None) -> bool:
         """
         スロットをテンプレート状態にリセット
 
@@ -218,36 +481,25 @@ class SaveManager:
 
         # 未指定の場合は現在のloaded_stageを使用
         if stage_id is None:
-            status = self.get_slot_status(slot)
-            stage_id = status.loaded_stage
+            with self._lock:
+                stage_id = self._slot_status(slot).loaded_stage
 
         # 削除して再セットアップ
-        shutil.rmtree(slot_path)
-        return self.setup(slot, stage_id)
-
-    def delete(self, slot: SlotName) -> bool:
-        """
-        スロットを削除
+        remove_tree(slot_path)
+        return self._setup(slot, stage_id)
 
-        Returns:
-            成功したらTrue
-        """
+    def _delete(self, slot: SlotName) -> bool:
+        """スロットのディレクトリごと削除"""
         slot_path = self.get_slot_path(slot)
 
         if not slot_path.exists():
             return False
 
-        shutil.rmtree(slot_path)
-        slot_path.mkdir(parents=True, exist_ok=True)  # 空ディレクトリを残す
+        remove_tree(slot_path)
         return True
 
-    def copy(self, src: SlotName, dest: SlotName) -> bool:
-        """
-        スロットをコピー
-
-        Returns:
-            成功したらTrue
-        """
+    def _copy(self, src: SlotName, dest: SlotName) -> bool:
+        """スロットをコピー（宛先は上書き）"""
         src_path = self.get_slot_path(src)
         dest_path = self.get_slot_path(dest)
 
@@ -256,22 +508,24 @@ class SaveManager:
 
         # 宛先が存在する場合は削除
         if dest_path.exists():
-            shutil.rmtree(dest_path)
-
-        # コピー
-        shutil.copytree(src_path, dest_path)
+            remove_tree(dest_path)
+
+        # コピー（共有ファイルはリンクを増やすだけ、キャッシュはコピーしない）
+        shutil.copytree(
+            src_path,
+            dest_path,
+            copy_function=copy_shared_aware,
+            ignore=shutil.ignore_patterns(*IGNORED_DIRS),
+        )
 
         # meta.json を更新
         meta_path = dest_path / "meta.json"
         if meta_path.exists():
-            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            meta = read_json_checked(meta_path)
             meta["slot"] = dest
             meta["copied_from"] = src
             meta["copied_at"] = datetime.now().isoformat()
-            meta_path.write_text(
-                json.dumps(meta, ensure_ascii=False, indent=2),
-                encoding="utf-8",
-            )
+            write_json_checked(meta_path, meta)
 
         return True
 
@@ -0,0 +1,184 @@
+"""
+SAVEスロットのレジストリ
+
+スロットの一覧をメモリ上に持ち、ページ分け・Stageでの検索・
+最終プレイ日時での並べ替えを、スロットのディレクトリを読まずに行います。
+
+- 一覧は saves/ ディレクトリの mtime が変わった時だけ読み直す
+  （スロットの追加・削除でディレクトリの mtime が変わる）
+- 各スロットの状態は SaveManager の操作のたびに更新される
+- ゲームの外でプレイされたスロットは refresh_slot() / refresh(full=True) で更新する
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Literal
+
+if TYPE_CHECKING:
+    from src.outgame.save_manager import SlotStatus
+
+
+SLOT_DIR_PREFIX = "SAVE_"
+
+SortKey = Literal["name", "last_played", "turn"]
+
+
+@dataclass(frozen=True)
+class SlotPage:
+    """query() の結果（1ページ分）"""
+
+    items: tuple["SlotStatus", ...]
+    total: int
+    page: int
+    page_size: int
+
+    @property
+    def pages(self) -> int:
+        """総ページ数（最低1）"""
+        return max(1, -(-self.total // self.page_size))
+
+
+class SlotRegistry:
+    """スロットの状態をメモリ上で管理する"""
+
+    def __init__(
+        self,
+        saves_path: Path,
+        load_status: Callable[[str], "SlotStatus"],
+        lock: "threading.RLock | None" = None,
+        is_valid_name: Callable[[str], bool] = lambda name: True,
+    ) -> None:
+        """
+        Args:
+            saves_path: SAVEディレクトリの親
+            load_status: スロット名から SlotStatus を読む関数
+            lock: load_status と共有するロック（デッドロック防止のため同じものを使う）
+            is_valid_name: スロット名として扱うディレクトリ名かどうか
+        """
+        self.saves_path = Path(saves_path)
+        self._load_status = load_status
+        self._is_valid_name = is_valid_name
+        self._slots: dict[str, "SlotStatus"] = {}
+        self._listing_mtime: int | None = None
+        self._lock = lock or threading.RLock()
+
+    def _scan(self) -> list[str]:
+        """saves/ 直下の SAVE_* ディレクトリ名を列挙する（中身は読まない）"""
+        try:
+            with os.scandir(self.saves_path) as entries:
+                names = [
+                    entry.name[len(SLOT_DIR_PREFIX):]
+                    for entry in entries
+                    if entry.name.startswith(SLOT_DIR_PREFIX) and entry.is_dir()
+                ]
+        except FileNotFoundError:
+            return []
+        return [name for name in names if self._is_valid_name(name)]
+
+    def refresh(self, full: bool = False) -> None:
+        """
+        一覧を最新にする
+
+        Args:
+            full: True なら全スロットの状態も読み直す
+                  （meta.json はインデックスで変更分だけ読まれる）
+        """
+        with self._lock:
+            try:
+                mtime = self.saves_path.stat().st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+
+            if not full and mtime == self._listing_mtime:
+                return
+
+            names = set(self._scan())
+            for name in [n for n in self._slots if n not in names]:
+                del self._slots[name]
+            for name in names:
+                if full or name not in self._slots:
+                    self._slots[name] = self._load_status(name)
+            self._listing_mtime = mtime
+
+    def refresh_slot(self, name: str) -> "SlotStatus":
+        """1スロット分の状態を読み直す（消えていれば一覧から外す）"""
+        with self._lock:
+            status = self._load_status(name)
+            if status.exists:
+                self._slots[name] = status
+            else:
+                self._slots.pop(name, None)
+            return status
+
+    def get(self, name: str) -> "SlotStatus | None":
+        """スロットの状態（登録されていなければNone）"""
+        self.refresh()
+        with self._lock:
+            return self._slots.get(name)
+
+    def names(self) -> list[str]:
+        """全スロット名（名前順）"""
+        self.refresh()
+        with self._lock:
+            return sorted(self._slots)
+
+    def all(self) -> list["SlotStatus"]:
+        """全スロットの状態（名前順）"""
+        self.refresh()
+        with self._lock:
+            return [self._slots[name] for name in sorted(self._slots)]
+
+    def __len__(self) -> int:
+        self.refresh()
+        with self._lock:
+            return len(self._slots)
+
+    def query(
+        self,
+        stage: str | None = None,
+        ready_only: bool = False,
+        sort: SortKey = "name",
+        page: int = 0,
+        page_size: int = 20,
+    ) -> SlotPage:
+        """
+        スロットを検索してページ単位で返す
+
+        Args:
+            stage: このStage ID のスロットだけにする（部分一致）
+            ready_only: プレイ可能なスロットだけにする
+            sort: "name"（名前順）/ "last_played"（新しい順）/ "turn"（多い順）
+            page: ページ番号（0から）
+            page_size: 1ページの件数
+
+        Returns:
+            SlotPage
+        """
+        self.refresh()
+        with self._lock:
+            items = list(self._slots.values())
+
+        if stage:
+            items = [s for s in items if stage in (s.loaded_stage or "")]
+        if ready_only:
+            items = [s for s in items if s.ready]
+
+        if sort == "last_played":
+            # ISO形式の文字列なので文字列比較で新しい順になる
+            items.sort(key=lambda s: s.last_played or "", reverse=True)
+        elif sort == "turn":
+            items.sort(key=lambda s: s.turn, reverse=True)
+        else:
+            items.sort(key=lambda s: s.name)
+
+        page_size = max(1, page_size)
+        page = max(0, page)
+        start = page * page_size
+        return SlotPage(
+            items=tuple(items[start:start + page_size]),
+            total=len(items),
+            page=page,
+            page_size=page_size,
+        )
@@ -2,13 +2,17 @@
 Stage Discovery and Management
 
 templates/stages/ からStageを探索し、メタデータを提供します。
+stage.json の内容は .cache/stage_index.json にキャッシュし、
+mtime とサイズが変わったStageだけ読み直します。
 """
 
 import json
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Optional
 
+from src.outgame.metadata_index import MetadataIndex, file_signature
+
 
 @dataclass
 class StageInfo:
@@ -45,6 +49,7 @@ class StageManager:
             base_path = Path(__file__).parent.parent.parent
         self.base_path = Path(base_path)
         self.stages_path = self.base_path / "templates" / "stages"
+        self._index = MetadataIndex(self.base_path / ".cache" / "stage_index.json")
 
     def discover_stages(self) -> list[StageInfo]:
         """
@@ -60,12 +65,29 @@ class StageManager:
 
         for stage_dir in sorted(self.stages_path.iterdir()):
             if stage_dir.is_dir() and stage_dir.name.startswith("step_"):
-                info = self._load_stage_info(stage_dir)
+                info = self._cached_stage_info(stage_dir)
                 if info:
                     stages.append(info)
 
+        self._index.retain({stage.path.name for stage in stages})
+        self._index.save()
         return stages
 
+    def _cached_stage_info(self, stage_dir: Path) -> Optional[StageInfo]:
+        """Load stage info, reusing the index entry if stage.json and the directory are unchanged"""
+        # ディレクトリのmtimeは ingame/ や state.json の追加・削除で変わる
+        signature = [file_signature(stage_dir / "stage.json"), file_signature(stage_dir)]
+        cached = self._index.lookup(stage_dir.name, signature)
+        if cached is not None:
+            return StageInfo(**{**cached, "commands": tuple(cached["commands"]), "path": stage_dir})
+
+        info = self._load_stage_info(stage_dir)
+        if info:
+            data = asdict(info)
+            del data["path"]
+            self._index.store(stage_dir.name, signature, data)
+        return info
+
     def _load_stage_info(self, stage_dir: Path) -> Optional[StageInfo]:
         """Load stage info from directory"""
         stage_json = stage_dir / "stage.json"
@@ -0,0 +1,9 @@
+"""
+Serverモジュール
+
+1プロセスで多数のSAVEスロットを同時にホストするゲームサーバー。
+"""
+
+from src.server.game_server import GameServer, GameSession, serve
+
+__all__ = ["GameServer", "GameSession", "serve"]
@@ -0,0 +1,197 @@
+"""
+クライアントシミュレータ（負荷試験用）
+
+多数のクライアントを同時に接続し、ゲームサーバーにコマンドを送って
+応答時間とスループットを測定します。
+
+Usage:
+    # 一時ディレクトリにサーバーを立ててテスト
+    python -m src.server.client_sim --clients 60 --commands 50
+
+    # 起動済みのサーバーに接続
+    python -m src.server.client_sim --port 7777 --no-spawn
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.server.game_server import END_MARKER, GameServer
+
+
+# シミュレーションで送るコマンド（FSM/BT/GOAP系Stageで有効なもの）
+DEFAULT_COMMANDS = ("w", "a", "s", "d", "wait", "status")
+
+
+@dataclass
+class SimulationReport:
+    """負荷試験の結果"""
+
+    clients: int
+    commands: int
+    elapsed: float
+    latencies: list[float] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        """結果を人が読める文字列にする"""
+        rate = self.commands / self.elapsed if self.elapsed > 0 else 0.0
+        lines = [
+            f"Clients: {self.clients}",
+            f"Commands: {self.commands} in {self.elapsed:.2f}s ({rate:.0f} cmd/s)",
+        ]
+        if self.latencies:
+            ordered = sorted(self.latencies)
+            p95 = ordered[int(len(ordered) * 0.95) - 1] if len(ordered) >= 20 else ordered[-1]
+            lines.append(
+                f"Latency: p50={statistics.median(ordered) * 1000:.1f}ms "
+                f"p95={p95 * 1000:.1f}ms max={ordered[-1] * 1000:.1f}ms"
+            )
+        lines.append(f"Errors: {len(self.errors)}")
+        for error in self.errors[:5]:
+            lines.append(f"  {error}")
+        return "\n".join(lines)
+
+
+async def _read_response(reader: asyncio.StreamReader) -> str:
+    """END_MARKER までの応答を読む"""
+    lines = []
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("server closed connection")
+        text = line.decode("utf-8").rstrip("\n")
+        if text == END_MARKER:
+            return "\n".join(lines)
+        lines.append(text)
+
+
+async def simulate_client(
+    host: str,
+    port: int,
+    slot: str,
+    stage_id: str,
+    commands: list[str],
+    report: SimulationReport,
+) -> None:
+    """
+    1クライアント分のセッションを実行する
+
+    Args:
+        host: サーバーのホスト
+        port: サーバーのポート
+        slot: 使用するスロット名
+        stage_id: スロット作成時のStage ID
+        commands: 送信するコマンド列
+        report: 結果の記録先
+    """
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError as e:
+        report.errors.append(f"{slot}: connect failed: {e}")
+        return
+
+    try:
+        writer.write(f"HELLO {slot} {stage_id}\n".encode("utf-8"))
+        await writer.drain()
+        greeting = await _read_response(reader)
+        if greeting.startswith("ERROR"):
+            report.errors.append(f"{slot}: {greeting}")
+            return
+
+        for cmd in commands:
+            start = time.perf_counter()
+            writer.write(f"{cmd}\n".encode("utf-8"))
+            await writer.drain()
+            await _read_response(reader)
+            report.latencies.append(time.perf_counter() - start)
+
+        writer.write(b"quit\n")
+        await writer.drain()
+        await reader.readline()  # BYE
+
+    except ConnectionError as e:
+        report.errors.append(f"{slot}: {e}")
+
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def run_simulation(
+    host: str,
+    port: int,
+    clients: int = 60,
+    commands_per_client: int = 50,
+    stage_id: str = "step_09",
+    seed: int = 0,
+) -> SimulationReport:
+    """
+    多数のクライアントを同時に走らせる
+
+    Returns:
+        SimulationReport
+    """
+    rng = random.Random(seed)
+    report = SimulationReport(clients=clients, commands=clients * commands_per_client, elapsed=0.0)
+
+    tasks = []
+    for i in range(clients):
+        commands = [rng.choice(DEFAULT_COMMANDS) for _ in range(commands_per_client)]
+        tasks.append(simulate_client(host, port, f"SIM_{i:03d}", stage_id, commands, report))
+
+    start = time.perf_counter()
+    await asyncio.gather(*tasks)
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+async def _main_async(args: argparse.Namespace) -> SimulationReport:
+    if not args.spawn:
+        return await run_simulation(
+            args.host, args.port, args.clients, args.commands, args.stage, args.seed
+        )
+
+    # 一時ディレクトリをSAVE置き場にしてサーバーを同じプロセスで起動
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server = GameServer(saves_path=Path(tmpdir))
+        port = await server.start(args.host, 0)
+        try:
+            return await run_simulation(
+                args.host, port, args.clients, args.commands, args.stage, args.seed
+            )
+        finally:
+            await server.stop()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """コマンドラインエントリーポイント"""
+    parser = argparse.ArgumentParser(description="Game server load test")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--clients", type=int, default=60)
+    parser.add_argument("--commands", type=int, default=50, help="commands per client")
+    parser.add_argument("--stage", default="step_09", help="stage for new slots")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--no-spawn", dest="spawn", action="store_false",
+        help="connect to a running server instead of starting one",
+    )
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(_main_async(args))
+    print(report.summary())
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+"""
+マルチセッション ゲームサーバー
+
+1つのプロセスで多数のSAVEスロットを同時にホストするローカルTCPサーバー。
+演習で多人数が同時にプレイするためのものです。
+
+プロトコル（1行 = 1メッセージ、UTF-8）:
+    C: HELLO <slot> [<stage_id>]   スロットに接続（未作成ならstageで作成）
+    S: <画面> + END_MARKER
+    C: <コマンド>                   ゲーム内コマンド（w, wait, move player 1 2 ...）
+    S: <出力 + 画面> + END_MARKER
+    C: quit
+    S: BYE
+
+各セッションはスロットごとにロードした game.py の create_update を使います。
+コマンドはセッションごとのキューに積まれ、スケジューラが
+ラウンドロビンで1セッション1コマンドずつ処理するため、
+大量に送るクライアントがいても他のセッションは待たされません。
+
+Usage:
+    python main.py --server --port 7777
+"""
+
+import asyncio
+from collections import deque
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+from src.ingame.runner import load_game_module
+from src.outgame.save_manager import SaveManager, is_valid_slot_name
+
+
+END_MARKER = "<<END>>"
+QUIT_COMMANDS = ("quit", "exit", "q")
+
+
+class GameSession:
+    """1スロット分のゲームセッション"""
+
+    def __init__(self, slot: str, slot_path: Path, game_module: ModuleType) -> None:
+        """
+        Args:
+            slot: スロット名
+            slot_path: SAVEディレクトリのパス
+            game_module: このスロット用にロードした game モジュール
+        """
+        self.slot = slot
+        self.slot_path = slot_path
+        self.module = game_module
+        self.command_count = 0
+
+        # ゲームの出力はprintせずセッションのバッファに溜める
+        # （game モジュールはセッション間で共有されるので、モジュールの output は書き換えない）
+        self._buffer: list[str] = []
+
+        meta = game_module.load_meta(slot_path)
+        stage_mode = meta.get("stage_mode", "INTERPRETER")
+        self.state = game_module.load_state(slot_path)
+        self.update = game_module.create_update(
+            slot_path, game_module.Interpreter(), meta, output=self._buffer.append
+        )
+        # 前回落ちていたらジャーナルから復元し、以降のコマンドを記録する
+        self.state, self.update = game_module.enable_journal(self.state, self.update, slot_path)
+        self.update = game_module.enable_recording(self.state, self.update, slot_path, meta)
+        self.update = game_module.enable_hot_reload(
+            self.update, slot_path, output=self._buffer.append
+        )
+        self.render = game_module.create_renderer(stage_mode)
+
+        # スケジューラ用のコマンドキュー
+        self.inbox: deque[tuple[str, asyncio.Future[str]]] = deque()
+        self.scheduled = False
+
+        game_module.append_log(slot_path, "Game started (server)")
+
+    def screen(self) -> str:
+        """現在の画面を返す"""
+        return self.render(self.state)
+
+    def handle(self, cmd: str) -> str:
+        """
+        コマンドを1つ処理して、クライアントに返す文字列を作る
+
+        Args:
+            cmd: 入力コマンド
+
+        Returns:
+            ゲームの出力と画面
+        """
+        self._buffer.clear()
+        if cmd.strip():
+            try:
+                self.state = self.update(self.state, cmd)
+            except Exception as e:
+                self._buffer.append(f"Error: {e}")
+            self.command_count += 1
+        self._buffer.append(self.render(self.state))
+        return "\n".join(self._buffer)
+
+    def close(self) -> None:
+        """状態を保存してセッションを終了"""
+        self.module.save_game(self.state, self.slot_path)
+        self.module.append_log(
+            self.slot_path,
+            f"Game ended (server). Turn: {self.state.turn}, Score: {self.state.score}",
+        )
+        self.module.close_saves(self.slot_path)
+
+
+class GameServer:
+    """多数のセッションをホストするasyncio TCPサーバー"""
+
+    def __init__(
+        self,
+        base_path: Path | None = None,
+        saves_path: Path | None = None,
+        default_stage: str | None = None,
+    ) -> None:
+        """
+        Args:
+            base_path: 02_tutorial/ のパス
+            saves_path: SAVEディレクトリの場所（デフォルトは base_path/saves）
+            default_stage: HELLOでStageが指定されなかった時に使うStage ID
+        """
+        self.save_manager = SaveManager(base_path, saves_path=saves_path)
+        self.default_stage = default_stage
+        self.sessions: dict[str, GameSession] = {}
+
+        self._ready: deque[GameSession] = deque()
+        self._wakeup = asyncio.Event()
+        self._server: asyncio.AbstractServer | None = None
+        self._scheduler: asyncio.Task[None] | None = None
+        self.total_commands = 0
+
+    # ----------------------------------------
+    # セッション管理
+    # ----------------------------------------
+
+    def open_session(self, slot: str, stage_id: str | None = None) -> GameSession:
+        """
+        スロットのセッションを開く（未作成ならStageから作成）
+
+        Raises:
+            ValueError: スロット名が不正、または使用中
+            RuntimeError: スロットの作成・ロードに失敗
+        """
+        if not is_valid_slot_name(slot):
+            raise ValueError(f"Invalid slot name: {slot}")
+        if slot in self.sessions:
+            raise ValueError(f"Slot {slot} is in use")
+
+        if not self.save_manager.is_ready(slot):
+            if not self.save_manager.setup(slot, stage_id or self.default_stage):
+                raise RuntimeError(f"Failed to setup slot {slot}")
+
+        slot_path = self.save_manager.get_slot_path(slot)
+        try:
+            module = load_game_module(slot_path)
+        except Exception as e:
+            raise RuntimeError(f"Cannot load game for slot {slot}: {e}") from e
+
+        session = GameSession(slot, slot_path, module)
+        self.sessions[slot] = session
+        return session
+
+    def close_session(self, session: GameSession) -> None:
+        """セッションを保存して閉じる"""
+        self.sessions.pop(session.slot, None)
+        for _, future in session.inbox:
+            future.cancel()
+        session.inbox.clear()
+        session.close()
+
+    def submit(self, session: GameSession, cmd: str) -> "asyncio.Future[str]":
+        """
+        コマンドをセッションのキューに積む
+
+        Returns:
+            処理結果（クライアントに返す文字列）のFuture
+        """
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        session.inbox.append((cmd, future))
+        if not session.scheduled:
+            session.scheduled = True
+            self._ready.append(session)
+        self._wakeup.set()
+        return future
+
+    async def _run_scheduler(self) -> None:
+        """ラウンドロビンで各セッションのコマンドを1つずつ処理する"""
+        while True:
+            if not self._ready:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            session = self._ready.popleft()
+            if not session.inbox:
+                # 閉じられたセッション
+                session.scheduled = False
+                continue
+            cmd, future = session.inbox.popleft()
+
+            if not future.cancelled():
+                try:
+                    future.set_result(session.handle(cmd))
+                except Exception as e:
+                    future.set_exception(e)
+            self.total_commands += 1
+
+            # まだコマンドが残っていれば列の最後に並び直す
+            if session.inbox:
+                self._ready.append(session)
+            else:
+                session.scheduled = False
+
+            # 他のセッションのI/Oに順番を譲る
+            await asyncio.sleep(0)
+
+    # ----------------------------------------
+    # ネットワーク
+    # ----------------------------------------
+
+    async def _handle_client(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        """1クライアント接続を処理する"""
+
+        async def send(text: str) -> None:
+            writer.write((text + "\n").encode("utf-8"))
+            await writer.drain()
+
+        session: GameSession | None = None
+        try:
+            hello = (await reader.readline()).decode("utf-8").split()
+            if len(hello) not in (2, 3) or hello[0].upper() != "HELLO":
+                await send(f"ERROR expected: HELLO <slot> [<stage_id>]\n{END_MARKER}")
+                return
+
+            try:
+                session = self.open_session(hello[1], hello[2] if len(hello) == 3 else None)
+            except (ValueError, RuntimeError) as e:
+                await send(f"ERROR {e}\n{END_MARKER}")
+                return
+
+            await send(f"{session.screen()}\n{END_MARKER}")
+
+            # 送られてきた順に結果を返す（パイプライン送信にも対応）
+            results: asyncio.Queue[asyncio.Future[str] | None] = asyncio.Queue()
+
+            async def write_results() -> None:
+                while (future := await results.get()) is not None:
+                    await send(f"{await future}\n{END_MARKER}")
+
+            writer_task = asyncio.create_task(write_results())
+            try:
+                while line := await reader.readline():
+                    cmd = line.decode("utf-8").strip()
+                    if cmd.lower() in QUIT_COMMANDS:
+                        break
+                    results.put_nowait(self.submit(session, cmd))
+            finally:
+                results.put_nowait(None)
+                await writer_task
+
+            await send("BYE")
+
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+
+        finally:
+            if session is not None:
+                self.close_session(session)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def start(self, host: str = "127.0.0.1", port: int = 7777) -> int:
+        """
+        サーバーを起動する
+
+        Returns:
+            実際に待ち受けているポート番号（port=0 の場合に便利）
+        """
+        self._scheduler = asyncio.create_task(self._run_scheduler())
+        self._server = await asyncio.start_server(self._handle_client, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """サーバーを停止し、残っているセッションを保存する"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._scheduler is not None:
+            self._scheduler.cancel()
+        for session in list(self.sessions.values()):
+            self.close_session(session)
+
+    def stats(self) -> dict[str, Any]:
+        """サーバーの統計情報"""
+        return {
+            "sessions": len(self.sessions),
+            "total_commands": self.total_commands,
+            "queued": sum(len(s.inbox) for s in self.sessions.values()),
+        }
+
+
+async def serve(
+    host: str = "127.0.0.1",
+    port: int = 7777,
+    base_path: Path | None = None,
+    default_stage: str | None = None,
+) -> None:
+    """サーバーを起動してCtrl+Cまで待ち受ける"""
+    server = GameServer(base_path, default_stage=default_stage)
+    actual_port = await server.start(host, port)
+    print(f"Game server listening on {host}:{actual_port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
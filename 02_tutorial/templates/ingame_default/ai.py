@@ -16,11 +16,29 @@ if str(_tutorial_root) not in sys.path:
 
 try:
     from src.core.state import Position
-    from src.algorithms.pathfinding import get_next_step, create_walkability_checker
 except ImportError:
-    # フォールバック：A*が使えない場合はランダム移動
     Position = None
-    get_next_step = None
+
+# A*経路探索は最初に使うときに読み込む（ゲームの起動時には読み込まない）
+_pathfinding = None
+
+
+def _load_pathfinding():
+    """
+    A*経路探索の関数を返す
+
+    Returns:
+        (get_next_step, create_walkability_checker)
+        A*が使えない場合はNone（フォールバック：ランダム移動）
+    """
+    global _pathfinding
+    if _pathfinding is None:
+        try:
+            from src.algorithms.pathfinding import get_next_step, create_walkability_checker
+            _pathfinding = (get_next_step, create_walkability_checker)
+        except ImportError:
+            _pathfinding = ()
+    return _pathfinding if Position and _pathfinding else None
 
 
 def decide_action(entity: dict, state: dict) -> str:
@@ -44,7 +62,7 @@ def decide_action(entity: dict, state: dict) -> str:
     player_y = player.get("y", 0)
 
     # A*が使える場合
-    if Position and get_next_step:
+    if _load_pathfinding():
         return _chase_with_astar(
             entity_name, entity_x, entity_y,
             player_x, player_y, state
@@ -54,6 +72,55 @@ def decide_action(entity: dict, state: dict) -> str:
     return _random_move(entity_name, entity_x, entity_y, state)
 
 
+def decide_actions(entities: list[dict], state: dict) -> list[str]:
+    """
+    全エンティティの行動をまとめて決定（1ターンに1回呼ばれる）
+
+    障害物の集合のような全員に共通する計算は、ここで1回だけ行います。
+    この関数を消すと、ゲームは decide_action を1体ずつ呼びます。
+
+    Args:
+        entities: 行動するエンティティのリスト（読み取り専用）
+        state: 現在のゲーム状態（読み取り専用、全員で共有）
+
+    Returns:
+        entities と同じ順の、行動を表すDSL文字列のリスト（何もしないなら ""）
+    """
+    pathfinding = _load_pathfinding()
+    if not pathfinding:
+        return [decide_action(entity, state) for entity in entities]
+    get_next_step, create_walkability_checker = pathfinding
+
+    width = state.get("map_width", 20)
+    height = state.get("map_height", 10)
+    player = state.get("player", {})
+    goal = Position(x=player.get("x", 0), y=player.get("y", 0))
+
+    # 障害物（他のエンティティ）は全員分を1回だけ作る
+    obstacles = {
+        (e.get("x", 0), e.get("y", 0))
+        for e in state.get("entities", [])
+        if e.get("is_active", True)
+    }
+    is_free = create_walkability_checker(obstacles, width, height)
+
+    actions = []
+    for entity in entities:
+        name = entity.get("name", "enemy")
+        here = (entity.get("x", 0), entity.get("y", 0))
+
+        # 自分自身の位置は通れる
+        def is_walkable(x: int, y: int, here: tuple[int, int] = here) -> bool:
+            return (x, y) == here or is_free(x, y)
+
+        next_pos = get_next_step(Position(x=here[0], y=here[1]), goal, is_walkable, width, height)
+        if next_pos:
+            actions.append(f"move {name} {next_pos.x} {next_pos.y}")
+        else:
+            actions.append(_random_move(name, here[0], here[1], state))
+    return actions
+
+
 def _chase_with_astar(
     entity_name: str,
     entity_x: int,
@@ -63,6 +130,7 @@ def _chase_with_astar(
     state: dict,
 ) -> str:
     """A*でプレイヤーを追いかける"""
+    get_next_step, create_walkability_checker = _load_pathfinding()
     width = state.get("map_width", 20)
     height = state.get("map_height", 10)
 
@@ -28,9 +28,37 @@ GAME_TITLE = "AI × Game Tutorial"
 
 # 自動保存（毎ターン）
 AUTO_SAVE = True
+AUTO_SAVE_EVERY = 1        # 2以上ならこのターン数ごとに保存（間はジャーナルで復元）
+
+# コマンドジャーナル（落ちても次の起動時に直前の状態まで復元する）
+JOURNAL_ENABLED = True
+JOURNAL_FSYNC_EVERY = 16   # この件数ごとにディスクへ確定（fsync）
+JOURNAL_MAX_ENTRIES = 1000  # この件数を超えたら、保存済みの分を捨てる
+
+# セッションの記録（python -m src.ingame.replay で再生できる）
+RECORD_SESSIONS = True
+REPLAY_KEEP = 10           # 残す記録の数
+
+# ai.py / rules.py / hooks.py を保存したら、ゲームを続けたまま読み直す
+HOT_RELOAD = True
+
+# セーブの差分ログ設定
+SAVE_SNAPSHOT_EVERY = 200  # この件数ごとに完全スナップショットを書く
+SAVE_FSYNC_EVERY = 16      # この件数ごとにディスクへ確定（fsync）
+META_SAVE_EVERY = 10       # meta.json を書き込むターン間隔
+SAVE_FORMAT = "json"       # スナップショット形式（"json" / "binary"）
+
+# log.txt の設定
+LOG_MAX_BYTES = 1_000_000  # このサイズを超えたら log.txt.1 ... にローテーション
+LOG_BACKUP_COUNT = 3       # 残す古いログの数
+LOG_JSON_LINES = False     # True なら1行1レコードのJSON形式で書く
 
 # AIターン有効
 AI_ENABLED = True
 
+# AIティック間隔（秒）。0より大きいとFSM/BT/GOAP/DIRECTORモードで
+# 入力を待たずに一定間隔で敵AIが動く（0 = ターン制）
+AI_TICK_INTERVAL = 0
+
 # デバッグモード
 DEBUG = False
@@ -9,11 +9,11 @@ SAVEスロットから実行され、DSLコマンドでゲームをプレイし
     run(slot_path)
 """
 
-import json
 import sys
 from pathlib import Path
 from dataclasses import asdict
 from datetime import datetime
+from typing import Callable
 
 # srcをインポートパスに追加（SAVEディレクトリから実行される場合）
 _tutorial_root = Path(__file__).parent.parent.parent
@@ -21,13 +21,21 @@ if str(_tutorial_root) not in sys.path:
     sys.path.insert(0, str(_tutorial_root))
 
 from src.core.state import GameState, Entity, Position, create_initial_state
-from src.core.game_loop import run_game_loop
-from src.core.io import get_input, output
+from src.core.game_loop import run_game_loop, run_game_loop_async
+from src.core.io import get_input, output, create_async_input, OutputSink
 from src.core.renderer import create_game_renderer
 from src.dsl.parser import parse
 from src.dsl.interpreter import Interpreter, interpret
-from src.algorithms.pathfinding import find_path, manhattan_distance, DIRECTIONS_4
-from src.core.renderer import TextGrid, add_border
+from src.core.renderer import LayeredRenderer
+from src.core.savelog import (
+    SaveLog, replay_save_log, replay_onto_state, state_from_dict, saved_journal_seq,
+)
+from src.core.state_codec import is_binary_state, decode_state, StateCodecError
+from src.core.log_writer import get_log_writer, close_log_writer
+from src.core.journal import CommandJournal, read_journal
+from src.core.safe_io import CorruptFileError, parse_json_checked, write_json_checked
+from src.ingame.replay import SessionRecorder, start_recording, REPLAYS_DIR
+from src.ingame.ai_batch import build_state_view, decide_ai_actions
 
 # AIモジュールをインポート
 try:
@@ -64,11 +72,22 @@ NATURAL_INPUT_MAP = {
 }
 
 
-def show_input_guide(cmd: str, input_mode: str, stage_mode: str) -> bool:
+def _module_output(text: str) -> None:
+    """呼ばれた時点のモジュールの output へ送る（create_update に output を渡さなかった場合）"""
+    output(text)
+
+
+def show_input_guide(
+    cmd: str,
+    input_mode: str,
+    stage_mode: str,
+    output: Callable[[str], None] | None = None,
+) -> bool:
     """
     入力ガイドを表示する。
     Returns: True if guide was shown (unknown command), False otherwise
     """
+    output = output or _module_output
     cmd_lower = cmd.lower().strip()
 
     # 自然言語入力の救済
@@ -181,184 +200,238 @@ def get_hint_text(input_mode: str, stage_mode: str) -> str:
 
 
 def load_state(slot_path: Path) -> GameState:
-    """state.jsonからGameStateを復元"""
-    state_file = slot_path / "state.json"
+    """
+    スナップショットと差分ログからGameStateを復元
+
+    スナップショットは state.bin（バイナリ）があればそれを、なければ
+    state.json を使う。形式はファイル先頭のマジックで自動判定する。
+    スナップショットが壊れていれば（checksum不一致など）、差分ログの
+    各世代の先頭にある完全スナップショットから復元する。
+    """
+    player_start = (config.PLAYER_START_X, config.PLAYER_START_Y)
+
+    snapshot_file = slot_path / "state.bin"
+    if not snapshot_file.exists():
+        snapshot_file = slot_path / "state.json"
 
-    if not state_file.exists():
+    if not snapshot_file.exists():
         return create_initial_state(
             map_width=config.MAP_WIDTH,
             map_height=config.MAP_HEIGHT,
-            player_start=(config.PLAYER_START_X, config.PLAYER_START_Y),
+            player_start=player_start,
         )
 
-    data = json.loads(state_file.read_text(encoding="utf-8"))
-
-    # プレイヤー復元
-    player_data = data.get("player", {})
-    player = Entity(
-        id=player_data.get("id", "player"),
-        name=player_data.get("name", "Player"),
-        pos=Position(
-            x=player_data.get("x", config.PLAYER_START_X),
-            y=player_data.get("y", config.PLAYER_START_Y),
-        ),
-        hp=player_data.get("hp", config.PLAYER_START_HP),
-    )
+    raw = snapshot_file.read_bytes()
 
-    # エンティティ復元
-    entities = []
-    for e_data in data.get("entities", []):
-        entity = Entity(
-            id=e_data.get("id", ""),
-            name=e_data.get("name", ""),
-            pos=Position(x=e_data.get("x", 0), y=e_data.get("y", 0)),
-            hp=e_data.get("hp", 100),
-            is_active=e_data.get("is_active", True),
+    try:
+        # バイナリ形式: エンティティを辞書に戻さず差分だけ重ねる
+        if is_binary_state(raw):
+            state, log_generation = decode_state(raw)
+            return replay_onto_state(
+                slot_path, state, log_generation,
+                player_start=player_start,
+                player_hp=config.PLAYER_START_HP,
+            )
+        data = parse_json_checked(raw, snapshot_file.name)
+    except (StateCodecError, CorruptFileError) as e:
+        append_log(slot_path, f"Broken snapshot, rebuilding from save log: {e}")
+        data = {}
+
+    # JSON形式: 差分ログを重ねて最新状態にする
+    data = replay_save_log(slot_path, data)
+    if not data:
+        return create_initial_state(
+            map_width=config.MAP_WIDTH,
+            map_height=config.MAP_HEIGHT,
+            player_start=player_start,
         )
-        # FSM状態を拡張属性として設定（frozen dataclass対応）
-        if "fsm_state" in e_data:
-            object.__setattr__(entity, 'fsm_state', e_data.get("fsm_state", "IDLE"))
-        entities.append(entity)
-
-    return GameState(
-        player=player,
-        entities=tuple(entities),
-        turn=data.get("turn", 0),
-        score=data.get("score", 0),
-        is_game_over=data.get("is_game_over", False),
-        map_width=data.get("map_width", config.MAP_WIDTH),
-        map_height=data.get("map_height", config.MAP_HEIGHT),
+
+    return state_from_dict(
+        data,
+        player_start=player_start,
+        player_hp=config.PLAYER_START_HP,
+        map_size=(config.MAP_WIDTH, config.MAP_HEIGHT),
     )
 
 
-def save_state(state: GameState, slot_path: Path) -> None:
-    """GameStateをstate.jsonに保存"""
-    state_file = slot_path / "state.json"
-
-    data = {
-        "version": "1.0",
-        "player": {
-            "id": state.player.id,
-            "name": state.player.name,
-            "x": state.player.pos.x,
-            "y": state.player.pos.y,
-            "hp": state.player.hp,
-        },
-        "entities": [
-            {
-                "id": e.id,
-                "name": e.name,
-                "x": e.pos.x,
-                "y": e.pos.y,
-                "hp": e.hp,
-                "is_active": e.is_active,
-                **({"fsm_state": e.fsm_state} if hasattr(e, 'fsm_state') else {}),
-            }
-            for e in state.entities
-        ],
-        "turn": state.turn,
-        "score": state.score,
-        "is_game_over": state.is_game_over,
-        "map_width": state.map_width,
-        "map_height": state.map_height,
-    }
+# スロットごとの差分ログライター（ファイルは開いたまま使い回す）
+_save_logs: dict[Path, SaveLog] = {}
 
-    state_file.write_text(
-        json.dumps(data, ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
+# スロットごとのmeta.json内容と、最後に書き込んだターン
+_meta_cache: dict[Path, tuple[dict, int]] = {}
+
+# スロットごとのコマンドジャーナル
+_journals: dict[Path, CommandJournal] = {}
+
+# スロットごとのセッション記録（リプレイ用）
+_recorders: dict[Path, SessionRecorder] = {}
+
+
+def get_save_log(slot_path: Path) -> SaveLog:
+    """スロットの差分ログライターを取得（なければ作成）"""
+    slot_path = Path(slot_path)
+    if slot_path not in _save_logs:
+        _save_logs[slot_path] = SaveLog(
+            slot_path,
+            snapshot_every=getattr(config, "SAVE_SNAPSHOT_EVERY", 200),
+            fsync_every=getattr(config, "SAVE_FSYNC_EVERY", 16),
+            snapshot_format=getattr(config, "SAVE_FORMAT", "json"),
+        )
+    return _save_logs[slot_path]
+
+
+def get_journal(slot_path: Path) -> CommandJournal:
+    """スロットのコマンドジャーナルを取得（なければ作成）"""
+    slot_path = Path(slot_path)
+    if slot_path not in _journals:
+        _journals[slot_path] = CommandJournal(
+            slot_path,
+            fsync_every=getattr(config, "JOURNAL_FSYNC_EVERY", 16),
+            start_seq=saved_journal_seq(slot_path),
+        )
+    return _journals[slot_path]
+
+
+def save_state(state: GameState, slot_path: Path, force: bool = False) -> None:
+    """
+    GameStateを保存（前回からの差分を state.NNNNNN.log に追記）
+
+    AUTO_SAVE_EVERY が2以上なら、そのターン数ごと（または force=True の時）
+    だけ書き込む。間のコマンドはジャーナルから復元できる。
+    """
+    slot_path = Path(slot_path)
+    save_log = get_save_log(slot_path)
 
+    interval = getattr(config, "AUTO_SAVE_EVERY", 1)
+    last = save_log.last_state
+    if not force and interval > 1 and last is not None and 0 <= state.turn - last.turn < interval:
+        return
 
-def update_meta(slot_path: Path, state: GameState) -> None:
-    """meta.jsonを更新"""
+    journal = _journals.get(slot_path)
+    save_log.append(state, journal.current_seq if journal else None)
+
+
+def update_meta(slot_path: Path, state: GameState, force: bool = False) -> None:
+    """
+    meta.jsonを更新
+
+    内容はメモリに保持し、書き込みは META_SAVE_EVERY ターンごと
+    （または force=True の時）に行う。
+    """
+    slot_path = Path(slot_path)
     meta_file = slot_path / "meta.json"
 
-    if meta_file.exists():
-        meta = json.loads(meta_file.read_text(encoding="utf-8"))
+    if slot_path in _meta_cache:
+        meta, written_turn = _meta_cache[slot_path]
     else:
-        meta = {"created_at": datetime.now().isoformat()}
+        meta = load_meta(slot_path) or {"created_at": datetime.now().isoformat()}
+        written_turn = None
 
     meta["last_played"] = datetime.now().isoformat()
     meta["turn"] = state.turn
     meta["score"] = state.score
 
-    meta_file.write_text(
-        json.dumps(meta, ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
+    interval = getattr(config, "META_SAVE_EVERY", 10)
+    if force or written_turn is None or abs(state.turn - written_turn) >= interval:
+        write_json_checked(meta_file, meta)
+        written_turn = state.turn
 
+    _meta_cache[slot_path] = (meta, written_turn)
 
-def append_log(slot_path: Path, message: str) -> None:
-    """log.txtにメッセージを追加"""
-    log_file = slot_path / "log.txt"
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    with open(log_file, "a", encoding="utf-8") as f:
-        f.write(f"[{timestamp}] {message}\n")
 
+def save_game(state: GameState, slot_path: Path) -> None:
+    """
+    明示的なセーブ（ログとmeta.jsonをディスクに確定させる）
 
-def execute_ai_turn(state: GameState, interpreter: Interpreter) -> GameState:
+    確定した状態に全コマンドが反映されているので、ジャーナルは空にする。
+    """
+    save_state(state, slot_path, force=True)
+    get_save_log(slot_path).sync()
+    update_meta(slot_path, state, force=True)
+
+    journal = _journals.get(Path(slot_path))
+    if journal is not None:
+        journal.reset()
+
+
+def close_saves(slot_path: Path) -> None:
+    """スロットの差分ログ・ジャーナル・log.txtを閉じる（ゲーム終了時）"""
+    save_log = _save_logs.pop(Path(slot_path), None)
+    if save_log is not None:
+        save_log.close()
+    journal = _journals.pop(Path(slot_path), None)
+    if journal is not None:
+        journal.close()
+    recorder = _recorders.pop(Path(slot_path), None)
+    if recorder is not None:
+        recorder.close()
+    _meta_cache.pop(Path(slot_path), None)
+    close_log_writer(Path(slot_path) / "log.txt")
+
+
+def append_log(slot_path: Path, message: str, **fields) -> None:
+    """log.txtにメッセージを追加（バッファに溜めてまとめて書き出す）"""
+    writer = get_log_writer(
+        slot_path / "log.txt",
+        max_bytes=getattr(config, "LOG_MAX_BYTES", 1_000_000),
+        backup_count=getattr(config, "LOG_BACKUP_COUNT", 3),
+        json_lines=getattr(config, "LOG_JSON_LINES", False),
+    )
+    writer.write(message, **fields)
+
+
+def execute_ai_turn(
+    state: GameState,
+    interpreter: Interpreter,
+    output: Callable[[str], None] | None = None,
+) -> GameState:
     """
     AIターンを実行
 
-    全アクティブエンティティがプレイヤーに向かって移動
+    全アクティブエンティティがプレイヤーに向かって移動する。
+    全員が同じ読み取り専用のゲーム状態を見て行動を決め（ai.decide_actions、
+    なければ ai.decide_action を1体ずつ）、決まった移動は1回でまとめて適用する。
     """
+    output = output or _module_output
     if not ai_module:
         output("AI module not available")
         return state.next_turn()
 
-    current_state = state
+    entities, state_view = build_state_view(state)
 
-    # 各エンティティの行動を決定・実行
-    for entity in state.entities:
-        if not entity.is_active:
-            continue
+    def on_error(entity, e: Exception) -> None:
+        output(f"  AI error for {entity['name']}: {e}")
 
-        # エンティティ情報を辞書形式でAIに渡す
-        entity_dict = {
-            "name": entity.name,
-            "id": entity.id,
-            "x": entity.pos.x,
-            "y": entity.pos.y,
-            "hp": entity.hp,
-            "is_active": entity.is_active,
-        }
-
-        # ゲーム状態を辞書形式で渡す
-        state_dict = {
-            "player": {
-                "x": current_state.player.pos.x,
-                "y": current_state.player.pos.y,
-                "hp": current_state.player.hp,
-            },
-            "entities": [
-                {
-                    "name": e.name,
-                    "id": e.id,
-                    "x": e.pos.x,
-                    "y": e.pos.y,
-                    "is_active": e.is_active,
-                }
-                for e in current_state.entities
-            ],
-            "map_width": current_state.map_width,
-            "map_height": current_state.map_height,
-        }
+    # AIに行動を決定させる
+    try:
+        actions = decide_ai_actions(ai_module, entities, state_view, on_error)
+    except Exception as e:
+        output(f"  AI error: {e}")
+        return state.next_turn()
 
-        # AIに行動を決定させる
+    programs = []
+    for entity, action in zip(entities, actions):
+        if not action:
+            continue
         try:
-            action = ai_module.decide_action(entity_dict, state_dict)
-            if action:
-                result = interpreter.execute(parse(action), current_state)
-                current_state = result.state
-                output(f"  {entity.name}: {action}")
+            programs.append(parse(action))
         except Exception as e:
-            output(f"  AI error for {entity.name}: {e}")
+            output(f"  AI error for {entity['name']}: {e}")
+            continue
+        output(f"  {entity['name']}: {action}")
 
-    return current_state.next_turn()
+    # 全員の行動を1回のトランザクションとして実行
+    result = interpreter.execute_batch(programs, state)
+    return result.state.next_turn()
 
 
-def create_simple_update(slot_path: Path, meta: dict | None = None):
+def create_simple_update(
+    slot_path: Path,
+    meta: dict | None = None,
+    output: Callable[[str], None] | None = None,
+):
     """Simple mode用のupdate関数（w/a/s/d移動、WELCOME/STATE/IO/RENDERERモード用）"""
+    output = output or _module_output
     meta = meta or {}
     stage_commands = meta.get("stage_commands", [])
     stage_help = meta.get("stage_help_text", "")
@@ -400,8 +473,7 @@ def create_simple_update(slot_path: Path, meta: dict | None = None):
             return state
 
         if cmd == "save":
-            save_state(state, slot_path)
-            update_meta(slot_path, state)
+            save_game(state, slot_path)
             output("Game saved.")
             return state
 
@@ -416,14 +488,19 @@ def create_simple_update(slot_path: Path, meta: dict | None = None):
 
             return new_state.add_log(f"Moved to ({new_state.player.pos.x}, {new_state.player.pos.y})")
 
-        show_input_guide(cmd, stage_input_mode, stage_mode)
+        show_input_guide(cmd, stage_input_mode, stage_mode, output)
         return state
 
     return update
 
 
-def create_loop_update(slot_path: Path, meta: dict | None = None):
+def create_loop_update(
+    slot_path: Path,
+    meta: dict | None = None,
+    output: Callable[[str], None] | None = None,
+):
     """LOOP mode用のupdate関数（カウンター増減）"""
+    output = output or _module_output
     meta = meta or {}
     stage_commands = meta.get("stage_commands", [])
     stage_help = meta.get("stage_help_text", "")
@@ -471,16 +548,21 @@ def create_loop_update(slot_path: Path, meta: dict | None = None):
             output("Score reset to 0")
             return new_state
 
-        show_input_guide(cmd, stage_input_mode, stage_mode)
+        show_input_guide(cmd, stage_input_mode, stage_mode, output)
         return state
 
     return update
 
 
-def create_lexer_update(slot_path: Path, meta: dict | None = None):
+def create_lexer_update(
+    slot_path: Path,
+    meta: dict | None = None,
+    output: Callable[[str], None] | None = None,
+):
     """LEXER mode用のupdate関数（トークン表示のみ、実行しない）"""
     from src.dsl.lexer import tokenize, tokenize_with_errors
 
+    output = output or _module_output
     meta = meta or {}
     stage_help = meta.get("stage_help_text", "")
     stage_goal = meta.get("stage_goal", "")
@@ -548,10 +630,15 @@ def create_lexer_update(slot_path: Path, meta: dict | None = None):
     return update
 
 
-def create_parser_update(slot_path: Path, meta: dict | None = None):
+def create_parser_update(
+    slot_path: Path,
+    meta: dict | None = None,
+    output: Callable[[str], None] | None = None,
+):
     """PARSER mode用のupdate関数（AST表示のみ、実行しない）"""
     from src.dsl.lexer import tokenize
 
+    output = output or _module_output
     meta = meta or {}
     stage_help = meta.get("stage_help_text", "")
     stage_goal = meta.get("stage_goal", "")
@@ -623,8 +710,14 @@ def create_parser_update(slot_path: Path, meta: dict | None = None):
     return update
 
 
-def create_interpreter_update(slot_path: Path, interpreter: Interpreter, meta: dict | None = None):
+def create_interpreter_update(
+    slot_path: Path,
+    interpreter: Interpreter,
+    meta: dict | None = None,
+    output: Callable[[str], None] | None = None,
+):
     """INTERPRETER mode用のupdate関数（フル実行）"""
+    output = output or _module_output
     meta = meta or {}
     stage_commands = meta.get("stage_commands", [])
     stage_help = meta.get("stage_help_text", "")
@@ -675,13 +768,12 @@ def create_interpreter_update(slot_path: Path, interpreter: Interpreter, meta: d
             return state
 
         if cmd == "save":
-            save_state(state, slot_path)
-            update_meta(slot_path, state)
+            save_game(state, slot_path)
             output("Game saved.")
             return state
 
         if cmd == "wait":
-            return execute_ai_turn(state, interpreter)
+            return execute_ai_turn(state, interpreter, output)
 
         # DSLコマンドを実行
         try:
@@ -714,8 +806,14 @@ def create_interpreter_update(slot_path: Path, interpreter: Interpreter, meta: d
     return update
 
 
-def create_pathfinding_update(slot_path: Path, interpreter: Interpreter, meta: dict | None = None):
+def create_pathfinding_update(
+    slot_path: Path,
+    interpreter: Interpreter,
+    meta: dict | None = None,
+    output: Callable[[str], None] | None = None,
+):
     """PATHFINDING mode用のupdate関数（A*経路探索 + MOVE命令実行）"""
+    output = output or _module_output
     meta = meta or {}
     stage_commands = meta.get("stage_commands", [])
     stage_help = meta.get("stage_help_text", "")
@@ -724,6 +822,9 @@ def create_pathfinding_update(slot_path: Path, interpreter: Interpreter, meta: d
     stage_input_mode = meta.get("stage_input_mode", "GAME")
     stage_mode = meta.get("stage_mode", "PATHFINDING")
 
+    # 経路探索はこのモードでしか使わないので、ここで読み込む
+    from src.algorithms.pathfinding import find_path, manhattan_distance
+
     # 移動キュー（自動移動用）
     move_queue: list[tuple[int, int]] = []
 
@@ -759,29 +860,20 @@ def create_pathfinding_update(slot_path: Path, interpreter: Interpreter, meta: d
             moves_list.append((dx, dy))
         return moves_list
 
-    def render_path(state: GameState, path: tuple[Position, ...]) -> str:
-        """経路を可視化したTextGridを生成"""
-        grid = TextGrid(width=state.map_width, height=state.map_height, fill=".")
-
-        # 障害物
-        for entity in state.entities:
-            if entity.is_active:
-                char = config.CHAR_MAPPING.get(entity.id, "?")
-                grid.set(entity.pos.x, entity.pos.y, char)
+    # 経路表示用レンダラー（壁・障害物のレイヤーはキャッシュされる）
+    path_layers = LayeredRenderer(char_mapping=config.CHAR_MAPPING, fill=".")
 
+    def render_path(state: GameState, path: tuple[Position, ...]) -> str:
+        """経路を可視化したマップ文字列を生成"""
         # 経路（*で表示）
-        for pos in path:
-            grid.set(pos.x, pos.y, "*")
+        overlay = [(pos.x, pos.y, "*") for pos in path]
 
         # ゴール（経路の最後）
         if path:
-            grid.set(path[-1].x, path[-1].y, "G")
-
-        # プレイヤー（優先）
-        grid.set(state.player.pos.x, state.player.pos.y, "@")
+            overlay.append((path[-1].x, path[-1].y, "G"))
 
-        bordered = add_border(grid)
-        return bordered.render()
+        # プレイヤーは常に最前面に描画される
+        return path_layers.render_map(state, overlay)
 
     def update(state: GameState, cmd: str) -> GameState:
         nonlocal move_queue
@@ -829,8 +921,7 @@ def create_pathfinding_update(slot_path: Path, interpreter: Interpreter, meta: d
             return state
 
         if cmd == "save":
-            save_state(state, slot_path)
-            update_meta(slot_path, state)
+            save_game(state, slot_path)
             output("Game saved.")
             return state
 
@@ -1053,14 +1144,20 @@ def create_pathfinding_update(slot_path: Path, interpreter: Interpreter, meta: d
             return new_state
 
         # 未知のコマンド - フレンドリーガイドを表示
-        show_input_guide(cmd, stage_input_mode, stage_mode)
+        show_input_guide(cmd, stage_input_mode, stage_mode, output)
         return state
 
     return update
 
 
-def create_fsm_update(slot_path: Path, interpreter: Interpreter, meta: dict | None = None):
+def create_fsm_update(
+    slot_path: Path,
+    interpreter: Interpreter,
+    meta: dict | None = None,
+    output: Callable[[str], None] | None = None,
+):
     """FSM mode用のupdate関数（敵AIがFSMでMOVE命令を生成）"""
+    output = output or _module_output
     meta = meta or {}
     stage_commands = meta.get("stage_commands", [])
     stage_help = meta.get("stage_help_text", "")
@@ -1348,8 +1445,7 @@ def create_fsm_update(slot_path: Path, interpreter: Interpreter, meta: dict | No
             return state
 
         if cmd == "save":
-            save_state(state, slot_path)
-            update_meta(slot_path, state)
+            save_game(state, slot_path)
             output("Game saved.")
             return state
 
@@ -1449,14 +1545,20 @@ def create_fsm_update(slot_path: Path, interpreter: Interpreter, meta: dict | No
             return new_state
 
         # 未知のコマンド - フレンドリーガイドを表示
-        show_input_guide(cmd, stage_input_mode, stage_mode)
+        show_input_guide(cmd, stage_input_mode, stage_mode, output)
         return state
 
     return update
 
 
-def create_bt_update(slot_path: Path, interpreter: Interpreter, meta: dict | None = None):
+def create_bt_update(
+    slot_path: Path,
+    interpreter: Interpreter,
+    meta: dict | None = None,
+    output: Callable[[str], None] | None = None,
+):
     """BT mode用のupdate関数（敵AIがBehavior TreeでMOVE命令を生成）"""
+    output = output or _module_output
     meta = meta or {}
     stage_commands = meta.get("stage_commands", [])
     stage_help = meta.get("stage_help_text", "")
@@ -1811,8 +1913,7 @@ Root (Selector)
             return state
 
         if cmd == "save":
-            save_state(state, slot_path)
-            update_meta(slot_path, state)
+            save_game(state, slot_path)
             output("Game saved.")
             return state
 
@@ -1865,14 +1966,20 @@ Root (Selector)
                 update_meta(slot_path, new_state)
             return new_state
 
-        show_input_guide(cmd, stage_input_mode, stage_mode)
+        show_input_guide(cmd, stage_input_mode, stage_mode, output)
         return state
 
     return update
 
 
-def create_goap_update(slot_path: Path, interpreter: Interpreter, meta: dict | None = None):
+def create_goap_update(
+    slot_path: Path,
+    interpreter: Interpreter,
+    meta: dict | None = None,
+    output: Callable[[str], None] | None = None,
+):
     """GOAP mode用のupdate関数（敵AIがGOAPでMOVE命令を生成）"""
+    output = output or _module_output
     meta = meta or {}
     stage_commands = meta.get("stage_commands", [])
     stage_help = meta.get("stage_help_text", "")
@@ -2109,14 +2216,20 @@ def create_goap_update(slot_path: Path, interpreter: Interpreter, meta: dict | N
             new_state, msg = check_collision(new_state)
             if msg: output(msg)
             return new_state.next_turn()
-        show_input_guide(cmd, stage_input_mode, stage_mode)
+        show_input_guide(cmd, stage_input_mode, stage_mode, output)
         return state
 
     return update
 
 
-def create_director_update(slot_path: Path, interpreter: Interpreter, meta: dict | None = None):
+def create_director_update(
+    slot_path: Path,
+    interpreter: Interpreter,
+    meta: dict | None = None,
+    output: Callable[[str], None] | None = None,
+):
     """Director mode用のupdate関数（System AIがゲーム全体を制御）"""
+    output = output or _module_output
     meta = meta or {}
     stage_commands = meta.get("stage_commands", [])
     stage_help = meta.get("stage_help_text", "")
@@ -2249,14 +2362,20 @@ def create_director_update(slot_path: Path, interpreter: Interpreter, meta: dict
             new_state, msg = check_collision(new_state)
             if msg: output(msg)
             return new_state.next_turn()
-        show_input_guide(cmd, stage_input_mode, stage_mode)
+        show_input_guide(cmd, stage_input_mode, stage_mode, output)
         return state
 
     return update
 
 
-def create_integration_update(slot_path: Path, interpreter: Interpreter, meta: dict | None = None):
+def create_integration_update(
+    slot_path: Path,
+    interpreter: Interpreter,
+    meta: dict | None = None,
+    output: Callable[[str], None] | None = None,
+):
     """Integration mode用のupdate関数（人間 x AI x ルール）"""
+    output = output or _module_output
     meta = meta or {}
     stage_commands = meta.get("stage_commands", [])
     stage_goal = meta.get("stage_goal", "")
@@ -2390,72 +2509,230 @@ def create_integration_update(slot_path: Path, interpreter: Interpreter, meta: d
                 output(f"[AI] Proposed: {ai_dsl}")
             return new_state.next_turn()
 
-        show_input_guide(cmd, stage_input_mode, stage_mode)
+        show_input_guide(cmd, stage_input_mode, stage_mode, output)
         return state
 
     return update
 
 
-def create_update(slot_path: Path, interpreter: Interpreter, meta: dict | None = None):
-    """modeに応じたupdate関数を作成"""
-    meta = meta or {}
+# 'wait' で敵AIが1手進むモード（AI_TICK_INTERVAL でリアルタイム化できる）
+AI_TICK_MODES = ("FSM", "BT", "GOAP", "DIRECTOR")
+
+
+def create_update(
+    slot_path: Path,
+    interpreter: Interpreter,
+    meta: dict | None = None,
+    output: Callable[[str], None] | None = None,
+):
+    """
+    modeに応じたupdate関数を作成
+
+    Args:
+        slot_path: SAVEディレクトリのパス
+        interpreter: DSLインタプリタ
+        meta: meta.json の内容
+        output: ゲームの出力先（省略時はモジュールの output）
+
+    Returns:
+        update関数。出力先は update.output_sink（OutputSink）で、
+        ジャーナルの再実行中は recover_state がこれだけを止める
+    """
+    sink = OutputSink(output or _module_output)
+    update = _create_mode_update(slot_path, interpreter, meta or {}, sink)
+    update.output_sink = sink
+    return update
+
+
+def _create_mode_update(slot_path: Path, interpreter: Interpreter, meta: dict, output: OutputSink):
+    """modeに応じたupdate関数を作成（出力は output へ送る）"""
     mode = meta.get("stage_mode", "INTERPRETER")
 
     # Simple modes (w/a/s/d 移動)
     if mode in ("WELCOME", "STATE", "IO", "RENDERER"):
-        return create_simple_update(slot_path, meta)
+        return create_simple_update(slot_path, meta, output)
 
     # Loop mode (カウンター)
     if mode == "LOOP":
-        return create_loop_update(slot_path, meta)
+        return create_loop_update(slot_path, meta, output)
 
     # Lexer mode (トークン表示のみ、実行しない)
     if mode == "LEXER":
-        return create_lexer_update(slot_path, meta)
+        return create_lexer_update(slot_path, meta, output)
 
     # Parser mode (AST表示のみ、実行しない)
     if mode == "PARSER":
-        return create_parser_update(slot_path, meta)
+        return create_parser_update(slot_path, meta, output)
 
     # Pathfinding mode (A*経路探索 + MOVE命令実行)
     if mode == "PATHFINDING":
-        return create_pathfinding_update(slot_path, interpreter, meta)
+        return create_pathfinding_update(slot_path, interpreter, meta, output)
 
     # FSM mode (敵AIがFSMでMOVE命令を生成)
     if mode == "FSM":
-        return create_fsm_update(slot_path, interpreter, meta)
+        return create_fsm_update(slot_path, interpreter, meta, output)
 
     # BT mode (敵AIがBTでMOVE命令を生成)
     if mode == "BT":
-        return create_bt_update(slot_path, interpreter, meta)
+        return create_bt_update(slot_path, interpreter, meta, output)
 
     # GOAP mode (敵AIがGOAPでMOVE命令を生成)
     if mode == "GOAP":
-        return create_goap_update(slot_path, interpreter, meta)
+        return create_goap_update(slot_path, interpreter, meta, output)
 
     # Director mode (System AIがゲーム全体を制御)
     if mode == "DIRECTOR":
-        return create_director_update(slot_path, interpreter, meta)
+        return create_director_update(slot_path, interpreter, meta, output)
 
     # Integration mode (人間 x AI x ルール)
     if mode == "INTEGRATION":
-        return create_integration_update(slot_path, interpreter, meta)
+        return create_integration_update(slot_path, interpreter, meta, output)
 
     # Interpreter mode (フル実行)
-    return create_interpreter_update(slot_path, interpreter, meta)
+    return create_interpreter_update(slot_path, interpreter, meta, output)
 
 
 def load_meta(slot_path: Path) -> dict:
-    """meta.jsonを読み込み"""
+    """meta.jsonを読み込み（壊れていればログに記録して空の辞書を返す）"""
     meta_file = slot_path / "meta.json"
     if meta_file.exists():
         try:
-            return json.loads(meta_file.read_text(encoding="utf-8"))
-        except json.JSONDecodeError:
-            pass
+            return parse_json_checked(meta_file.read_bytes(), meta_file.name)
+        except CorruptFileError as e:
+            append_log(slot_path, f"Broken meta.json ignored: {e}")
     return {}
 
 
+def recover_state(state: GameState, update, slot_path: Path) -> GameState:
+    """
+    最後のセーブより後のコマンドをジャーナルから再実行して状態を復元
+
+    前回のプレイが途中で落ちていた場合に、落ちる直前の状態に戻す。
+    再実行中のゲーム出力は表示しない（update.output_sink を止める）。
+
+    Args:
+        state: セーブから読み込んだ状態
+        update: create_update で作ったupdate関数
+        slot_path: SAVEディレクトリのパス
+
+    Returns:
+        復元後の状態
+    """
+    applied = saved_journal_seq(slot_path)
+    pending = [(seq, cmd) for seq, cmd in read_journal(slot_path) if seq > applied]
+    if not pending:
+        return state
+
+    journal = get_journal(slot_path)
+    # モジュールの output は他のセッションと共有なので書き換えず、この update の出力だけ止める
+    sink = getattr(update, "output_sink", None) or OutputSink(_module_output)
+    sink.muted = True
+    try:
+        for seq, cmd in pending:
+            journal.current_seq = seq
+            try:
+                state = update(state, cmd)
+            except Exception as e:
+                # 落ちた原因のコマンドで再び落ちないよう、飛ばして続ける
+                append_log(slot_path, f"Journal replay skipped #{seq} '{cmd}': {e}")
+    finally:
+        sink.muted = False
+
+    save_game(state, slot_path)
+    append_log(slot_path, f"Recovered {len(pending)} commands from journal")
+    return state
+
+
+def create_journaled_update(update, slot_path: Path):
+    """コマンドを適用する前にジャーナルへ記録するupdate関数を作成"""
+    journal = get_journal(slot_path)
+    max_entries = getattr(config, "JOURNAL_MAX_ENTRIES", 1000)
+
+    def journaled_update(state: GameState, cmd: str) -> GameState:
+        journal.record(cmd)
+        new_state = update(state, cmd)
+
+        # 全コマンドが反映済みの状態をディスクに確定できればジャーナルを空にする
+        if journal.entry_count >= max_entries:
+            save_log = get_save_log(slot_path)
+            if save_log.journal_seq == journal.current_seq:
+                save_log.sync()
+                journal.reset()
+        return new_state
+
+    return journaled_update
+
+
+def enable_journal(state: GameState, update, slot_path: Path):
+    """
+    ジャーナルからの復元と、ジャーナル付きupdate関数の作成をまとめて行う
+
+    JOURNAL_ENABLED が False なら何もしない。
+
+    Returns:
+        (復元後の状態, update関数)
+    """
+    if not getattr(config, "JOURNAL_ENABLED", True):
+        return state, update
+    state = recover_state(state, update, slot_path)
+    return state, create_journaled_update(update, slot_path)
+
+
+def enable_recording(state: GameState, update, slot_path: Path, meta: dict):
+    """
+    セッションのコマンドとAIの乱数シードを replays/ に記録するupdate関数を作成
+
+    記録は python -m src.ingame.replay で再生できる。
+    RECORD_SESSIONS が False なら update をそのまま返す。
+    """
+    if not getattr(config, "RECORD_SESSIONS", True):
+        return update
+    recorder = start_recording(
+        Path(slot_path) / REPLAYS_DIR, state, meta,
+        keep=getattr(config, "REPLAY_KEEP", 10),
+    )
+    _recorders[Path(slot_path)] = recorder
+    return recorder.wrap(update, ai_module)
+
+
+def enable_hot_reload(update, slot_path: Path, output: Callable[[str], None] | None = None):
+    """
+    ai.py を保存したら次のコマンドの前に読み直すupdate関数を作成
+    （rules.py / hooks.py は ai.py が import している場合だけ読み直す）
+
+    GameState はそのまま引き継ぐ。読み直した結果（かかった時間）は画面（output）とログに出す。
+    HOT_RELOAD が False なら update をそのまま返す。
+    """
+    if not getattr(config, "HOT_RELOAD", True):
+        return update
+
+    from src.ingame.hot_reload import create_hot_reload_update
+
+    def set_ai(module) -> None:
+        global ai_module
+        ai_module = module
+
+    output = output or _module_output
+
+    def report(result) -> None:
+        output(result.describe())
+        append_log(slot_path, result.describe())
+
+    return create_hot_reload_update(update, slot_path, lambda: ai_module, set_ai, report)
+
+
+def create_renderer(stage_mode: str):
+    """modeに応じたレンダラーを作成"""
+    if stage_mode in ("LEXER", "PARSER"):
+        # LEXER/PARSERモードではTextGridを表示しない
+        return lambda s: ""
+    return create_game_renderer(
+        char_mapping=config.CHAR_MAPPING,
+        show_status=True,
+        show_log=True,
+    )
+
+
 def run(slot_path: Path) -> None:
     """ゲームを実行"""
     slot_path = Path(slot_path)
@@ -2523,15 +2800,7 @@ def run(slot_path: Path) -> None:
     append_log(slot_path, "Game started")
 
     # レンダラー作成（LEXER/PARSERモードでは簡略化）
-    if stage_mode in ("LEXER", "PARSER"):
-        # LEXER/PARSERモードではTextGridを表示しない
-        render = lambda s: ""
-    else:
-        render = create_game_renderer(
-            char_mapping=config.CHAR_MAPPING,
-            show_status=True,
-            show_log=True,
-        )
+    render = create_renderer(stage_mode)
 
     # インタプリタ作成
     interpreter = Interpreter()
@@ -2539,6 +2808,11 @@ def run(slot_path: Path) -> None:
     # update関数作成（meta情報を渡す）
     update = create_update(slot_path, interpreter, meta)
 
+    # 前回落ちていたらジャーナルから復元し、以降のコマンドを記録する
+    state, update = enable_journal(state, update, slot_path)
+    update = enable_recording(state, update, slot_path, meta)
+    update = enable_hot_reload(update, slot_path)
+
     # ゲームループ実行
     hint_text = get_hint_text(stage_input_mode, stage_mode)
 
@@ -2549,19 +2823,46 @@ def run(slot_path: Path) -> None:
         except EOFError:
             return "quit"
 
-    final_state = run_game_loop(
-        initial_state=state,
-        get_input=game_get_input,
-        update=update,
-        render=render,
-        output=output,
-        quit_commands=("quit", "exit", "q"),
-    )
+    try:
+        # 敵AIのあるモードでは、設定に応じて一定間隔でAIを進める（リアルタイム）
+        tick_interval = getattr(config, "AI_TICK_INTERVAL", 0)
+        if stage_mode in AI_TICK_MODES and tick_interval > 0:
+            import asyncio
+
+            async_input = create_async_input("CMD> ")
+
+            async def game_get_input_async() -> str:
+                print(hint_text)
+                return await async_input()
+
+            final_state = asyncio.run(run_game_loop_async(
+                initial_state=state,
+                get_input=game_get_input_async,
+                update=update,
+                render=render,
+                output=output,
+                tick=lambda s: update(s, "wait"),
+                tick_interval=tick_interval,
+                quit_commands=("quit", "exit", "q"),
+            ))
+        else:
+            final_state = run_game_loop(
+                initial_state=state,
+                get_input=game_get_input,
+                update=update,
+                render=render,
+                output=output,
+                quit_commands=("quit", "exit", "q"),
+            )
 
-    # 最終保存
-    save_state(final_state, slot_path)
-    update_meta(slot_path, final_state)
-    append_log(slot_path, f"Game ended. Turn: {final_state.turn}, Score: {final_state.score}")
+        # 最終保存
+        save_game(final_state, slot_path)
+        append_log(slot_path, f"Game ended. Turn: {final_state.turn}, Score: {final_state.score}")
+    finally:
+        # Ctrl+C や update・AIの例外で抜けても、圧縮スレッドとジャーナルを閉じる
+        # （キャッシュしたモジュールに開いたままのハンドルを残さない。
+        #   セーブされていないコマンドはジャーナルに残り、次回 recover_state で戻る）
+        close_saves(slot_path)
 
     print()
     print(f"Game saved. Turn: {final_state.turn}, Score: {final_state.score}")
@@ -31,3 +31,6 @@ FLEE_HP = 30        # CHASE -> FLEE when HP <= this
 
 # AI enabled by default
 AI_ENABLED = True
+
+# AI tick interval in seconds (0 = turn-based, >0 = enemy AI moves without waiting for input)
+AI_TICK_INTERVAL = 0
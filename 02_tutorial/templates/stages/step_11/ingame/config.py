@@ -32,3 +32,6 @@ ATTACK_RANGE = 1
 
 # AI enabled by default
 AI_ENABLED = True
+
+# AI tick interval in seconds (0 = turn-based, >0 = enemy AI moves without waiting for input)
+AI_TICK_INTERVAL = 0
@@ -36,3 +36,6 @@ CHASE_DISTANCE_HIGH = 3    # When tension is HIGH
 # AI enabled by default
 AI_ENABLED = True
 DIRECTOR_ENABLED = True
+
+# AI tick interval in seconds (0 = turn-based, >0 = enemy AI moves without waiting for input)
+AI_TICK_INTERVAL = 0
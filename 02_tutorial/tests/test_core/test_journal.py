@@ -0,0 +1,167 @@
+"""
+コマンドジャーナルと、ジャーナルからの復元（game.recover_state）のテスト
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from src.core.journal import JOURNAL_FILE, CommandJournal, read_journal
+from src.core.savelog import saved_journal_seq, state_to_dict
+from src.dsl.interpreter import Interpreter
+from src.ingame.runner import load_game_module
+from src.outgame.save_manager import SaveManager
+
+
+TUTORIAL_ROOT = Path(__file__).resolve().parents[2]
+
+# 結果が乱数に依存しない INTERPRETER モードのコマンド（1コマンド = 1ターン）
+COMMANDS = [
+    "spawn enemy 15 5", "move player 3 4", "spawn goblin 2 2", "set player.hp 50",
+    "move player 6 6", "destroy enemy", "move player 7 6", "spawn orc 9 1",
+    "move player 8 6", "set player.hp 40", "move player 9 6",
+]
+
+# 子プロセスでゲームを進め、最後の状態を出力してから後始末をせずに終了する（クラッシュ）
+CRASH_SESSION = """
+import json, os, sys
+from pathlib import Path
+sys.path.insert(0, {root!r})
+from src.core.savelog import state_to_dict
+from src.dsl.interpreter import Interpreter
+from src.ingame.runner import load_game_module
+
+slot = Path({slot!r})
+game = load_game_module(slot, cache=False)
+game.config.AUTO_SAVE_EVERY = 4
+game.config.SAVE_SNAPSHOT_EVERY = 2
+game.output = lambda text: None
+state = game.load_state(slot)
+update = game.create_update(slot, Interpreter(), game.load_meta(slot))
+state, update = game.enable_journal(state, update, slot)
+for cmd in {commands!r}:
+    state = update(state, cmd)
+print(json.dumps(state_to_dict(state)))
+sys.stdout.flush()
+os._exit(1)
+"""
+
+
+# ============================================
+# CommandJournal
+# ============================================
+
+
+def test_record_and_read(tmp_path: Path) -> None:
+    """記録したコマンドが通し番号つきで読める"""
+    journal = CommandJournal(tmp_path)
+    assert [journal.record(cmd) for cmd in ("w", "move player 1 2", "状態")] == [1, 2, 3]
+    journal.close()
+
+    assert read_journal(tmp_path) == [(1, "w"), (2, "move player 1 2"), (3, "状態")]
+
+
+def test_numbering_continues(tmp_path: Path) -> None:
+    """開き直すとジャーナルの最後（空ならセーブ済みの番号）の続きから番号を振る"""
+    journal = CommandJournal(tmp_path)
+    journal.record("w")
+    journal.record("a")
+    journal.close()
+
+    reopened = CommandJournal(tmp_path, start_seq=1)
+    assert reopened.record("s") == 3
+    reopened.reset()
+    reopened.close()
+
+    assert read_journal(tmp_path) == []
+    assert CommandJournal(tmp_path, start_seq=3).record("d") == 4
+
+
+def test_torn_last_line_is_ignored(tmp_path: Path) -> None:
+    """書き込み途中で落ちた最後の行は無視する"""
+    journal = CommandJournal(tmp_path)
+    journal.record("w")
+    journal.close()
+    with open(tmp_path / JOURNAL_FILE, "a", encoding="utf-8") as f:
+        f.write('{"seq": 2, "cm')
+
+    assert read_journal(tmp_path) == [(1, "w")]
+
+
+# ============================================
+# クラッシュからの復元
+# ============================================
+
+
+def start_session(slot_path: Path):
+    """ゲームを起動した時と同じ手順で、状態とupdate関数を用意する（ジャーナルから復元される）"""
+    game = load_game_module(slot_path, cache=False)
+    game.config.AUTO_SAVE_EVERY = 4
+    game.config.SAVE_SNAPSHOT_EVERY = 2
+    game.output = lambda text: None
+    state = game.load_state(slot_path)
+    update = game.create_update(slot_path, Interpreter(), game.load_meta(slot_path))
+    state, update = game.enable_journal(state, update, slot_path)
+    return game, state, update
+
+
+def crash_session(saves_path: Path) -> tuple[Path, dict]:
+    """子プロセスで COMMANDS を入力して落とし、(スロット, 落ちる直前の状態) を返す"""
+    manager = SaveManager(TUTORIAL_ROOT, saves_path=saves_path)
+    assert manager.setup("CRASH", "step_07")
+    slot_path = manager.get_slot_path("CRASH")
+
+    result = subprocess.run(
+        [sys.executable, "-c", CRASH_SESSION.format(
+            root=str(TUTORIAL_ROOT), slot=str(slot_path), commands=COMMANDS,
+        )],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 1, result.stderr
+    return slot_path, json.loads(result.stdout.splitlines()[-1])
+
+
+def test_recover_state_after_crash(tmp_path: Path) -> None:
+    """途中で落ちたセッションが、スナップショット + 差分ログ + ジャーナルから同じ状態に戻る"""
+    slot_path, crashed = crash_session(tmp_path)
+
+    # セーブは数ターンごとなので、最後のコマンドはジャーナルにしか無い
+    assert saved_journal_seq(slot_path) < len(COMMANDS)
+    assert read_journal(slot_path)[-1] == (len(COMMANDS), COMMANDS[-1])
+
+    game, recovered, _ = start_session(slot_path)
+    game.close_saves(slot_path)
+    assert state_to_dict(recovered) == crashed
+    assert recovered.turn == len(COMMANDS)
+
+    # 復元した状態はセーブされ、次の起動ではジャーナルを使わずに同じ状態になる
+    assert saved_journal_seq(slot_path) == len(COMMANDS)
+    assert read_journal(slot_path) == []
+    game, reloaded, _ = start_session(slot_path)
+    game.close_saves(slot_path)
+    assert state_to_dict(reloaded) == crashed
+
+
+def test_recover_state_mutes_only_its_update(tmp_path: Path) -> None:
+    """復元中はその update の出力だけを止め、モジュールの output（他のセッションと共有）は変えない"""
+    slot_path, crashed = crash_session(tmp_path)
+    game = load_game_module(slot_path, cache=False)
+    module_output = game.output
+    shown: list[str] = []
+
+    state = game.load_state(slot_path)
+    update = game.create_update(
+        slot_path, Interpreter(), game.load_meta(slot_path), output=shown.append,
+    )
+    state, update = game.enable_journal(state, update, slot_path)
+
+    assert state_to_dict(state) == crashed
+    assert shown == []
+    assert game.output is module_output
+
+    # 復元後は元どおり表示される
+    update(state, "move player 1 1")
+    game.close_saves(slot_path)
+    assert "[Execute] move player 1 1" in "\n".join(shown)
@@ -0,0 +1,57 @@
+"""
+LayeredRenderer のテスト
+"""
+
+from src.core.renderer import LayeredRenderer, TextGrid, add_border
+from src.core.state import Entity, GameState, Position
+
+
+def make_state() -> GameState:
+    """壁・敵・プレイヤーのいる小さなマップ"""
+    return GameState(
+        player=Entity(id="player", name="Player", pos=Position(1, 1)),
+        entities=(
+            Entity(id="wall", name="Wall", pos=Position(0, 0)),
+            Entity(id="enemy", name="Goblin", pos=Position(3, 2)),
+        ),
+        map_width=5,
+        map_height=3,
+    )
+
+
+def render_with_grid(state: GameState, char_mapping: dict[str, str], overlay) -> str:
+    """TextGrid で同じマップを描く（比較用）"""
+    grid = TextGrid(state.map_width, state.map_height, ".")
+    for entity in state.entities:
+        grid.set(entity.pos.x, entity.pos.y, char_mapping[entity.id])
+    for x, y, char in overlay:
+        grid.set(x, y, char)
+    grid.set(state.player.pos.x, state.player.pos.y, "@")
+    return add_border(grid).render()
+
+
+def test_matches_text_grid() -> None:
+    """1文字のグリフでは TextGrid と同じマップになる"""
+    mapping = {"wall": "#", "enemy": "E"}
+    state = make_state()
+    overlay = [(2, 1, "*"), (2, 2, "*")]
+
+    rendered = LayeredRenderer(mapping).render_map(state, overlay)
+
+    assert rendered == render_with_grid(state, mapping, overlay)
+
+
+def test_multi_character_glyph_is_truncated() -> None:
+    """2文字以上のグリフは先頭の1文字だけを描き、行の幅（枠の位置）は変わらない"""
+    mapping = {"wall": "##", "enemy": "Orc"}
+    state = make_state()
+    overlay = [(2, 1, "**"), (4, 0, "")]
+
+    renderer = LayeredRenderer(mapping, player_char="@@")
+    rows = renderer.render_map(state, overlay).split("\n")
+
+    assert {len(row) for row in rows} == {state.map_width + 2}
+    assert rows[1][1:-1] == "#...."
+    assert rows[2][1:-1] == ".@*.."
+    assert rows[3][1:-1] == "...O."
+    assert "\n".join(rows) == render_with_grid(state, mapping, overlay)
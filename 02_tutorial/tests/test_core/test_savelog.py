@@ -0,0 +1,155 @@
+"""
+スナップショット + 差分ログ（SaveLog）のテスト
+
+書いた状態が state.json / state.bin とログから同じ内容で復元できることを確かめる。
+"""
+
+from pathlib import Path
+
+import pytest
+
+from src.core.safe_io import read_json_checked
+from src.core.savelog import (
+    SaveLog,
+    list_log_generations,
+    replay_onto_state,
+    replay_save_log,
+    saved_journal_seq,
+    state_from_dict,
+    state_to_dict,
+)
+from src.core.state import Entity, GameState, Position
+from src.core.state_codec import decode_state, encode_state
+from src.ingame.runner import load_game_module
+from src.outgame.save_manager import SaveManager
+
+
+TUTORIAL_ROOT = Path(__file__).resolve().parents[2]
+
+
+def make_states(count: int = 10) -> list[GameState]:
+    """1ターンごとに移動・出現・削除・FSM状態の変化がある状態の列"""
+    state = GameState(
+        player=Entity(id="player", name="Player", pos=Position(5, 5)),
+        entities=(Entity(id="enemy", name="Goblin", pos=Position(1, 1)),),
+    )
+    states = [state]
+    for turn in range(1, count):
+        entities = list(state.entities)
+        entities[0] = entities[0].move_by(1, 0)
+        if turn % 3 == 0:
+            entities.append(Entity(id="enemy", name=f"Orc{turn}", pos=Position(turn, 2)))
+        if turn % 4 == 0:
+            entities.pop(1)
+        if turn % 2 == 0:
+            object.__setattr__(entities[0], "fsm_state", "CHASE" if turn % 4 else "IDLE")
+        state = state.move_player(0, 1 if turn % 2 else -1).replace(
+            entities=tuple(entities), score=turn * 10,
+        ).next_turn()
+        states.append(state)
+    return states
+
+
+def load_json_save(slot_path: Path) -> GameState:
+    """state.json に差分ログを重ねて読む（game.load_state のJSON形式と同じ手順）"""
+    data = read_json_checked(slot_path / "state.json")
+    return state_from_dict(replay_save_log(slot_path, data))
+
+
+def write_states(slot_path: Path, states: list[GameState], **options) -> SaveLog:
+    """状態を順に SaveLog へ書く（閉じずに返す）"""
+    save_log = SaveLog(slot_path, **options)
+    for seq, state in enumerate(states, start=1):
+        save_log.append(state, journal_seq=seq)
+    return save_log
+
+
+def test_json_round_trip(tmp_path: Path) -> None:
+    """世代をまたいで書いた最後の状態が state.json + ログから復元できる"""
+    states = make_states(10)
+    write_states(tmp_path, states, snapshot_every=3).close()
+
+    assert state_to_dict(load_json_save(tmp_path)) == state_to_dict(states[-1])
+    # コンパクション後は最新の世代だけが残る
+    assert len(list_log_generations(tmp_path)) == 1
+
+
+def test_binary_round_trip(tmp_path: Path) -> None:
+    """state.bin に replay_onto_state で差分を重ねると最後の状態になる"""
+    states = make_states(10)
+    write_states(tmp_path, states, snapshot_every=4, snapshot_format="binary").close()
+
+    assert not (tmp_path / "state.json").exists()
+    snapshot, log_generation = decode_state((tmp_path / "state.bin").read_bytes())
+    restored = replay_onto_state(tmp_path, snapshot, log_generation)
+
+    assert state_to_dict(restored) == state_to_dict(states[-1])
+
+
+def test_replay_onto_state_across_uncompacted_generations(tmp_path: Path) -> None:
+    """古いスナップショットより後の世代が残っていても（コンパクション前の終了）復元できる"""
+    states = make_states(10)
+    write_states(tmp_path, states, snapshot_every=100).close()
+    base, _ = decode_state(encode_state(states[0]))
+
+    # 世代0のスナップショットとして読むと、世代1の先頭の完全スナップショットから重ねる
+    restored = replay_onto_state(tmp_path, base, 0)
+
+    assert state_to_dict(restored) == state_to_dict(states[-1])
+
+
+def test_torn_last_record_is_ignored(tmp_path: Path) -> None:
+    """書き込み途中で落ちた最後の行は無視し、その前の状態に戻る"""
+    states = make_states(6)
+    save_log = write_states(tmp_path, states, snapshot_every=100)
+    save_log.close()
+    log_file = tmp_path / "state.000001.log"
+    with open(log_file, "a", encoding="utf-8") as f:
+        f.write('{"turn": 99, "score"')
+
+    assert state_to_dict(load_json_save(tmp_path)) == state_to_dict(states[-1])
+
+
+def test_saved_journal_seq(tmp_path: Path) -> None:
+    """最後に記録したコマンド番号を返す（ログが無ければ0）"""
+    assert saved_journal_seq(tmp_path) == 0
+
+    states = make_states(7)
+    write_states(tmp_path, states, snapshot_every=3).close()
+
+    assert saved_journal_seq(tmp_path) == len(states)
+
+
+def test_reopen_continues_log(tmp_path: Path) -> None:
+    """閉じた後に開き直して追記しても、最後の状態が復元できる"""
+    states = make_states(10)
+    write_states(tmp_path, states[:5], snapshot_every=3).close()
+    save_log = SaveLog(tmp_path, snapshot_every=3)
+    for state in states[5:]:
+        save_log.append(state)
+    save_log.close()
+
+    assert state_to_dict(load_json_save(tmp_path)) == state_to_dict(states[-1])
+
+
+def test_run_closes_saves_on_error(tmp_path: Path, monkeypatch) -> None:
+    """ゲームループが例外（Ctrl+C など）で抜けても、差分ログとジャーナルを閉じる"""
+    manager = SaveManager(TUTORIAL_ROOT, saves_path=tmp_path)
+    assert manager.setup("INTERRUPTED", "step_07")
+    slot_path = manager.get_slot_path("INTERRUPTED")
+    game = load_game_module(slot_path, cache=False)
+
+    commands = iter(["move player 3 4", "spawn enemy 5 5"])
+
+    def interrupted_input(prompt: str = "") -> str:
+        command = next(commands, None)
+        if command is None:
+            raise KeyboardInterrupt
+        return command
+
+    monkeypatch.setattr("builtins.input", interrupted_input)
+    with pytest.raises(KeyboardInterrupt):
+        game.run(slot_path)
+
+    assert slot_path not in game._save_logs
+    assert slot_path not in game._journals
@@ -0,0 +1,42 @@
+"""
+起動時間の予算のテスト
+
+main.measure_startup で子プロセスを起動して計測する（python main.py --profile-startup と同じ計測）。
+"""
+
+import pytest
+
+from main import STARTUP_BUDGET_MS, measure_startup
+
+
+# PATHFINDING以外のStage（A*経路探索を読み込まないはずのもの）
+NON_PATHFINDING_STAGES = ["step_09", "step_13"]
+
+
+@pytest.fixture(scope="module", params=NON_PATHFINDING_STAGES)
+def startup(request: pytest.FixtureRequest) -> dict[str, dict]:
+    """Stageごとに1回だけ計測する"""
+    return measure_startup(request.param)
+
+
+def test_each_phase_within_budget(startup: dict[str, dict]) -> None:
+    """メニューの起動とゲームのロードが予算内"""
+    assert set(startup) == set(STARTUP_BUDGET_MS)
+    for phase, measured in startup.items():
+        assert measured["elapsed_ms"] <= STARTUP_BUDGET_MS[phase], (
+            f"{phase}: {measured['elapsed_ms']:.1f} ms > {STARTUP_BUDGET_MS[phase]} ms"
+        )
+
+
+def test_menu_does_not_load_runner(startup: dict[str, dict]) -> None:
+    """メニューの起動ではランナーと asyncio を読み込まない"""
+    modules = startup["menu"]["modules"]
+    assert "src.ingame.runner" not in modules
+    assert "asyncio" not in modules
+
+
+def test_game_load_skips_pathfinding(startup: dict[str, dict]) -> None:
+    """PATHFINDING以外のStageのゲームのロードでは経路探索と asyncio を読み込まない"""
+    modules = startup["game"]["modules"]
+    assert "src.algorithms.pathfinding" not in modules
+    assert "asyncio" not in modules
@@ -0,0 +1,106 @@
+"""
+GameState バイナリコーデックのテスト
+"""
+
+import struct
+
+import pytest
+
+from src.core.savelog import state_to_dict
+from src.core.state import Entity, GameState, Position
+from src.core.state_codec import (
+    HEADER,
+    StateCodecError,
+    decode_state,
+    encode_state,
+    is_binary_state,
+)
+
+
+def make_state() -> GameState:
+    """FSM状態・日本語の名前・非アクティブなエンティティを含む状態"""
+    chaser = Entity(id="enemy", name="追跡者", pos=Position(3, 4), hp=70)
+    object.__setattr__(chaser, "fsm_state", "CHASE")
+    return GameState(
+        player=Entity(id="player", name="Player", pos=Position(1, 2), hp=90),
+        entities=(
+            chaser,
+            Entity(id="wall", name="Wall", pos=Position(0, 0), hp=1, is_active=False),
+            Entity(id="enemy", name="Goblin", pos=Position(19, 9), hp=-5),
+        ),
+        turn=12,
+        score=340,
+        is_game_over=False,
+        map_width=20,
+        map_height=10,
+    )
+
+
+def test_round_trip() -> None:
+    """エンコードしてデコードすると同じ状態とログ世代に戻る（FSM状態を含む）"""
+    state = make_state()
+    decoded, log_generation = decode_state(encode_state(state, log_generation=7))
+
+    assert log_generation == 7
+    assert decoded == state
+    assert state_to_dict(decoded) == state_to_dict(state)
+    assert decoded.entities[0].fsm_state == "CHASE"
+    assert not hasattr(decoded.entities[1], "fsm_state")
+
+
+def test_round_trip_without_entities() -> None:
+    """エンティティが0体でも戻る"""
+    state = GameState(turn=3, is_game_over=True)
+    decoded, log_generation = decode_state(encode_state(state))
+
+    assert log_generation == 0
+    assert decoded == state
+
+
+def test_is_binary_state() -> None:
+    """先頭のマジックで形式を判定する"""
+    assert is_binary_state(encode_state(make_state()))
+    assert not is_binary_state(b'{"version": "1.0"}')
+
+
+def test_checksum_mismatch() -> None:
+    """1バイトでも壊れていれば StateCodecError"""
+    data = bytearray(encode_state(make_state()))
+    data[HEADER.size + 2] ^= 0xFF
+
+    with pytest.raises(StateCodecError, match="checksum"):
+        decode_state(bytes(data))
+
+
+def test_truncated_data() -> None:
+    """途中で切れたデータは StateCodecError"""
+    data = encode_state(make_state())
+
+    with pytest.raises(StateCodecError):
+        decode_state(data[:len(data) // 2])
+    with pytest.raises(StateCodecError):
+        decode_state(data[:HEADER.size - 1])
+
+
+def test_not_binary() -> None:
+    """バイナリ形式でなければ StateCodecError"""
+    with pytest.raises(StateCodecError):
+        decode_state(b'{"version": "1.0", "player": {}}' * 4)
+
+
+def test_version_1_without_checksum() -> None:
+    """checksum の無いバージョン1のデータも読める"""
+    state = make_state()
+    body = encode_state(state, log_generation=2)[:-4]
+    version_1 = body[:4] + struct.pack("<H", 1) + body[6:]
+
+    assert decode_state(version_1) == (state, 2)
+
+
+def test_unsupported_version() -> None:
+    """知らないバージョンは StateCodecError"""
+    data = encode_state(make_state())
+    future = data[:4] + struct.pack("<H", 99) + data[6:]
+
+    with pytest.raises(StateCodecError, match="version"):
+        decode_state(future)
@@ -4,35 +4,179 @@ Asset Generator
 Mermaid図とAI画像の生成を担当
 """
 
+import io
 import json
+import os
+import struct
 import subprocess
 import tempfile
 import shutil
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 from PIL import Image, ImageDraw, ImageFont
 
+from build_cache import AssetStore, mermaid_key
+
+
+# Mermaid図の描画方法（auto: mmdcがあれば使い、なければスキップ）
+MERMAID_RENDERERS = ("auto", "mmdc", "stub")
+
+DEFAULT_MERMAID_WORKERS = 4
+
+# プレースホルダー画像の文字色・枠線の色
+PLACEHOLDER_TEXT_COLOR = "#666666"
+PLACEHOLDER_BORDER_COLOR = "#CCCCCC"
+
+
+@lru_cache(maxsize=None)
+def mermaid_cli_available() -> bool:
+    """Mermaid CLI（mmdc）がPATHにあるか（プロセスごとに1回だけ調べる）"""
+    return shutil.which("mmdc") is not None
+
+
+def _parse_rgb(color: str) -> tuple:
+    """"#RRGGBB" / "white" などをRGBに変換（不明な値は白）"""
+    if color.startswith("#") and len(color) == 7:
+        return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+    return {"black": (0, 0, 0)}.get(color, (255, 255, 255))
+
+
+@lru_cache(maxsize=None)
+def _placeholder_font():
+    """プレースホルダーの文字に使うフォント（プロセスごとに1回だけ読み込む）"""
+    # macOS/Linux用フォント検索
+    font_paths = [
+        "/System/Library/Fonts/Helvetica.ttc",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+        "/usr/share/fonts/TTF/DejaVuSans.ttf"
+    ]
+    try:
+        for fp in font_paths:
+            if Path(fp).exists():
+                return ImageFont.truetype(fp, 24)
+    except Exception:
+        pass
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=64)
+def placeholder_png(text: str, width: int, height: int, bg_color: str) -> bytes:
+    """
+    プレースホルダー画像のPNG
+
+    出力は引数（文字・大きさ・色）だけで決まるので、同じ内容の画像は
+    プロセス内で1回だけ描画してバイト列を使い回す。
+    """
+    img = Image.new("RGB", (width, height), bg_color)
+    draw = ImageDraw.Draw(img)
+    font = _placeholder_font()
+
+    # テキスト中央配置
+    text_bbox = draw.textbbox((0, 0), text, font=font)
+    text_width = text_bbox[2] - text_bbox[0]
+    text_height = text_bbox[3] - text_bbox[1]
+    x = (width - text_width) // 2
+    y = (height - text_height) // 2
+
+    draw.text((x, y), text, fill=PLACEHOLDER_TEXT_COLOR, font=font)
+
+    # 枠線
+    draw.rectangle(
+        [(10, 10), (width - 10, height - 10)],
+        outline=PLACEHOLDER_BORDER_COLOR,
+        width=2
+    )
+
+    buffer = io.BytesIO()
+    img.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def read_image_header(path: Path) -> Optional[tuple]:
+    """画像のヘッダーだけを読んで (形式, 幅, 高さ) を返す（画像として読めなければNone）"""
+    try:
+        # Image.open はヘッダーだけを読み、画素のデコードは load() まで行わない
+        with Image.open(path) as img:
+            return img.format, img.width, img.height
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+
+def _solid_png(width: int, height: int, rgb: tuple) -> bytes:
+    """単色のPNG画像（PILを使わずに作る）"""
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data)) + tag + data +
+            struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+        )
+
+    row = b"\x00" + bytes(rgb) * width
+    return (
+        b"\x89PNG\r\n\x1a\n" +
+        chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)) +
+        chunk(b"IDAT", zlib.compress(row * height)) +
+        chunk(b"IEND", b"")
+    )
+
+
+def render_mermaid_stub(
+    source: str,
+    output_path: Path,
+    background: str = "white",
+    delay: float = 0.0
+):
+    """mmdcの代わりにソースの行数に応じた大きさの単色PNGを書く（テスト・ベンチマーク用）"""
+    if delay:
+        time.sleep(delay)
+    lines = max(1, len(source.strip().splitlines()))
+    height = min(1200, 120 + 40 * lines)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_bytes(_solid_png(800, height, _parse_rgb(background)))
+
 
 class AssetGenerator:
     """素材生成クラス"""
 
-    def __init__(self, project_root: str, theme: dict):
+    def __init__(
+        self,
+        project_root: str,
+        theme: dict,
+        cache_dir: str = None,
+        max_workers: int = None,
+        mermaid_renderer: str = "auto",
+        stub_delay: float = 0.0
+    ):
         self.project_root = Path(project_root)
         self.theme = theme
-        self.mermaid_available = self._check_mermaid()
         self.processing_log = []
 
+        mermaid_config = self.theme.get("mermaid", {})
+        self.mermaid_theme = mermaid_config.get("theme", "default")
+        self.mermaid_bg = mermaid_config.get("background", "white")
+        self.mermaid_scale = mermaid_config.get("scale", 2)
+        self.max_workers = max(1, max_workers or mermaid_config.get(
+            "max_workers", min(DEFAULT_MERMAID_WORKERS, os.cpu_count() or 1)
+        ))
+
+        if mermaid_renderer not in MERMAID_RENDERERS:
+            raise ValueError(f"不明なMermaidレンダラー: {mermaid_renderer}")
+        self.mermaid_renderer = mermaid_renderer
+        self.stub_delay = stub_delay
+        self.mermaid_available = (
+            mermaid_renderer == "stub" or self._check_mermaid()
+        )
+        # 描画結果のキャッシュ（ビルドをまたいで共有、build_cache.asset_store_dir を渡す）
+        self.mermaid_cache = AssetStore(Path(cache_dir)) if cache_dir else None
+        # Mermaid図ごとのキャッシュのヒット/ミス（インクリメンタルビルドの集計用）
+        self.cache_report = {"hit": 0, "miss": 0}
+
     def _check_mermaid(self) -> bool:
         """Mermaid CLIの存在確認"""
-        try:
-            result = subprocess.run(
-                ["which", "mmdc"],
-                capture_output=True,
-                text=True
-            )
-            return result.returncode == 0
-        except Exception:
-            return False
+        return mermaid_cli_available()
 
     def generate_all(self, assets: dict) -> dict:
         """全素材を生成"""
@@ -43,8 +187,7 @@ class AssetGenerator:
         images_dir.mkdir(parents=True, exist_ok=True)
 
         # Mermaid図生成
-        for diagram in assets.get("diagrams", []):
-            self._generate_mermaid(diagram)
+        self._generate_mermaid_all(assets.get("diagrams", []))
 
         # 画像処理
         for image in assets.get("images", []):
@@ -58,46 +201,112 @@ class AssetGenerator:
             "processing_log": self.processing_log
         }
 
-    def _generate_mermaid(self, diagram: dict):
-        """Mermaid図を生成"""
-        if not self.mermaid_available:
-            self.processing_log.append(f"Mermaid CLI未検出、スキップ: {diagram['id']}")
-            diagram["status"] = "skipped"
-            self._create_placeholder_image(
-                self.project_root / diagram["output_path"],
-                "[Mermaid図]",
-                800, 600
-            )
+    def _mermaid_key(self, source: str) -> str:
+        """描画結果のキャッシュキー（build_cache.asset_key と同じ）"""
+        return mermaid_key(source, self.theme.get("mermaid", {}), self.mermaid_renderer)
+
+    def _generate_mermaid_all(self, diagrams: list):
+        """Mermaid図をまとめて生成（キャッシュにないものだけを並列に描画）"""
+        if not diagrams:
             return
 
-        try:
-            # 一時ファイルにMermaidソースを書き込み
-            with tempfile.NamedTemporaryFile(
-                mode="w",
-                suffix=".mmd",
-                delete=False,
-                encoding="utf-8"
-            ) as f:
-                f.write(diagram["source"])
-                temp_input = f.name
+        if not self.mermaid_available:
+            for diagram in diagrams:
+                self.processing_log.append(f"Mermaid CLI未検出、スキップ: {diagram['id']}")
+                diagram["status"] = "skipped"
+                self.cache_report["miss"] += 1
+                self._create_placeholder_image(
+                    self.project_root / diagram["output_path"],
+                    "[Mermaid図]",
+                    800, 600
+                )
+            return
 
+        # 同じ内容の図は1回だけ描画する
+        groups = {}
+        for diagram in diagrams:
+            groups.setdefault(self._mermaid_key(diagram["source"]), []).append(diagram)
+
+        results = {}
+        jobs = {}
+        for key, group in groups.items():
+            first_path = self.project_root / group[0]["output_path"]
+            if self.mermaid_cache and self.mermaid_cache.get(key, first_path):
+                results[key] = ("cached", None)
+            else:
+                jobs[key] = group[0]
+
+        if jobs:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                workers = min(self.max_workers, len(jobs))
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = {
+                        key: pool.submit(
+                            self._render_mermaid,
+                            diagram["source"],
+                            self.project_root / diagram["output_path"],
+                            Path(temp_dir) / f"{diagram['id']}.mmd"
+                        )
+                        for key, diagram in jobs.items()
+                    }
+                    for key, future in futures.items():
+                        error = future.result()
+                        results[key] = ("failed", error) if error else ("generated", None)
+                        if not error and self.mermaid_cache:
+                            output_path = self.project_root / jobs[key]["output_path"]
+                            self.mermaid_cache.put(key, output_path)
+
+        # 結果をアセットの順番どおりに反映（ログの順番を安定させる）
+        status = "stub" if self.mermaid_renderer == "stub" else "generated"
+        for diagram in diagrams:
+            key = self._mermaid_key(diagram["source"])
+            result, error = results[key]
             output_path = self.project_root / diagram["output_path"]
-            output_path.parent.mkdir(parents=True, exist_ok=True)
+            first_path = self.project_root / groups[key][0]["output_path"]
+            self.cache_report["hit" if result == "cached" else "miss"] += 1
+
+            if result == "failed":
+                self.processing_log.append(f"Mermaid図生成失敗: {diagram['id']} - {error}")
+                diagram["status"] = "failed"
+                self._create_placeholder_image(
+                    output_path,
+                    "[Mermaid図生成エラー]",
+                    800, 600
+                )
+                continue
+
+            if output_path != first_path:
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(first_path, output_path)
+            diagram["status"] = status
+            if result == "cached":
+                self.processing_log.append(f"Mermaid図キャッシュ再利用: {diagram['id']}")
+            else:
+                self.processing_log.append(f"Mermaid図生成成功: {diagram['id']}")
 
-            # Mermaid CLI設定
-            mermaid_config = self.theme.get("mermaid", {})
-            mermaid_theme = mermaid_config.get("theme", "default")
-            mermaid_bg = mermaid_config.get("background", "white")
-            mermaid_scale = mermaid_config.get("scale", 2)
+    def _render_mermaid(
+        self,
+        source: str,
+        output_path: Path,
+        temp_input: Path
+    ) -> Optional[str]:
+        """Mermaid図を1つ描画（ワーカースレッドで実行、失敗したらエラー内容を返す）"""
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            if self.mermaid_renderer == "stub":
+                render_mermaid_stub(source, output_path, self.mermaid_bg, self.stub_delay)
+                return None
+
+            temp_input.write_text(source, encoding="utf-8")
 
             # mmdc実行
             cmd = [
                 "mmdc",
-                "-i", temp_input,
+                "-i", str(temp_input),
                 "-o", str(output_path),
-                "-t", mermaid_theme,
-                "-b", mermaid_bg,
-                "-s", str(mermaid_scale)
+                "-t", self.mermaid_theme,
+                "-b", self.mermaid_bg,
+                "-s", str(self.mermaid_scale)
             ]
 
             result = subprocess.run(
@@ -108,25 +317,11 @@ class AssetGenerator:
             )
 
             if result.returncode == 0 and output_path.exists():
-                diagram["status"] = "generated"
-                self.processing_log.append(f"Mermaid図生成成功: {diagram['id']}")
-            else:
-                raise Exception(result.stderr)
+                return None
+            return result.stderr or f"mmdc終了コード {result.returncode}"
 
         except Exception as e:
-            self.processing_log.append(f"Mermaid図生成失敗: {diagram['id']} - {str(e)}")
-            diagram["status"] = "failed"
-            self._create_placeholder_image(
-                self.project_root / diagram["output_path"],
-                "[Mermaid図生成エラー]",
-                800, 600
-            )
-        finally:
-            # 一時ファイル削除
-            try:
-                Path(temp_input).unlink()
-            except Exception:
-                pass
+            return str(e)
 
     def _generate_image(self, image: dict):
         """AI画像を生成（プレースホルダーで代替）"""
@@ -151,12 +346,18 @@ class AssetGenerator:
         )
 
     def _verify_image(self, image: dict):
-        """既存画像ファイルを検証"""
+        """既存画像ファイルを検証（ヘッダーだけを読む）"""
         source_path = self.project_root / image["source_path"]
 
         if source_path.exists():
-            image["status"] = "verified"
-            self.processing_log.append(f"画像ファイル確認: {image['id']}")
+            header = read_image_header(source_path)
+            if header:
+                image["status"] = "verified"
+                self.processing_log.append(f"画像ファイル確認: {image['id']} ({header[0]} {header[1]}x{header[2]})")
+            else:
+                # 元のファイルなので、プレースホルダーで上書きしない
+                image["status"] = "invalid"
+                self.processing_log.append(f"画像ファイル読み込み不可: {image['id']} - {source_path}")
         else:
             image["status"] = "missing"
             self.processing_log.append(f"画像ファイル未検出: {image['id']} - {source_path}")
@@ -176,59 +377,26 @@ class AssetGenerator:
         width: int,
         height: int
     ):
-        """プレースホルダー画像を生成"""
+        """プレースホルダー画像を書き出す（同じ内容の画像は描画済みのものを使う）"""
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
         img_config = self.theme.get("image_generation", {})
         bg_color = img_config.get("placeholder_color", "#EEEEEE")
 
-        # PIL画像生成
-        img = Image.new("RGB", (width, height), bg_color)
-        draw = ImageDraw.Draw(img)
+        output_path.write_bytes(placeholder_png(text, width, height, bg_color))
 
-        # テキスト描画（システムフォント使用）
-        try:
-            # macOS/Linux用フォント検索
-            font_paths = [
-                "/System/Library/Fonts/Helvetica.ttc",
-                "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-                "/usr/share/fonts/TTF/DejaVuSans.ttf"
-            ]
-            font = None
-            for fp in font_paths:
-                if Path(fp).exists():
-                    font = ImageFont.truetype(fp, 24)
-                    break
-            if not font:
-                font = ImageFont.load_default()
-        except Exception:
-            font = ImageFont.load_default()
-
-        # テキスト中央配置
-        text_bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = text_bbox[2] - text_bbox[0]
-        text_height = text_bbox[3] - text_bbox[1]
-        x = (width - text_width) // 2
-        y = (height - text_height) // 2
-
-        draw.text((x, y), text, fill="#666666", font=font)
-
-        # 枠線
-        draw.rectangle(
-            [(10, 10), (width - 10, height - 10)],
-            outline="#CCCCCC",
-            width=2
-        )
 
-        img.save(output_path, "PNG")
-
-
-def generate_assets(json_path: str, project_root: str, theme: dict) -> dict:
-    """JSONから素材を生成"""
+def generate_assets(
+    json_path: str,
+    project_root: str,
+    theme: dict,
+    **options
+) -> dict:
+    """JSONから素材を生成（options は AssetGenerator にそのまま渡す）"""
     with open(json_path, "r", encoding="utf-8") as f:
         data = json.load(f)
 
-    generator = AssetGenerator(project_root, theme)
+    generator = AssetGenerator(project_root, theme, **options)
     result = generator.generate_all(data.get("assets", {}))
 
     # JSONを更新
@@ -243,23 +411,99 @@ def generate_assets(json_path: str, project_root: str, theme: dict) -> dict:
     return result
 
 
+def benchmark_mermaid(count: int, workers: int, delay: float) -> dict:
+    """スタブレンダラーで逐次・並列・キャッシュ済みのMermaid生成時間を比較"""
+    diagrams_source = [
+        f"graph TD\n  A{i}[開始] --> B{i}[処理{i}]\n  B{i} --> C{i}[終了]"
+        for i in range(count)
+    ]
+
+    def make_assets() -> dict:
+        return {"diagrams": [
+            {
+                "id": f"diagram_{i + 1:03d}",
+                "type": "mermaid",
+                "source": source,
+                "output_path": f"assets/diagrams/diagram_{i + 1:03d}.png",
+                "status": "pending"
+            }
+            for i, source in enumerate(diagrams_source)
+        ], "images": []}
+
+    results = {"diagrams": count, "workers": workers, "delay": delay}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache_dir = Path(temp_dir) / "cache"
+        runs = [
+            ("serial", 1, None),
+            ("parallel", workers, cache_dir),
+            ("cached", workers, cache_dir),
+        ]
+        for label, run_workers, run_cache in runs:
+            generator = AssetGenerator(
+                str(Path(temp_dir) / label), {},
+                cache_dir=run_cache,
+                max_workers=run_workers,
+                mermaid_renderer="stub",
+                stub_delay=delay
+            )
+            start = time.perf_counter()
+            generator.generate_all(make_assets())
+            results[label] = time.perf_counter() - start
+    return results
+
+
 if __name__ == "__main__":
     import argparse
     import yaml
 
     parser = argparse.ArgumentParser(description="Asset Generator")
-    parser.add_argument("--json", "-j", required=True, help="中間JSONファイル")
+    parser.add_argument("--json", "-j", help="中間JSONファイル")
     parser.add_argument("--project", "-p", default=".", help="プロジェクトルート")
     parser.add_argument("--theme", "-t", help="テーマYAMLファイル")
+    parser.add_argument("--cache-dir", help="Mermaid描画結果のキャッシュディレクトリ")
+    parser.add_argument("--workers", type=int, help="Mermaidを並列に描画する数")
+    parser.add_argument(
+        "--mermaid-renderer", choices=MERMAID_RENDERERS, default="auto",
+        help="Mermaidの描画方法（stub: mmdcなしで単色PNGを出力）"
+    )
+    parser.add_argument(
+        "--benchmark", type=int, metavar="N",
+        help="スタブレンダラーでN個の図の生成時間を計測"
+    )
+    parser.add_argument(
+        "--stub-delay", type=float, default=0.0,
+        help="スタブレンダラーの1図あたりの待ち時間（秒、mmdcの起動時間の代わり）"
+    )
 
     args = parser.parse_args()
 
+    if args.benchmark:
+        result = benchmark_mermaid(
+            args.benchmark,
+            args.workers or DEFAULT_MERMAID_WORKERS,
+            args.stub_delay
+        )
+        print(f"Mermaid図 {result['diagrams']}個 "
+              f"(workers={result['workers']}, delay={result['delay']}s)")
+        for label in ("serial", "parallel", "cached"):
+            print(f"  {label:<8} {result[label] * 1000:>8.1f} ms")
+        raise SystemExit(0)
+
+    if not args.json:
+        parser.error("--json または --benchmark を指定してください")
+
     theme = {}
     if args.theme and Path(args.theme).exists():
         with open(args.theme, "r", encoding="utf-8") as f:
             theme = yaml.safe_load(f)
 
-    result = generate_assets(args.json, args.project, theme)
+    result = generate_assets(
+        args.json, args.project, theme,
+        cache_dir=args.cache_dir,
+        max_workers=args.workers,
+        mermaid_renderer=args.mermaid_renderer,
+        stub_delay=args.stub_delay
+    )
 
     print("素材生成完了")
     for log in result["processing_log"]:
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Build Cache
+インクリメンタルビルド用のキャッシュ
+
+スライド・Mermaidソース・テーマの内容ハッシュをキーにして、
+前回のビルド結果（解析結果・素材・PowerPoint）を再利用する。
+"""
+
+import json
+import hashlib
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Optional
+
+
+CACHE_DIR_NAME = ".build_cache"
+
+# BuildCache が入れる素材の種類と、そのときのステータス
+# （Mermaid図は AssetGenerator が同じ素材ストアに mermaid_key で入れる）
+CACHEABLE_STATUS = {
+    "generated": "placeholder",
+}
+
+PHASES = ("parse", "assets", "slides", "render")
+
+
+def content_hash(value) -> str:
+    """文字列・バイト列・JSON化できる値のSHA-256"""
+    if isinstance(value, bytes):
+        data = value
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+    else:
+        data = json.dumps(value, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_signature(path: Path) -> Optional[list]:
+    """ファイルの [更新日時(ns), サイズ]（読めなければNone）"""
+    try:
+        info = Path(path).stat()
+    except OSError:
+        return None
+    return [info.st_mtime_ns, info.st_size]
+
+
+def asset_store_dir(cache_dir: Path) -> Path:
+    """素材ストアのディレクトリ（BuildCache と AssetGenerator で共有）"""
+    return Path(cache_dir) / "assets"
+
+
+def mermaid_key(source: str, mermaid_config: dict, renderer: str) -> str:
+    """Mermaid図の描画結果のキー（出力に影響する設定だけから作る）"""
+    return content_hash({
+        "source": source,
+        "theme": mermaid_config.get("theme", "default"),
+        "background": mermaid_config.get("background", "white"),
+        "scale": mermaid_config.get("scale", 2),
+        "renderer": "stub" if renderer == "stub" else "mmdc",
+    })
+
+
+def asset_key(asset: dict, theme: dict, project_root: Path, mermaid_renderer: str = "auto") -> str:
+    """素材のキャッシュキー（出力に影響する内容だけから作る）"""
+    if asset["type"] == "mermaid":
+        return mermaid_key(asset["source"], theme.get("mermaid", {}), mermaid_renderer)
+    if asset["type"] == "generated":
+        return content_hash({
+            "type": "generated",
+            "prompt": asset.get("prompt", ""),
+            "negative_prompt": asset.get("negative_prompt", ""),
+            "image_generation": theme.get("image_generation", {}),
+        })
+
+    # 既存ファイルはパスと更新日時・サイズで判定
+    return content_hash({
+        "type": asset["type"],
+        "source_path": asset.get("source_path"),
+        "stat": file_signature(project_root / asset.get("source_path", "")),
+    })
+
+
+def _without_source_lines(value):
+    """source_lines（元の行番号）を除いたコピー"""
+    if isinstance(value, dict):
+        return {k: _without_source_lines(v) for k, v in value.items() if k != "source_lines"}
+    if isinstance(value, list):
+        return [_without_source_lines(v) for v in value]
+    return value
+
+
+def slide_hash(slide: dict) -> str:
+    """スライド自体の内容のハッシュ（行番号は含めない）"""
+    return content_hash(_without_source_lines(slide))
+
+
+def slide_keys(slides: list, asset_keys: dict, theme_key: str) -> list:
+    """
+    各スライドのキャッシュキー（参照する素材の内容とテーマを含む）
+
+    行番号は含めない（前のスライドを編集して行がずれても、内容が同じならヒットする）
+    """
+    keys = []
+    for slide in slides:
+        refs = [
+            elem["asset_ref"]
+            for elem in slide.get("elements", [])
+            if isinstance(elem, dict) and elem.get("asset_ref")
+        ]
+        keys.append(content_hash({
+            "slide": _without_source_lines(slide),
+            "assets": [asset_keys.get(ref) for ref in refs],
+            "theme": theme_key,
+        }))
+    return keys
+
+
+class AssetStore:
+    """キーごとに素材ファイルを1つ保存するディスク上のストア"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def path(self, key: str) -> Path:
+        """キーに対応するファイルのパス"""
+        return self.root / key[:2] / f"{key}.png"
+
+    def get(self, key: str, dest: Path) -> bool:
+        """ストアにある素材を dest にコピー（なければFalse）"""
+        cached = self.path(key)
+        if not cached.exists():
+            return False
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(cached, dest)
+        return True
+
+    def put(self, key: str, source: Path):
+        """素材をストアに入れる（並列に書かれても壊れないよう一時ファイル経由）"""
+        if not source.exists():
+            return
+        cached = self.path(key)
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cached.with_name(f"{cached.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, cached)
+
+
+class BuildCache:
+    """前回ビルドのマニフェストと素材ストアを管理"""
+
+    def __init__(self, cache_dir: Path, input_path: str):
+        self.cache_dir = Path(cache_dir)
+        self.assets = AssetStore(asset_store_dir(self.cache_dir))
+        # 入力ファイルごとにマニフェストを分ける
+        input_id = content_hash(str(Path(input_path).resolve()))[:16]
+        self.manifest_path = self.cache_dir / "manifests" / f"{input_id}.json"
+        self.previous = self._load_manifest()
+        self.report = {phase: {"hit": 0, "miss": 0} for phase in PHASES}
+
+    def _load_manifest(self) -> dict:
+        """前回のマニフェストを読む（なければ空）"""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_manifest(self, manifest: dict):
+        """今回のマニフェストを保存（一時ファイル経由で置き換え）"""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def record(self, phase: str, hit: bool, count: int = 1):
+        """フェーズごとのヒット/ミスを記録"""
+        self.report[phase]["hit" if hit else "miss"] += count
+
+    def restore_asset(self, key: str, dest: Path) -> bool:
+        """キャッシュにある素材を dest にコピー（なければFalse）"""
+        return self.assets.get(key, dest)
+
+    def store_asset(self, key: str, source: Path):
+        """生成した素材をキャッシュに入れる"""
+        self.assets.put(key, source)
+
+    def format_report(self) -> list:
+        """フェーズごとのヒット数を表示用の行にする"""
+        lines = []
+        for phase in PHASES:
+            hit = self.report[phase]["hit"]
+            total = hit + self.report[phase]["miss"]
+            lines.append(f"{phase:<7} {hit}/{total} ヒット")
+        return lines
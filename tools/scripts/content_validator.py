@@ -3,14 +3,30 @@
 コンテンツ検証スクリプト
 
 スライドの情報密度をチェックし、薄いページを特定する。
+スライドごとの分析結果は内容のハッシュでキャッシュし、
+複数の presentation.json をまとめて並列プロセスで検証できる。
 """
 
+import os
+import glob
 import json
+import time
 import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from dataclasses import dataclass
 from typing import Dict, List, Any, Optional
 
+from build_cache import CACHE_DIR_NAME, content_hash, slide_hash
+from keyword_matcher import KeywordMatcher
+
+
+CACHE_VERSION = 1
+
+# 1スライドの分析は数十マイクロ秒なので、バッチ検証ではプロセスの起動に見合う量
+# （presentation.json 約8MB）ごとに1プロセスにする
+BATCH_BYTES_PER_JOB = 8 * 1024 * 1024
+
 
 @dataclass
 class SlideMetrics:
@@ -28,6 +44,63 @@ class SlideMetrics:
     warnings: List[str]
 
 
+class ValidationCache:
+    """スライドのハッシュ → 分析結果（スライド番号を除く）のキャッシュ"""
+
+    def __init__(self, path: Path, config_key: str):
+        self.path = Path(path)
+        self.config_key = config_key
+        self.entries = self._load()
+        self.added = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self) -> Dict[str, Any]:
+        """保存済みのキャッシュを読む（設定が変わっていれば空）"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != CACHE_VERSION or data.get("config") != self.config_key:
+            return {}
+        return data.get("slides", {})
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """キャッシュにある分析結果（なければNone）"""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]):
+        """分析結果を追加"""
+        self.entries[key] = entry
+        self.added[key] = entry
+
+    def merge(self, entries: Dict[str, Any]):
+        """別プロセスで追加された分析結果を取り込む"""
+        self.entries.update(entries)
+        self.added.update(entries)
+
+    def save(self):
+        """追加があれば保存（一時ファイル経由で置き換え）"""
+        if not self.added:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "version": CACHE_VERSION,
+                "config": self.config_key,
+                "slides": self.entries
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.added = {}
+
+
 class ContentValidator:
     """コンテンツ検証クラス"""
 
@@ -55,9 +128,23 @@ class ContentValidator:
         '導入', '第1章', '第2章', '第3章', '第4章', '第5章', '第6章', '第7章', '第8章',
         'vs', 'VS'
     ]
+    TITLE_MATCHER = KeywordMatcher(TITLE_PATTERNS)
+
+    # 図表（Mermaid・生成図）を示すキーワード（キー名・値のどちらに出現してもよい）
+    DIAGRAM_MATCHER = KeywordMatcher(['mermaid', 'diagram_'])
 
-    def __init__(self, project_root: Path):
+    def __init__(self, project_root: Path, cache_path: Path = None):
         self.project_root = project_root
+        self.cache = ValidationCache(cache_path, self.config_key()) if cache_path else None
+
+    @classmethod
+    def config_key(cls) -> str:
+        """分析結果に影響する設定のハッシュ（変わったらキャッシュを使わない）"""
+        return content_hash({
+            "weights": cls.WEIGHTS,
+            "thresholds": cls.THRESHOLDS,
+            "title_patterns": cls.TITLE_PATTERNS,
+        })
 
     def load_presentation_json(self, json_path: Path) -> Optional[Dict[str, Any]]:
         """presentation.jsonを読み込む"""
@@ -78,8 +165,10 @@ class ContentValidator:
                 if elem.get('type') == 'title':
                     title = elem.get('content', '')
                     break
+        return self._is_title(slide, title)
 
-        title = title.lower()
+    def _is_title(self, slide: Dict[str, Any], title: str) -> bool:
+        """抽出済みのタイトルでタイトルスライドかどうかを判定"""
         slide_type = slide.get('type', '').lower()
         layout = slide.get('layout', '').lower()
 
@@ -90,11 +179,7 @@ class ContentValidator:
         if slide_type == 'title':
             return True
 
-        for pattern in self.TITLE_PATTERNS:
-            if pattern.lower() in title:
-                return True
-
-        return False
+        return self.TITLE_MATCHER.search(title)
 
     def count_bullets(self, content_list: List[Any]) -> tuple:
         """箇条書きの数をカウント"""
@@ -124,71 +209,86 @@ class ContentValidator:
         count_recursive(content_list)
         return bullet_count, sub_bullet_count
 
-    def calculate_text_length(self, slide: Dict[str, Any]) -> int:
-        """テキストの総文字数を計算"""
-        total = 0
+    def scan_values(self, slide: Dict[str, Any], check_diagram: bool = True) -> tuple:
+        """
+        スライドの値を1回だけたどり、(テキストの総文字数, 図表キーワードの有無) を返す
 
-        def extract_text(obj):
-            nonlocal total
+        図表キーワード（mermaid, diagram_）はキー名・文字列の値のどちらにあってもよい。
+        check_diagram=False ならキーワードは探さない（Falseを返す）
+        """
+        total = 0
+        # キー名と文字列を集めて、最後に1回だけキーワードを探す
+        # （区切りの \0 はキーワードに含まれないので、文字列をまたいでマッチしない）
+        texts = []
+        stack = [slide]
+        while stack:
+            obj = stack.pop()
             if isinstance(obj, str):
                 total += len(obj)
+                texts.append(obj)
             elif isinstance(obj, dict):
-                for value in obj.values():
-                    extract_text(value)
+                texts.extend(obj)
+                stack.extend(obj.values())
             elif isinstance(obj, list):
-                for item in obj:
-                    extract_text(item)
+                stack.extend(obj)
+        if not check_diagram:
+            return total, False
+        return total, self.DIAGRAM_MATCHER.search('\0'.join(map(str, texts)))
 
-        extract_text(slide)
-        return total
+    def calculate_text_length(self, slide: Dict[str, Any]) -> int:
+        """テキストの総文字数を計算"""
+        return self.scan_values(slide, check_diagram=False)[0]
 
     def analyze_slide(self, slide: Dict[str, Any], slide_number: int) -> SlideMetrics:
-        """単一スライドを分析"""
-        # タイトルの抽出（複数のフォーマットに対応）
+        """単一スライドを分析（同じ内容のスライドはキャッシュの結果を使う）"""
+        if self.cache is None:
+            entry = self._analyze(slide)
+        else:
+            key = slide_hash(slide)
+            entry = self.cache.get(key)
+            if entry is None:
+                entry = self._analyze(slide)
+                self.cache.put(key, entry)
+
+        # キャッシュの警告リストを呼び出し側で変更されないようコピーする
+        metrics = SlideMetrics(slide_number=slide_number, **dict(entry, warnings=list(entry['warnings'])))
+        if not metrics.title:
+            metrics.title = f'スライド {slide_number}'
+        return metrics
+
+    def _analyze(self, slide: Dict[str, Any]) -> Dict[str, Any]:
+        """スライド番号に依存しない分析結果（SlideMetrics の slide_number 以外）"""
+        # タイトルの抽出・elementsの種類の確認を1回のループで行う
         title = slide.get('title', '')
-        if not title:
-            # elementsからタイトルを探す
-            for elem in slide.get('elements', []):
-                if elem.get('type') == 'title':
-                    title = elem.get('content', '')
-                    break
-        if not title:
-            title = f'スライド {slide_number}'
-
-        # コンテンツの抽出
         content = slide.get('content', [])
-        if not content and 'elements' in slide:
-            # elementsフォーマットからbullet_listを抽出
-            for elem in slide.get('elements', []):
-                if elem.get('type') == 'bullet_list':
-                    content = elem.get('content', [])
-                    break
-
-        # 箇条書きカウント
-        bullet_count, sub_bullet_count = self.count_bullets(content)
-
-        # 図表・表・コードの有無
         has_diagram = slide.get('diagram') is not None or slide.get('image') is not None
         has_table = slide.get('table') is not None
         has_code = slide.get('code') is not None
+        title_found = bool(title)
+        content_found = bool(content) or 'elements' not in slide
 
-        # elementsから図表等をチェック
         for elem in slide.get('elements', []):
             elem_type = elem.get('type', '')
-            if elem_type in ['image', 'diagram', 'mermaid']:
+            if elem_type == 'title' and not title_found:
+                title = elem.get('content', '')
+                title_found = True
+            elif elem_type == 'bullet_list' and not content_found:
+                # elementsフォーマットからbullet_listを抽出
+                content = elem.get('content', [])
+                content_found = True
+            elif elem_type in ['image', 'diagram', 'mermaid']:
                 has_diagram = True
             elif elem_type == 'table':
                 has_table = True
             elif elem_type == 'code':
                 has_code = True
 
-        # Mermaid図もチェック
-        content_str = json.dumps(slide, ensure_ascii=False)
-        if 'mermaid' in content_str.lower() or 'diagram_' in content_str.lower():
-            has_diagram = True
+        # 箇条書きカウント
+        bullet_count, sub_bullet_count = self.count_bullets(content)
 
-        # テキスト長
-        text_length = self.calculate_text_length(slide)
+        # テキスト長とMermaid図のチェック（値を1回だけたどる。図表が見つかっていればキーワードは探さない）
+        text_length, mentions_diagram = self.scan_values(slide, check_diagram=not has_diagram)
+        has_diagram = has_diagram or mentions_diagram
 
         # スコア計算
         score = (
@@ -202,7 +302,7 @@ class ContentValidator:
 
         # 状態判定
         warnings = []
-        is_title = self.is_title_slide(slide)
+        is_title = self._is_title(slide, title)
         threshold = self.THRESHOLDS['title_slide'] if is_title else self.THRESHOLDS['minimum_score']
 
         if score < threshold:
@@ -220,19 +320,18 @@ class ContentValidator:
         if not has_diagram and not has_table and not is_title:
             warnings.append("図表または表の追加を検討")
 
-        return SlideMetrics(
-            slide_number=slide_number,
-            title=title,
-            bullet_count=bullet_count,
-            sub_bullet_count=sub_bullet_count,
-            has_diagram=has_diagram,
-            has_table=has_table,
-            has_code=has_code,
-            text_length=text_length,
-            density_score=score,
-            status=status,
-            warnings=warnings
-        )
+        return {
+            'title': title,
+            'bullet_count': bullet_count,
+            'sub_bullet_count': sub_bullet_count,
+            'has_diagram': has_diagram,
+            'has_table': has_table,
+            'has_code': has_code,
+            'text_length': text_length,
+            'density_score': score,
+            'status': status,
+            'warnings': warnings
+        }
 
     def validate_presentation(self, json_path: Path) -> List[SlideMetrics]:
         """プレゼンテーション全体を検証"""
@@ -319,37 +418,171 @@ class ContentValidator:
         report = self.generate_report(results)
         return results, report
 
+    def validate_batch(self, patterns: List[str], jobs: int = None) -> Dict[str, Any]:
+        """globに一致する複数のpresentation.jsonを並列プロセスで検証"""
+        inputs = []
+        for pattern in patterns:
+            for path in sorted(glob.glob(pattern, recursive=True)):
+                if Path(path).is_file() and path not in inputs:
+                    inputs.append(path)
+
+        if jobs is None:
+            total_bytes = sum(os.path.getsize(path) for path in inputs)
+            jobs = min(os.cpu_count() or 1, total_bytes // BATCH_BYTES_PER_JOB + 1)
+        jobs = max(1, min(jobs, len(inputs) or 1))
+        start = time.perf_counter()
+        if jobs == 1:
+            # 1プロセスならプロセスを起動せずにそのまま検証する
+            decks = [self._validate_file(path) for path in inputs]
+        else:
+            cache_path = str(self.cache.path) if self.cache else None
+            results = {}
+            with ProcessPoolExecutor(
+                max_workers=jobs,
+                initializer=_init_batch_worker,
+                initargs=(str(self.project_root), cache_path)
+            ) as pool:
+                futures = [pool.submit(_validate_file, path) for path in inputs]
+                for future in as_completed(futures):
+                    deck = future.result()
+                    results[deck["input"]] = deck
+                    if self.cache is not None:
+                        self.cache.merge(deck.pop("added"))
+                        self.cache.hits += deck["cache_hits"]
+                        self.cache.misses += deck["cache_misses"]
+            decks = [results[path] for path in inputs]
+
+        return {
+            "jobs": jobs,
+            "wall_seconds": time.perf_counter() - start,
+            "errors": sum(deck["counts"]["ERROR"] for deck in decks),
+            "failed": sum(1 for deck in decks if deck["error"]),
+            "decks": decks
+        }
+
+    def _validate_file(self, json_path: str) -> Dict[str, Any]:
+        """1ファイルを検証して結果の辞書にまとめる"""
+        start = time.perf_counter()
+        hits, misses = (self.cache.hits, self.cache.misses) if self.cache else (0, 0)
+        counts = {status: 0 for status in ("OK", "WARNING", "ERROR")}
+        error = None
+        try:
+            results, report = self.validate_and_report(Path(json_path))
+        except (OSError, ValueError) as e:
+            # 読めないファイルがあっても他のファイルの検証は続ける
+            results, report = [], ""
+            error = f"{type(e).__name__}: {e}"
+        for r in results:
+            counts[r.status] += 1
+        return {
+            "input": json_path,
+            "seconds": time.perf_counter() - start,
+            "error": error,
+            "counts": counts,
+            "results": results,
+            "report": report,
+            "cache_hits": self.cache.hits - hits if self.cache else 0,
+            "cache_misses": self.cache.misses - misses if self.cache else 0,
+        }
+
+
+# バッチ検証のワーカープロセスごとに1つ作る検証クラス
+_batch_validator = None
+
+
+def _init_batch_worker(project_root: str, cache_path: Optional[str]):
+    """ワーカープロセスの初期化（キャッシュはプロセスごとに1回だけ読む）"""
+    global _batch_validator
+    _batch_validator = ContentValidator(Path(project_root), Path(cache_path) if cache_path else None)
+
+
+def _validate_file(json_path: str) -> Dict[str, Any]:
+    """ワーカープロセスで1ファイルを検証（追加したキャッシュは親プロセスに返す）"""
+    deck = _batch_validator._validate_file(json_path)
+    cache = _batch_validator.cache
+    deck["added"] = cache.added if cache else {}
+    if cache:
+        cache.added = {}
+    return deck
+
+
+def print_batch_summary(summary: Dict[str, Any]):
+    """バッチ検証の結果を表にして表示"""
+    print("=" * 70)
+    print(f"バッチ検証: {len(summary['decks'])}ファイル")
+    print("=" * 70)
+    print(f"{'入力':<40} {'OK':>4} {'WARN':>4} {'ERR':>4} {'時間(s)':>8}")
+    for deck in summary["decks"]:
+        counts = deck["counts"]
+        print(f"{deck['input'][-40:]:<40} {counts['OK']:>4} {counts['WARNING']:>4} "
+              f"{counts['ERROR']:>4} {deck['seconds']:>8.2f}")
+    print(f"\nERROR合計: {summary['errors']} "
+          f"（{summary['wall_seconds']:.2f}s, {summary['jobs']}プロセス）")
+    for deck in summary["decks"]:
+        if deck["error"]:
+            print(f"  読み込み失敗: {deck['input']} - {deck['error']}")
+
 
 def main():
     parser = argparse.ArgumentParser(description='スライドコンテンツ検証スクリプト')
     parser.add_argument('--project', type=str, default='..',
                         help='プロジェクトルートディレクトリ')
-    parser.add_argument('--json', type=str, required=True,
+    parser.add_argument('--json', type=str, default=None,
                         help='presentation.jsonのパス')
+    parser.add_argument('--batch', '-b', type=str, nargs='+', metavar='GLOB',
+                        help='globに一致する複数のpresentation.jsonを並列に検証')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='--batch の並列プロセス数（省略時は入力の量とCPU数から決める）')
+    parser.add_argument('--cache', type=str, default=None,
+                        help='分析結果のキャッシュファイル'
+                             '（省略時は powerpoint-output/.build_cache/validation.json）')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='キャッシュを使わない')
     parser.add_argument('--output', type=str, default=None,
                         help='レポート出力ファイル（省略時は標準出力）')
 
     args = parser.parse_args()
+    if not args.json and not args.batch:
+        parser.error('--json または --batch を指定してください')
 
     project_root = Path(args.project).resolve()
-    json_path = Path(args.json)
-    if not json_path.is_absolute():
-        json_path = project_root / args.json
+    cache_path = None
+    if not args.no_cache:
+        cache_path = Path(args.cache) if args.cache else (
+            project_root / "powerpoint-output" / CACHE_DIR_NAME / "validation.json"
+        )
 
-    validator = ContentValidator(project_root)
-    results, report = validator.validate_and_report(json_path)
+    validator = ContentValidator(project_root, cache_path)
+
+    if args.batch:
+        summary = validator.validate_batch(args.batch, jobs=args.jobs)
+        results = [r for deck in summary["decks"] for r in deck["results"]]
+        report = "\n\n".join(f"# {deck['input']}\n{deck['report']}" for deck in summary["decks"])
+    else:
+        json_path = Path(args.json)
+        if not json_path.is_absolute():
+            json_path = project_root / args.json
+        results, report = validator.validate_and_report(json_path)
 
     if args.output:
         output_path = Path(args.output)
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write(report)
         print(f"レポートを保存しました: {output_path}")
-    else:
+    elif not args.batch:
         print(report)
 
+    if args.batch:
+        print_batch_summary(summary)
+
+    if validator.cache is not None:
+        validator.cache.save()
+        total = validator.cache.hits + validator.cache.misses
+        print(f"キャッシュ: {validator.cache.hits}/{total} スライドがヒット")
+
     # エラーがある場合は非ゼロで終了
     errors = sum(1 for r in results if r.status == "ERROR")
-    if errors > 0:
+    if errors > 0 or (args.batch and summary["failed"]):
         return 1
     return 0
 
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Deck Watcher
+Markdownの保存を監視してPowerPointを作り直す（orchestrator.py --watch）
+
+- 入力Markdownとテーマの更新日時・サイズをポーリングで確認する（外部サービス不要）
+- 解析結果とテーマはメモリに保持し、保存ごとに変更された行を含むスライドだけを再解析する
+- 素材は内容が変わったものだけを生成し、変更のないスライドは前回描画したXMLを複製する
+- 出力は1つのビルドディレクトリに上書きし、保存から書き出しまでの時間を watch_log.jsonl に記録する
+"""
+
+import copy
+import json
+import os
+import time
+from bisect import bisect_right
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from markdown_parser import MarkdownParser, MarkdownParseError
+from asset_generator import AssetGenerator
+from pptx_renderer import PowerPointRenderer
+from build_cache import CACHE_DIR_NAME, asset_store_dir, content_hash, asset_key, slide_keys
+
+
+ASSET_KINDS = ("diagrams", "images")
+
+
+class FileWatcher:
+    """ファイルの更新日時とサイズを見て変更を検出する"""
+
+    def __init__(self, paths: List[Path]):
+        self.paths = [Path(p) for p in paths]
+        self._signatures = self._snapshot()
+
+    def _snapshot(self) -> Dict[Path, Optional[tuple]]:
+        """各ファイルの (mtime_ns, サイズ)。ファイルがなければNone"""
+        signatures = {}
+        for path in self.paths:
+            try:
+                info = os.stat(path)
+                signatures[path] = (info.st_mtime_ns, info.st_size)
+            except OSError:
+                signatures[path] = None
+        return signatures
+
+    def poll(self) -> List[Path]:
+        """前回から変わったファイル（作成・削除を含む）"""
+        current = self._snapshot()
+        changed = [path for path in self.paths if current[path] != self._signatures[path]]
+        self._signatures = current
+        return changed
+
+    def newest_mtime(self, paths: List[Path]) -> float:
+        """paths のうち最も新しい更新日時（秒、time.time() と同じ基準）"""
+        mtimes = [sig[0] for path in paths if (sig := self._signatures.get(path)) is not None]
+        return max(mtimes) / 1e9 if mtimes else time.time()
+
+
+def _shift_source_lines(value, delta: int):
+    """source_lines を delta 行ずらしたコピー"""
+    if isinstance(value, dict):
+        return {
+            k: ([n + delta for n in v] if k == "source_lines" else _shift_source_lines(v, delta))
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [_shift_source_lines(v, delta) for v in value]
+    return value
+
+
+class LiveDeck:
+    """
+    メモリ上に保持する解析結果
+
+    update() は前回の本文との差分から、変更された行を含むスライドの範囲だけを再解析する。
+    範囲の外に影響しうる変更（最初のスライド・見出しより前・メタデータ・素材の数の増減）は
+    全体を解析し直す。processing_log は直近に解析した範囲の分だけになる。
+    """
+
+    def __init__(self, source_name: str):
+        self.source_name = source_name
+        self.lines = []
+        self.parsed = None
+
+    def load(self, text: str) -> dict:
+        """全体を解析"""
+        parsed = MarkdownParser().parse(text, self.source_name)
+        self.lines = text.split("\n")
+        self.parsed = parsed
+        return {"mode": "full", "slides": [1, len(parsed["slides"])]}
+
+    def update(self, text: str) -> Optional[dict]:
+        """本文を差し替え、再解析したスライドの範囲を返す（変更がなければNone）"""
+        new_lines = text.split("\n")
+        old_lines = self.lines
+        if self.parsed is None:
+            return self.load(text)
+        if new_lines == old_lines:
+            return None
+
+        # 前後の一致する行を除いた部分が変更範囲
+        limit = min(len(old_lines), len(new_lines))
+        prefix = 0
+        while prefix < limit and old_lines[prefix] == new_lines[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and old_lines[-1 - suffix] == new_lines[-1 - suffix]:
+            suffix += 1
+        old_end = len(old_lines) - suffix
+        delta = len(new_lines) - len(old_lines)
+
+        slides = self.parsed["slides"]
+        starts = [slide["source_lines"][0] for slide in slides]
+        # 変更の直前の行を含むスライドから、変更範囲より後ろで始まるスライドの手前まで
+        first = bisect_right(starts, prefix) - 1
+        last = bisect_right(starts, old_end)
+        if first < 1:
+            return self.load(text)
+
+        chunk_start = starts[first]
+        old_chunk_end = starts[last] - 1 if last < len(slides) else len(old_lines)
+        new_chunk_end = old_chunk_end + delta
+        old_chunk = old_lines[chunk_start - 1:old_chunk_end]
+        new_chunk = new_lines[chunk_start - 1:new_chunk_end]
+        if any(line.strip().startswith("<!-- metadata:") for line in old_chunk + new_chunk):
+            return self.load(text)
+
+        def before_chunk(asset):
+            return asset["source_lines"][0] < chunk_start
+
+        def after_chunk(asset):
+            return asset["source_lines"][0] > old_chunk_end
+
+        assets = self.parsed["assets"]
+        parser = MarkdownParser()
+        parser.metadata = dict(self.parsed["metadata"])
+        parser.slide_counter = first
+        parser.diagram_counter = sum(1 for a in assets["diagrams"] if before_chunk(a))
+        parser.image_counter = sum(1 for a in assets["images"] if before_chunk(a))
+        try:
+            chunk_slides = list(parser.iter_slides(new_chunk, self.source_name, chunk_start))
+        except MarkdownParseError:
+            # ブロックが範囲の外まで続く場合など。全体を解析すれば正しい位置で報告される
+            return self.load(text)
+
+        # 素材の数が変わると後ろの素材IDがずれるので、全体を解析し直す
+        for kind in ASSET_KINDS:
+            old_count = sum(1 for a in assets[kind] if not before_chunk(a) and not after_chunk(a))
+            if len(parser.assets[kind]) != old_count:
+                return self.load(text)
+
+        self.parsed = {
+            "metadata": parser.metadata,
+            "assets": {
+                kind: (
+                    [a for a in assets[kind] if before_chunk(a)] +
+                    parser.assets[kind] +
+                    [_shift_source_lines(a, delta) for a in assets[kind] if after_chunk(a)]
+                )
+                for kind in ASSET_KINDS
+            },
+            "slides": (
+                slides[:first] + chunk_slides +
+                [_shift_source_lines(slide, delta) for slide in slides[last:]]
+            ),
+            "processing_log": parser.processing_log
+        }
+        self.lines = new_lines
+        return {"mode": "partial", "slides": [first + 1, first + len(chunk_slides)]}
+
+
+class DeckWatcher:
+    """1つのMarkdownを監視し、保存されるたびに同じビルドディレクトリへ書き出す"""
+
+    def __init__(self, orchestrator, input_path: str, theme_path: str = None, interval: float = 0.3):
+        self.orchestrator = orchestrator
+        self.input_path = Path(input_path)
+        self.theme_path = Path(theme_path) if theme_path else orchestrator.config_dir / "theme.yaml"
+        self.theme_arg = theme_path
+        self.interval = interval
+
+        self.build_dir = None
+        self.output_path = None
+        self.deck = LiveDeck(str(input_path))
+        self.renderer = None
+        self.asset_generator = None
+        # 素材ID → 生成済みの (キャッシュキー, ステータス)
+        self.asset_state = {}
+        self.watcher = FileWatcher([self.input_path, self.theme_path])
+
+    def start(self):
+        """テーマを読み込み、ビルドディレクトリを作って最初のビルドを行う"""
+        self.orchestrator.load_theme(self.theme_arg)
+        self.build_dir = self.orchestrator.create_build_directory(f"watch_{self.input_path.stem}")
+        output_config = self.orchestrator.theme.get("output", {})
+        self.output_path = self.build_dir / (
+            f"{output_config.get('filename_prefix', 'presentation')}"
+            f"{output_config.get('filename_suffix', '')}.pptx"
+        )
+        self._setup_theme()
+        return self.rebuild([self.input_path], initial=True)
+
+    def _setup_theme(self):
+        """テーマに依存するオブジェクトを作り直す（描画済みスライドも破棄される）"""
+        theme = self.orchestrator.theme
+        self.renderer = PowerPointRenderer(theme, str(self.build_dir))
+        self.asset_generator = AssetGenerator(
+            str(self.build_dir),
+            theme,
+            cache_dir=str(asset_store_dir(self.orchestrator.output_dir / CACHE_DIR_NAME)),
+            max_workers=self.orchestrator.asset_workers,
+            mermaid_renderer=self.orchestrator.mermaid_renderer
+        )
+        self.theme_key = content_hash(theme or {})
+
+    def rebuild(self, changed: List[Path], initial: bool = False) -> Optional[dict]:
+        """
+        変更されたファイルに応じて作り直し、計測結果を返す（入力に変更がなければNone）
+
+        initial=True（最初のビルド）では保存からの時間を記録しない
+        """
+        saved_at = self.watcher.newest_mtime(changed)
+        start = time.perf_counter()
+
+        theme_changed = self.theme_path in changed and self.deck.parsed is not None
+        if theme_changed:
+            self.orchestrator.load_theme(self.theme_arg)
+            self._setup_theme()
+
+        # 解析（変更されたスライドの範囲だけ）
+        text = self.input_path.read_text(encoding="utf-8")
+        parse_info = self.deck.update(text)
+        if parse_info is None:
+            if not theme_changed:
+                return None
+            parse_info = {"mode": "none", "slides": None}
+        parsed = self.deck.parsed
+        parse_ms = (time.perf_counter() - start) * 1000
+
+        # 素材（前回から内容が変わったものだけ生成）
+        phase_start = time.perf_counter()
+        assets = copy.deepcopy(parsed["assets"])
+        keys = {
+            asset["id"]: asset_key(
+                asset, self.orchestrator.theme or {}, self.build_dir, self.orchestrator.mermaid_renderer
+            )
+            for kind in ASSET_KINDS for asset in assets[kind]
+        }
+        pending = {kind: [] for kind in ASSET_KINDS}
+        for kind in ASSET_KINDS:
+            for asset in assets[kind]:
+                state = self.asset_state.get(asset["id"])
+                if state and state[0] == keys[asset["id"]] and (self.build_dir / asset["output_path"]).exists():
+                    asset["status"] = state[1]
+                else:
+                    pending[kind].append(asset)
+        generated = sum(len(items) for items in pending.values())
+        asset_log = []
+        if generated:
+            result = self.asset_generator.generate_all(pending)
+            asset_log = result["processing_log"]
+            for kind in ASSET_KINDS:
+                for asset in pending[kind]:
+                    self.asset_state[asset["id"]] = (keys[asset["id"]], asset.get("status"))
+        asset_ms = (time.perf_counter() - phase_start) * 1000
+
+        # 中間JSONとPowerPoint（変更のないスライドは描画済みのXMLを使う）
+        phase_start = time.perf_counter()
+        presentation = {
+            "metadata": {**parsed["metadata"], "generated_at": datetime.now().isoformat()},
+            "theme": self.orchestrator.theme,
+            "assets": assets,
+            "slides": parsed["slides"],
+            "processing_log": parsed["processing_log"] + asset_log
+        }
+        json_path = self.build_dir / "intermediate" / "presentation.json"
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"presentation": presentation}, f, ensure_ascii=False, indent=2)
+
+        # 表示中のビューアが書きかけのファイルを読まないよう、一時ファイルから置き換える
+        tmp_path = self.output_path.with_name(f".{self.output_path.name}.tmp")
+        render_result = self.renderer.render(
+            presentation, str(tmp_path),
+            slide_keys(parsed["slides"], keys, self.theme_key)
+        )
+        os.replace(tmp_path, self.output_path)
+        render_ms = (time.perf_counter() - phase_start) * 1000
+
+        entry = {
+            "time": datetime.now().isoformat(),
+            "files": [str(path) for path in changed],
+            "parse": parse_info,
+            "assets_generated": generated,
+            "slide_count": render_result["slide_count"],
+            "slides_reused": render_result["reused_slides"],
+            "parse_ms": round(parse_ms, 1),
+            "asset_ms": round(asset_ms, 1),
+            "render_ms": round(render_ms, 1),
+            "total_ms": round((time.perf_counter() - start) * 1000, 1),
+            "latency_ms": None if initial else round(max(0.0, time.time() - saved_at) * 1000, 1)
+        }
+        with open(self.build_dir / "watch_log.jsonl", "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return entry
+
+    def describe(self, entry: dict) -> str:
+        """再ビルド結果の1行表示"""
+        parse = entry["parse"]
+        if parse["mode"] == "partial":
+            first, last = parse["slides"]
+            parsed = f"p.{first}-{last} を再解析"
+        elif parse["mode"] == "full":
+            parsed = "全体を解析"
+        else:
+            parsed = "テーマを再読み込み"
+        latency = f"、保存から {entry['latency_ms'] / 1000:.2f} s" if entry["latency_ms"] is not None else ""
+        return (
+            f"[{entry['time'][11:19]}] {parsed}, 素材 {entry['assets_generated']}件生成, "
+            f"スライド {entry['slides_reused']}/{entry['slide_count']} 再利用: "
+            f"{entry['total_ms']:.0f} ms（解析 {entry['parse_ms']:.0f} / 素材 {entry['asset_ms']:.0f} / "
+            f"描画 {entry['render_ms']:.0f}{latency}）"
+        )
+
+    def run(self):
+        """Ctrl+C まで監視を続ける"""
+        from contextlib import redirect_stdout
+        from io import StringIO
+
+        print("=" * 60)
+        print(f"監視モード: {self.input_path}")
+        print("=" * 60)
+        with redirect_stdout(StringIO()):
+            entry = self.start()
+        print(f"出力: {self.output_path}")
+        print(self.describe(entry))
+        print("保存すると再ビルドします（Ctrl+C で終了）")
+
+        try:
+            while True:
+                time.sleep(self.interval)
+                changed = self.watcher.poll()
+                if not changed:
+                    continue
+                # 保存の途中（複数回の書き込み）を拾わないよう、変化が止まるのを待つ
+                while True:
+                    time.sleep(min(self.interval, 0.05))
+                    more = self.watcher.poll()
+                    if not more:
+                        break
+                    changed = list(dict.fromkeys(changed + more))
+                try:
+                    with redirect_stdout(StringIO()):
+                        entry = self.rebuild(changed)
+                except MarkdownParseError as e:
+                    print(f"Markdown解析エラー: {e}（前回の出力のまま）")
+                    continue
+                except (OSError, ValueError) as e:
+                    print(f"再ビルド失敗: {type(e).__name__}: {e}（前回の出力のまま）")
+                    continue
+                if entry:
+                    print(self.describe(entry))
+        except KeyboardInterrupt:
+            print("\n監視を終了しました")
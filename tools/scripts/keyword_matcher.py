@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Keyword Matcher
+複数キーワードの一括マッチ（Aho-Corasick法）
+
+キーワードをまとめて1つのオートマトンにしておき、文書を1回走査するだけで
+全キーワードの出現位置を見つける（どのキーワードの途中でもない区間は、
+次にキーワードが始まる位置まで正規表現で読み飛ばす）。
+比較はNFKC正規化＋casefoldした文字列で行うので、全角英数（ＭＥＲＭＡＩＤ）や
+半角カナ（ﾃﾞｨｰﾌﾟ）も同じキーワードとして扱う。マッチ位置は元の文字列の位置で返す。
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+# 直前の文字と合わせて正規化する文字（結合文字以外の濁点・半濁点）
+_JOINING_MARKS = {'゙', '゚', 'ﾞ', 'ﾟ'}
+
+
+def fold(text: str) -> str:
+    """比較用に正規化した文字列（NFKC＋casefold）"""
+    # ほとんどの文字列は正規化済みなので、先に高速な判定だけを行う
+    if not unicodedata.is_normalized('NFKC', text):
+        text = unicodedata.normalize('NFKC', text)
+    return text.casefold()
+
+
+def fold_with_offsets(text: str) -> Tuple[str, List[int]]:
+    """
+    正規化した文字列と、その各文字の元の文字列での位置
+
+    位置のリストは正規化後の長さ+1で、最後の要素は len(text)。
+    正規化で1文字が複数文字になる（ﬁ → fi）、複数文字が1文字になる（ｶﾞ → ガ）
+    場合は、元の文字のまとまりの先頭位置に対応させる。
+    """
+    if unicodedata.is_normalized('NFKC', text):
+        folded = text.casefold()
+        if len(folded) == len(text):
+            return folded, list(range(len(text) + 1))
+
+    folded = []
+    offsets = []
+    start = 0
+    length = len(text)
+    while start < length:
+        end = start + 1
+        while end < length and (unicodedata.combining(text[end]) or text[end] in _JOINING_MARKS):
+            end += 1
+        piece = fold(text[start:end])
+        folded.append(piece)
+        offsets.extend([start] * len(piece))
+        start = end
+    offsets.append(length)
+    return ''.join(folded), offsets
+
+
+@dataclass(frozen=True)
+class KeywordMatch:
+    """1つのマッチ（start, end は元の文字列の位置）"""
+    keyword: str
+    index: int
+    start: int
+    end: int
+
+
+class KeywordMatcher:
+    """複数キーワードを1回の走査で探すマッチャー"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = list(keywords)
+        # ノードごとの遷移・失敗リンク・出力（キーワードの番号と正規化後の長さ）
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, int]]] = [[]]
+        patterns = set()
+
+        for index, keyword in enumerate(self.keywords):
+            pattern = fold(keyword)
+            if not pattern:
+                continue
+            patterns.add(pattern)
+            node = 0
+            for ch in pattern:
+                next_node = self._goto[node].get(ch)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][ch] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = next_node
+            self._output[node].append((index, len(pattern)))
+
+        self._build_failure_links()
+        # キーワードに使われている文字と、NFKCで変わってもマッチに影響しないとわかった文字
+        self._alphabet = set(''.join(patterns))
+        self._plain_chars = set()
+        # _plain_chars 以外の文字を探す正規表現（_plain_chars がある程度増えたら作り直す）
+        self._plain_compiled = 0
+        self._unknown_char = None
+        # 根にいる間は、いずれかのキーワードが始まる位置まで読み飛ばす
+        self._skip = re.compile('|'.join(
+            re.escape(pattern) for pattern in sorted(patterns, key=len, reverse=True)
+        )) if patterns else None
+
+    def _build_failure_links(self):
+        """幅優先で失敗リンクを張り、出力を失敗先から引き継ぐ"""
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for ch, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+                queue.append(child)
+
+        # 失敗リンクをたどった先の遷移も展開しておき、走査中は1回の辞書引きで遷移する
+        self._delta: List[Dict[str, int]] = [dict(self._goto[0])] + [{} for _ in self._goto[1:]]
+        for node in queue:
+            self._delta[node] = {**self._delta[self._fail[node]], **self._goto[node]}
+
+    def _scan(self, folded: str) -> Iterator[Tuple[int, int, int]]:
+        """正規化済みの文字列を走査して (キーワード番号, 開始, 終了) を返す"""
+        if self._skip is None:
+            return
+        delta = self._delta
+        output = self._output
+        node = 0
+        position = 0
+        length = len(folded)
+        while position < length:
+            if not node:
+                found = self._skip.search(folded, position)
+                if found is None:
+                    return
+                position = found.start()
+            node = delta[node].get(folded[position], 0)
+            position += 1
+            for index, size in output[node]:
+                yield index, position - size, position
+
+    def _affects_match(self, ch: str) -> bool:
+        """casefold済みの文字 ch がNFKC正規化でキーワードのマッチに影響しうるか"""
+        if unicodedata.combining(ch) or ch in _JOINING_MARKS or '\u1100' <= ch <= '\u11ff':
+            # 前の文字と合成される文字（結合文字・濁点・ハングル字母）
+            return True
+        return not unicodedata.is_normalized('NFKC', ch) and not self._alphabet.isdisjoint(fold(ch))
+
+    def _fold_for_search(self, text: str) -> str:
+        """
+        出現の有無を調べるための正規化
+
+        NFKCはC実装でも遅いので、キーワードの文字に変わりうる文字（全角英数など）や
+        合成される文字がなければ casefold だけで済ませる（マッチの結果は同じ）。
+        """
+        lowered = text.casefold()
+        if lowered.isascii() or (self._unknown_char and not self._unknown_char.search(lowered)):
+            return lowered
+        for ch in set(lowered).difference(self._plain_chars):
+            if self._affects_match(ch):
+                return fold(text)
+            self._plain_chars.add(ch)
+        if len(self._plain_chars) > self._plain_compiled * 1.25 + 16:
+            self._plain_compiled = len(self._plain_chars)
+            self._unknown_char = re.compile(
+                '[^' + ''.join(re.escape(ch) for ch in sorted(self._plain_chars)) + ']'
+            )
+        return lowered
+
+    def finditer(self, text: str) -> Iterator[KeywordMatch]:
+        """全キーワードの出現（重なりを含む、終了位置の順）"""
+        folded, offsets = fold_with_offsets(text)
+        for index, start, end in self._scan(folded):
+            yield KeywordMatch(self.keywords[index], index, offsets[start], offsets[end])
+
+    def matched_indices(self, text: str, folded: bool = False) -> Set[int]:
+        """出現したキーワードの番号（folded=True なら text は正規化済み）"""
+        if not folded:
+            text = self._fold_for_search(text)
+        return {index for index, _, _ in self._scan(text)}
+
+    def first_keyword(self, text: str, folded: bool = False) -> Optional[str]:
+        """出現したキーワードのうち、リストで最初のもの（なければNone）"""
+        indices = self.matched_indices(text, folded)
+        return self.keywords[min(indices)] if indices else None
+
+    def search(self, text: str, folded: bool = False) -> bool:
+        """いずれかのキーワードが出現するか"""
+        if not folded:
+            text = self._fold_for_search(text)
+        for _ in self._scan(text):
+            return True
+        return False
+
+
+@lru_cache(maxsize=256)
+def compile_keywords(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    """同じキーワードの組み合わせのマッチャーを使い回す"""
+    return KeywordMatcher(keywords)
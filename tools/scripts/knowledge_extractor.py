@@ -6,12 +6,13 @@
 中間レポートを生成する。
 """
 
-import re
 import argparse
 from pathlib import Path
 from typing import Dict, List, Any
 from dataclasses import dataclass, field
 
+from knowledge_index import KnowledgeIndex, IndexedDocument
+
 
 @dataclass
 class ChapterConfig:
@@ -198,49 +199,38 @@ class KnowledgeExtractor:
         self.project_root = project_root
         self.knowledge_dir = project_root
         self.output_dir = project_root / "intermediate-reports"
+        # 転置インデックス（ファイルの更新日時・サイズが変わったら作り直す）
+        self.index = KnowledgeIndex(self.knowledge_dir, self.output_dir / ".knowledge_index.json")
 
     def load_knowledge_file(self, filename: str) -> str:
         """ナレッジファイルを読み込む"""
-        filepath = self.knowledge_dir / filename
-        if not filepath.exists():
+        document = self.load_document(filename)
+        return document.content if document else ""
+
+    def load_document(self, filename: str) -> IndexedDocument:
+        """インデックス付きでナレッジファイルを読み込む"""
+        document = self.index.document(filename)
+        if document is None:
             print(f"  警告: {filename} が見つかりません")
-            return ""
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return f.read()
+        return document
 
-    def extract_by_keywords(self, content: str, keywords: List[str], context_lines: int = 5) -> List[Dict[str, Any]]:
-        """キーワードを含む段落を抽出"""
-        results = []
-        lines = content.split('\n')
-
-        for i, line in enumerate(lines):
-            for keyword in keywords:
-                if keyword.lower() in line.lower():
-                    # 前後のコンテキストを取得
-                    start = max(0, i - context_lines)
-                    end = min(len(lines), i + context_lines + 1)
-                    context = '\n'.join(lines[start:end])
-
-                    results.append({
-                        'keyword': keyword,
-                        'line_number': i + 1,
-                        'match_line': line,
-                        'context': context
-                    })
-                    break  # 同じ行で複数マッチを避ける
+    def _as_document(self, content) -> IndexedDocument:
+        """文字列ならその場でインデックスを作る"""
+        if isinstance(content, IndexedDocument):
+            return content
+        return IndexedDocument(content)
 
-        return results
+    def extract_by_keywords(self, content, keywords: List[str], context_lines: int = 5) -> List[Dict[str, Any]]:
+        """キーワードを含む段落を抽出（1行につき最初にマッチしたキーワード1つ）"""
+        return self._as_document(content).keyword_matches(keywords, context_lines)
 
-    def extract_sections(self, content: str, patterns: List[str]) -> List[Dict[str, Any]]:
+    def extract_sections(self, content, patterns: List[str]) -> List[Dict[str, Any]]:
         """指定パターンにマッチするセクションを抽出"""
+        document = self._as_document(content)
         results = []
 
         for pattern in patterns:
-            # セクションヘッダーを探す
-            section_regex = rf'(#{1,4}\s*.*{pattern}.*?)(?=\n#{1,4}\s|\Z)'
-            matches = re.findall(section_regex, content, re.DOTALL | re.IGNORECASE)
-
-            for match in matches:
+            for match in document.sections(pattern):
                 # セクションの最初の200文字程度を抽出
                 preview = match[:500] + "..." if len(match) > 500 else match
                 results.append({
@@ -251,37 +241,9 @@ class KnowledgeExtractor:
 
         return results
 
-    def extract_bullet_lists(self, content: str, keywords: List[str]) -> List[str]:
+    def extract_bullet_lists(self, content, keywords: List[str]) -> List[str]:
         """キーワードを含む箇条書きを抽出"""
-        results = []
-
-        # 箇条書きパターン
-        bullet_pattern = r'^[\s]*[-*•]\s+.+$'
-        lines = content.split('\n')
-
-        in_relevant_section = False
-        current_list = []
-
-        for line in lines:
-            # キーワードがあるセクションをマーク
-            if any(kw.lower() in line.lower() for kw in keywords):
-                in_relevant_section = True
-
-            # 見出しで切り替え
-            if line.startswith('#'):
-                if current_list:
-                    results.extend(current_list)
-                    current_list = []
-                in_relevant_section = any(kw.lower() in line.lower() for kw in keywords)
-
-            # 箇条書きを収集
-            if in_relevant_section and re.match(bullet_pattern, line):
-                current_list.append(line.strip())
-
-        if current_list:
-            results.extend(current_list)
-
-        return results
+        return self._as_document(content).bullet_points(keywords)
 
     def extract_for_chapter(self, chapter_id: str) -> Dict[str, Any]:
         """特定の章のナレッジを抽出"""
@@ -308,8 +270,8 @@ class KnowledgeExtractor:
         # 各ソースファイルから抽出
         for source in config.sources:
             print(f"\n  処理中: {source}")
-            content = self.load_knowledge_file(source)
-            if not content:
+            content = self.load_document(source)
+            if content is None or not content.content:
                 continue
 
             # セクション抽出
@@ -396,6 +358,7 @@ class KnowledgeExtractor:
     def save_extraction(self, chapter_id: str, extraction: Dict[str, Any]):
         """抽出結果を保存"""
         output_path = self.output_dir / chapter_id / "knowledge_extraction.md"
+        output_path.parent.mkdir(parents=True, exist_ok=True)
         markdown = self.generate_knowledge_markdown(extraction)
 
         with open(output_path, 'w', encoding='utf-8') as f:
@@ -411,12 +374,14 @@ class KnowledgeExtractor:
             extraction = self.extract_for_chapter(chapter_id)
             self.save_extraction(chapter_id, extraction)
             results[chapter_id] = extraction
+        self.index.save()
         return results
 
     def run_single(self, chapter_id: str):
         """単一章のナレッジを抽出"""
         extraction = self.extract_for_chapter(chapter_id)
         self.save_extraction(chapter_id, extraction)
+        self.index.save()
         return extraction
 
 
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Knowledge Index
+ナレッジファイルの転置インデックス
+
+正規化（NFKC＋casefold）した各行の文字bigram → 行番号 の転置インデックスを1回だけ作り、
+候補の行だけを KeywordMatcher で1回走査して全キーワードを一度に探す。
+インデックスはJSONで保存し、ファイルの更新日時とサイズが変わったら作り直す。
+"""
+
+import re
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+from keyword_matcher import compile_keywords, fold
+
+
+INDEX_VERSION = 2
+
+# 箇条書きパターン
+BULLET_PATTERN = re.compile(r'^[\s]*[-*•]\s+.+$')
+
+# extract_sections の正規表現が必ず含む固定文字列（section_regex を参照）
+SECTION_LITERAL = "#1, 4"
+
+
+def section_regex(pattern: str) -> str:
+    """
+    KnowledgeExtractor.extract_sections がこれまで使ってきた正規表現
+
+    元のコード rf'(#{1,4}\s*.*{pattern}.*?)(?=\n#{1,4}\s|\Z)' では、
+    f文字列の {1,4} がタプル (1, 4) に置き換わるため、実際の正規表現は
+    "#(1, 4)" を含む。出力を変えないよう、同じ正規表現をそのまま使う。
+    """
+    return r'(#(1, 4)\s*.*' + pattern + r'.*?)(?=\n#(1, 4)\s|\Z)'
+
+
+class IndexedDocument:
+    """1ファイル分の本文とインデックス"""
+
+    def __init__(self, content: str, entry: Dict[str, Any] = None):
+        self.content = content
+        self.lines = content.split('\n')
+        # 正規化で改行は増減しないので、本文全体を1回で正規化して行に分ける
+        self.folded_lines = fold(content).split('\n')
+
+        if entry is None:
+            entry = self.build_entry()
+        self.entry = entry
+        self.postings = entry["postings"]
+        self.heading_lines = entry["headings"]
+        self.bullet_lines = entry["bullets"]
+        self._candidate_cache = {}
+        self._match_cache = {}
+
+    def build_entry(self) -> Dict[str, Any]:
+        """本文からインデックスを作る"""
+        postings = {}
+        for i, line in enumerate(self.folded_lines):
+            for gram in {line[j:j + 2] for j in range(len(line) - 1)}:
+                postings.setdefault(gram, []).append(i)
+        return {
+            "postings": postings,
+            "headings": [i for i, line in enumerate(self.lines) if line.startswith('#')],
+            "bullets": [i for i, line in enumerate(self.lines) if BULLET_PATTERN.match(line)],
+        }
+
+    def candidate_lines(self, pattern: str) -> List[int]:
+        """正規化済みの pattern を含みうる行番号（bigramがすべて出現する行）"""
+        cached = self._candidate_cache.get(pattern)
+        if cached is not None:
+            return cached
+
+        if len(pattern) < 2:
+            result = list(range(len(self.lines)))
+        else:
+            grams = {pattern[j:j + 2] for j in range(len(pattern) - 1)}
+            lists = [self.postings.get(gram, []) for gram in grams]
+            lists.sort(key=len)
+            candidates = set(lists[0])
+            for other in lists[1:]:
+                candidates.intersection_update(other)
+                if not candidates:
+                    break
+            result = sorted(candidates)
+
+        self._candidate_cache[pattern] = result
+        return result
+
+    def _matching_lines(self, keywords: List[str]) -> Dict[int, str]:
+        """キーワードを含む行番号 → その行で（リスト順で）最初のキーワード"""
+        key = tuple(keywords)
+        cached = self._match_cache.get(key)
+        if cached is not None:
+            return cached
+
+        matcher = compile_keywords(key)
+        candidates = set()
+        for keyword in keywords:
+            candidates.update(self.candidate_lines(fold(keyword)))
+
+        matched = {}
+        for i in sorted(candidates):
+            keyword = matcher.first_keyword(self.folded_lines[i], folded=True)
+            if keyword is not None:
+                matched[i] = keyword
+        self._match_cache[key] = matched
+        return matched
+
+    def keyword_matches(self, keywords: List[str], context_lines: int = 5) -> List[Dict[str, Any]]:
+        """キーワードを含む行（1行につき最初にマッチしたキーワード1つ）と前後の行"""
+        matched = self._matching_lines(keywords)
+
+        results = []
+        for i in sorted(matched):
+            start = max(0, i - context_lines)
+            end = min(len(self.lines), i + context_lines + 1)
+            results.append({
+                'keyword': matched[i],
+                'line_number': i + 1,
+                'match_line': self.lines[i],
+                'context': '\n'.join(self.lines[start:end])
+            })
+        return results
+
+    def sections(self, pattern: str) -> list:
+        """extract_sections の正規表現に一致するもの（re.findall と同じ結果）"""
+        # 一致するには本文に SECTION_LITERAL が必要なので、なければ正規表現を実行しない
+        if SECTION_LITERAL not in self.content:
+            return []
+        return re.findall(section_regex(pattern), self.content, re.DOTALL | re.IGNORECASE)
+
+    def bullet_points(self, keywords: List[str]) -> List[str]:
+        """キーワードを含む見出しの下（またはキーワードの行以降）の箇条書き"""
+        keyword_lines = set(self._matching_lines(keywords))
+        headings = set(self.heading_lines)
+        bullets = set(self.bullet_lines)
+
+        # 状態が変わりうる行だけを順にたどる
+        results = []
+        in_relevant_section = False
+        for i in sorted(keyword_lines | headings | bullets):
+            if i in keyword_lines:
+                in_relevant_section = True
+            if i in headings:
+                in_relevant_section = i in keyword_lines
+            if in_relevant_section and i in bullets:
+                results.append(self.lines[i].strip())
+        return results
+
+
+class KnowledgeIndex:
+    """ナレッジディレクトリ全体のインデックス（ディスクに保存）"""
+
+    def __init__(self, knowledge_dir: Path, index_path: Path):
+        self.knowledge_dir = Path(knowledge_dir)
+        self.index_path = Path(index_path)
+        self.entries = self._load()
+        self.documents = {}
+        self.rebuilt = []
+
+    def _load(self) -> Dict[str, Any]:
+        """保存済みのインデックスを読む（バージョン違い・破損は空扱い）"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != INDEX_VERSION:
+            return {}
+        return data.get("files", {})
+
+    def document(self, filename: str) -> Optional[IndexedDocument]:
+        """ファイルのインデックス付き本文（ファイルがなければNone）"""
+        if filename in self.documents:
+            return self.documents[filename]
+
+        filepath = self.knowledge_dir / filename
+        try:
+            stat = filepath.stat()
+        except OSError:
+            return None
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        entry = self.entries.get(filename)
+        if entry and entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+            document = IndexedDocument(content, entry)
+        else:
+            document = IndexedDocument(content)
+            entry = document.entry
+            entry["mtime_ns"] = stat.st_mtime_ns
+            entry["size"] = stat.st_size
+            self.entries[filename] = entry
+            self.rebuilt.append(filename)
+
+        self.documents[filename] = document
+        return document
+
+    def save(self):
+        """作り直したファイルがあればインデックスを保存"""
+        if not self.rebuilt:
+            return
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": INDEX_VERSION, "files": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+        self.rebuilt = []
@@ -7,7 +7,17 @@ Markdownファイルを解析してプレゼンテーション構造を抽出
 import re
 import json
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, Optional
+
+
+class MarkdownParseError(ValueError):
+    """Markdownの解析エラー（ファイル名と行番号付き）"""
+
+    def __init__(self, message: str, line: int, source_name: str = "<string>"):
+        self.message = message
+        self.line = line
+        self.source_name = source_name
+        super().__init__(f"{source_name}:{line}: {message}")
 
 
 class MarkdownParser:
@@ -20,206 +30,241 @@ class MarkdownParser:
         self.processing_log = []
         self.diagram_counter = 0
         self.image_counter = 0
+        self.slide_counter = 0
 
-    def parse(self, markdown_text: str) -> dict:
+    def parse(self, markdown_text: str, source_name: str = "<string>") -> dict:
         """Markdownテキストを解析"""
-        lines = markdown_text.split("\n")
+        for slide in self.iter_slides(markdown_text.split("\n"), source_name):
+            self.slides.append(slide)
+        return self.result()
+
+    def result(self) -> dict:
+        """解析結果（iter_slides で読んだスライドは self.slides に入れた分だけ含まれる）"""
+        return {
+            "metadata": self.metadata,
+            "assets": self.assets,
+            "slides": self.slides,
+            "processing_log": self.processing_log
+        }
+
+    def iter_slides(
+        self,
+        lines: Iterable[str],
+        source_name: str = "<string>",
+        first_line: int = 1
+    ) -> Iterator[dict]:
+        """
+        行を1行ずつ読み、完成したスライドから順に返す（1パス）
+
+        lines はファイルハンドルでもよい（末尾の改行は取り除く）。
+        スライドと各要素には元の行番号 "source_lines": [開始, 終了]（1始まり）を付ける。
+        ファイルの途中から読む場合は first_line に lines の最初の行の行番号を渡す。
+        """
         current_slide = None
         current_elements = []
         in_mermaid = False
         mermaid_content = []
+        mermaid_start = 0
         in_code_block = False
+        code_block_start = 0
         bullet_items = []
+        bullet_lines = [0, 0]
+        last_line = 0
 
-        for i, line in enumerate(lines):
-            # メタデータコメント
-            if line.strip().startswith("<!-- metadata:"):
-                self._parse_metadata(line)
-                continue
+        def finish_slide(end_line: int) -> dict:
+            self._finalize_bullet_list(current_elements, bullet_items, bullet_lines)
+            current_slide["elements"] = current_elements
+            current_slide["source_lines"][1] = end_line
+            self.slide_counter += 1
+            return current_slide
 
-            # 画像生成指示
-            if line.strip().startswith("<!-- generate:"):
-                asset = self._parse_generate_directive(line)
-                if asset:
-                    self.assets["images"].append(asset)
+        def new_slide(layout: str, title: str, lineno: int) -> dict:
+            return {
+                "layout": layout,
+                "elements": [
+                    {"type": "title", "content": title, "source_lines": [lineno, lineno]}
+                ],
+                "source_lines": [lineno, lineno]
+            }
+
+        lineno = first_line - 1
+        try:
+            for raw_line in lines:
+                lineno += 1
+                line = raw_line[:-1] if raw_line.endswith("\n") else raw_line
+                stripped = line.strip()
+
+                # メタデータコメント
+                if stripped.startswith("<!-- metadata:"):
+                    self._parse_metadata(line)
+                    continue
+
+                # 画像生成指示
+                if stripped.startswith("<!-- generate:"):
+                    asset = self._parse_generate_directive(line)
+                    if asset:
+                        asset["source_lines"] = [lineno, lineno]
+                        self.assets["images"].append(asset)
+                        current_elements.append({
+                            "type": "image",
+                            "asset_ref": asset["id"],
+                            "source_lines": [lineno, lineno]
+                        })
+                        if current_slide:
+                            last_line = lineno
+                        else:
+                            self.processing_log.append(
+                                f"{source_name}:{lineno}: 見出しより前の画像生成指示は無視されます"
+                            )
+                    else:
+                        self.processing_log.append(
+                            f"{source_name}:{lineno}: 画像生成指示を解釈できません"
+                        )
+                    continue
+
+                # Mermaidコードブロック開始
+                if stripped.startswith("```mermaid"):
+                    in_mermaid = True
+                    mermaid_content = []
+                    mermaid_start = lineno
+                    continue
+
+                # コードブロック終了
+                if in_mermaid and stripped == "```":
+                    in_mermaid = False
+                    asset = self._create_mermaid_asset("\n".join(mermaid_content))
+                    asset["source_lines"] = [mermaid_start, lineno]
+                    self.assets["diagrams"].append(asset)
                     current_elements.append({
-                        "type": "image",
-                        "asset_ref": asset["id"]
+                        "type": "diagram",
+                        "asset_ref": asset["id"],
+                        "source_lines": [mermaid_start, lineno]
                     })
-                continue
-
-            # Mermaidコードブロック開始
-            if line.strip().startswith("```mermaid"):
-                in_mermaid = True
-                mermaid_content = []
-                continue
-
-            # コードブロック終了
-            if in_mermaid and line.strip() == "```":
-                in_mermaid = False
-                asset = self._create_mermaid_asset("\n".join(mermaid_content))
-                self.assets["diagrams"].append(asset)
-                current_elements.append({
-                    "type": "diagram",
-                    "asset_ref": asset["id"]
-                })
-                continue
-
-            # Mermaid内容収集
-            if in_mermaid:
-                mermaid_content.append(line)
-                continue
-
-            # 通常のコードブロック
-            if line.strip().startswith("```"):
-                in_code_block = not in_code_block
-                continue
-
-            if in_code_block:
-                continue
-
-            # h1: タイトルスライドまたはセクション
-            if line.startswith("# ") and not line.startswith("##"):
-                # 前のスライドを保存
-                if current_slide:
-                    self._finalize_bullet_list(current_elements, bullet_items)
+                    if current_slide:
+                        last_line = lineno
+                    continue
+
+                # Mermaid内容収集
+                if in_mermaid:
+                    mermaid_content.append(line)
+                    continue
+
+                # 通常のコードブロック
+                if stripped.startswith("```"):
+                    in_code_block = not in_code_block
+                    code_block_start = lineno
+                    if current_slide:
+                        last_line = lineno
+                    continue
+
+                if in_code_block:
+                    continue
+
+                # h1〜h4: 新規スライド
+                heading = self._match_heading(line)
+                if heading:
+                    level, title = heading
+                    # 前のスライドを返す
+                    if current_slide:
+                        yield finish_slide(last_line)
+                        bullet_items = []
+
+                    if level == 1 and self.slide_counter == 0:  # 最初のh1はタイトルスライド
+                        current_slide = new_slide("title", title, lineno)
+                        self.metadata["title"] = title
+                        self.processing_log.append(f"h1をタイトルスライドとして処理: {title}")
+                    elif level == 1:  # 以降のh1はセクション
+                        current_slide = new_slide("section", title, lineno)
+                        self.processing_log.append(f"h1をセクション区切りとして処理: {title}")
+                    else:
+                        current_slide = new_slide("content", title, lineno)
+                        self.processing_log.append(f"h{level}で新規スライド: {title}")
+                    current_elements = current_slide["elements"]
+                    last_line = lineno
+                    continue
+
+                if stripped and current_slide:
+                    last_line = lineno
+
+                # 箇条書き
+                if stripped.startswith("- ") or stripped.startswith("* "):
+                    if not bullet_items:
+                        bullet_lines = [lineno, lineno]
+                    bullet_items.append(stripped[2:].strip())
+                    bullet_lines[1] = lineno
+                    continue
+
+                # 番号付きリスト
+                if re.match(r"^\d+\.\s", stripped):
+                    if not bullet_items:
+                        bullet_lines = [lineno, lineno]
+                    bullet_items.append(re.sub(r"^\d+\.\s", "", stripped))
+                    bullet_lines[1] = lineno
+                    continue
+
+                # 画像参照
+                img_match = re.match(r"!\[([^\]]*)\]\(([^)]+)\)", stripped)
+                if img_match:
+                    self._finalize_bullet_list(current_elements, bullet_items, bullet_lines)
                     bullet_items = []
-                    current_slide["elements"] = current_elements
-                    self.slides.append(current_slide)
-
-                title = line[2:].strip()
-                if not self.slides:  # 最初のh1はタイトルスライド
-                    current_slide = {
-                        "layout": "title",
-                        "elements": [{"type": "title", "content": title}]
-                    }
-                    self.metadata["title"] = title
-                    self.processing_log.append(f"h1をタイトルスライドとして処理: {title}")
-                else:  # 以降のh1はセクション
-                    current_slide = {
-                        "layout": "section",
-                        "elements": [{"type": "title", "content": title}]
-                    }
-                    self.processing_log.append(f"h1をセクション区切りとして処理: {title}")
-                current_elements = current_slide["elements"]
-                continue
-
-            # h2: 新規スライド
-            if line.startswith("## "):
-                # 前のスライドを保存
-                if current_slide:
-                    self._finalize_bullet_list(current_elements, bullet_items)
-                    bullet_items = []
-                    current_slide["elements"] = current_elements
-                    self.slides.append(current_slide)
-
-                title = line[3:].strip()
-                current_slide = {
-                    "layout": "content",
-                    "elements": [{"type": "title", "content": title}]
-                }
-                current_elements = current_slide["elements"]
-                self.processing_log.append(f"h2で新規スライド: {title}")
-                continue
-
-            # h3: 新規スライド（小見出しとして）
-            if line.startswith("### "):
-                # 前のスライドを保存
-                if current_slide:
-                    self._finalize_bullet_list(current_elements, bullet_items)
-                    bullet_items = []
-                    current_slide["elements"] = current_elements
-                    self.slides.append(current_slide)
-
-                title = line[4:].strip()
-                current_slide = {
-                    "layout": "content",
-                    "elements": [{"type": "title", "content": title}]
-                }
-                current_elements = current_slide["elements"]
-                self.processing_log.append(f"h3で新規スライド: {title}")
-                continue
-
-            # h4: 新規スライド（さらに下位の見出し）
-            if line.startswith("#### "):
-                # 前のスライドを保存
-                if current_slide:
-                    self._finalize_bullet_list(current_elements, bullet_items)
-                    bullet_items = []
-                    current_slide["elements"] = current_elements
-                    self.slides.append(current_slide)
-
-                title = line[5:].strip()
-                current_slide = {
-                    "layout": "content",
-                    "elements": [{"type": "title", "content": title}]
-                }
-                current_elements = current_slide["elements"]
-                self.processing_log.append(f"h4で新規スライド: {title}")
-                continue
-
-            # 箇条書き
-            if line.strip().startswith("- ") or line.strip().startswith("* "):
-                item = line.strip()[2:].strip()
-                bullet_items.append(item)
-                continue
-
-            # 番号付きリスト
-            if re.match(r"^\d+\.\s", line.strip()):
-                item = re.sub(r"^\d+\.\s", "", line.strip())
-                bullet_items.append(item)
-                continue
-
-            # 画像参照
-            img_match = re.match(r"!\[([^\]]*)\]\(([^)]+)\)", line.strip())
-            if img_match:
-                self._finalize_bullet_list(current_elements, bullet_items)
-                bullet_items = []
-                alt_text, path = img_match.groups()
-                asset = self._create_file_image_asset(path, alt_text)
-                self.assets["images"].append(asset)
-                current_elements.append({
-                    "type": "image",
-                    "asset_ref": asset["id"]
-                })
-                continue
-
-            # テーブル
-            if line.strip().startswith("|") and "|" in line[1:]:
-                # テーブル処理（簡易版）
-                self._finalize_bullet_list(current_elements, bullet_items)
-                bullet_items = []
-                # TODO: テーブル解析の実装
-                continue
-
-            # 水平線（スキップ）
-            if line.strip() == "---" or line.strip() == "***" or line.strip() == "___":
-                continue
-
-            # 通常のテキスト段落
-            if line.strip() and current_slide:
-                self._finalize_bullet_list(current_elements, bullet_items)
-                bullet_items = []
-                # Markdownの太字記法を除去
-                text_content = self._strip_markdown_formatting(line.strip())
-                if text_content:  # 空でない場合のみ追加
+                    alt_text, path = img_match.groups()
+                    asset = self._create_file_image_asset(path, alt_text)
+                    asset["source_lines"] = [lineno, lineno]
+                    self.assets["images"].append(asset)
                     current_elements.append({
-                        "type": "text",
-                        "content": text_content
+                        "type": "image",
+                        "asset_ref": asset["id"],
+                        "source_lines": [lineno, lineno]
                     })
+                    continue
 
-        # 最後のスライドを保存
-        if current_slide:
-            self._finalize_bullet_list(current_elements, bullet_items)
-            current_slide["elements"] = current_elements
-            self.slides.append(current_slide)
+                # テーブル
+                if stripped.startswith("|") and "|" in line[1:]:
+                    # テーブル処理（簡易版）
+                    self._finalize_bullet_list(current_elements, bullet_items, bullet_lines)
+                    bullet_items = []
+                    # TODO: テーブル解析の実装
+                    continue
 
-        return {
-            "metadata": self.metadata,
-            "assets": self.assets,
-            "slides": self.slides,
-            "processing_log": self.processing_log
-        }
+                # 水平線（スキップ）
+                if stripped == "---" or stripped == "***" or stripped == "___":
+                    continue
+
+                # 通常のテキスト段落
+                if stripped and current_slide:
+                    self._finalize_bullet_list(current_elements, bullet_items, bullet_lines)
+                    bullet_items = []
+                    # Markdownの太字記法を除去
+                    text_content = self._strip_markdown_formatting(stripped)
+                    if text_content:  # 空でない場合のみ追加
+                        current_elements.append({
+                            "type": "text",
+                            "content": text_content,
+                            "source_lines": [lineno, lineno]
+                        })
+        except UnicodeDecodeError as e:
+            raise MarkdownParseError(
+                f"UTF-8として読めません ({e.reason})", lineno + 1, source_name
+            ) from e
+
+        if in_mermaid:
+            raise MarkdownParseError("Mermaidブロックが閉じられていません", mermaid_start, source_name)
+        if in_code_block:
+            raise MarkdownParseError("コードブロックが閉じられていません", code_block_start, source_name)
+
+        # 最後のスライドを返す
+        if current_slide:
+            yield finish_slide(last_line)
+
+    def _match_heading(self, line: str) -> Optional[tuple]:
+        """h1〜h4の見出しなら (レベル, タイトル)"""
+        if line.startswith("# ") and not line.startswith("##"):
+            return 1, line[2:].strip()
+        for level in (2, 3, 4):
+            prefix = "#" * level + " "
+            if line.startswith(prefix):
+                return level, line[len(prefix):].strip()
+        return None
 
     def _parse_metadata(self, line: str):
         """メタデータコメントを解析"""
@@ -270,15 +315,18 @@ class MarkdownParser:
             "status": "pending"
         }
 
-    def _finalize_bullet_list(self, elements: list, items: list):
+    def _finalize_bullet_list(self, elements: list, items: list, source_lines: list = None):
         """箇条書きリストを要素に追加"""
         if items:
             # 箇条書きの各項目からMarkdown記法を除去
             cleaned_items = [self._strip_markdown_formatting(item) for item in items]
-            elements.append({
+            element = {
                 "type": "bullet_list",
                 "content": cleaned_items
-            })
+            }
+            if source_lines:
+                element["source_lines"] = list(source_lines)
+            elements.append(element)
 
     def _strip_markdown_formatting(self, text: str) -> str:
         """Markdown記法をプレーンテキストに変換"""
@@ -308,29 +356,72 @@ class MarkdownParser:
         return text.strip()
 
 
-def parse_markdown_file(input_path: str) -> dict:
-    """Markdownファイルを解析"""
+def _hashed_lines(lines: Iterable[str], digest) -> Iterator[str]:
+    """読んだ行で digest を更新しながらそのまま返す"""
+    for line in lines:
+        digest.update(line.encode("utf-8"))
+        yield line
+
+
+def iter_markdown_file(
+    input_path: str,
+    parser: MarkdownParser = None,
+    digest=None
+) -> Iterator[dict]:
+    """
+    Markdownファイルを1行ずつ読み、完成したスライドから順に返す
+
+    ファイル全体をメモリに読み込まない。素材とメタデータは parser に溜まる。
+    digest（hashlib.sha256() など）を渡すと読んだ内容で更新する
+    （最後まで読むと build_cache.content_hash(ファイルの内容) と同じ値になる）。
+    """
     path = Path(input_path)
     if not path.exists():
         raise FileNotFoundError(f"入力ファイルが見つかりません: {input_path}")
 
+    parser = parser if parser is not None else MarkdownParser()
     with open(path, "r", encoding="utf-8") as f:
-        content = f.read()
+        lines = f if digest is None else _hashed_lines(f, digest)
+        yield from parser.iter_slides(lines, str(path))
+
 
+def parse_markdown_file(input_path: str) -> dict:
+    """Markdownファイルを解析"""
     parser = MarkdownParser()
-    return parser.parse(content)
+    for slide in iter_markdown_file(input_path, parser):
+        parser.slides.append(slide)
+    return parser.result()
 
 
 if __name__ == "__main__":
     import argparse
+    import sys
 
     arg_parser = argparse.ArgumentParser(description="Markdown Parser")
     arg_parser.add_argument("--input", "-i", required=True, help="入力Markdownファイル")
     arg_parser.add_argument("--output", "-o", help="出力JSONファイル（省略時は標準出力）")
+    arg_parser.add_argument(
+        "--stream", action="store_true",
+        help="スライドを1行1件のJSON（JSON Lines）で順に出力"
+    )
 
     args = arg_parser.parse_args()
 
-    result = parse_markdown_file(args.input)
+    try:
+        if args.stream:
+            out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+            try:
+                for slide in iter_markdown_file(args.input):
+                    out.write(json.dumps(slide, ensure_ascii=False) + "\n")
+            finally:
+                if args.output:
+                    out.close()
+            sys.exit(0)
+
+        result = parse_markdown_file(args.input)
+    except MarkdownParseError as e:
+        print(f"解析エラー: {e}", file=sys.stderr)
+        sys.exit(1)
 
     if args.output:
         with open(args.output, "w", encoding="utf-8") as f:
@@ -4,22 +4,92 @@ Orchestrator - PowerPoint自動生成システム
 メイン制御スクリプト
 """
 
+import io
+import os
+import copy
+import hashlib
+import glob
 import json
+import time
 import argparse
 import yaml
 import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
 from pathlib import Path
 from datetime import datetime
 
-from markdown_parser import parse_markdown_file, MarkdownParser
-from asset_generator import AssetGenerator
+from markdown_parser import (
+    parse_markdown_file, iter_markdown_file, MarkdownParser, MarkdownParseError
+)
+from asset_generator import (
+    AssetGenerator, MERMAID_RENDERERS, DEFAULT_MERMAID_WORKERS, mermaid_cli_available
+)
 from pptx_renderer import PowerPointRenderer
+from deck_watcher import DeckWatcher
+from build_cache import (
+    BuildCache, CACHE_DIR_NAME, CACHEABLE_STATUS,
+    asset_store_dir, content_hash, asset_key, file_signature, slide_keys
+)
+
+
+# 素材をまとめて生成するスライド数（Mermaid図を並列に描画しつつ、保持するスライドを抑える）
+STREAM_WINDOW = 16
+
+# 中間JSONのスライドを書き出した位置に置く目印（JSON文字列としては "\u0000slides" になる）
+_SLIDES_PLACEHOLDER = "\x00slides"
+
+
+class IntermediateJsonWriter:
+    """
+    中間JSON（presentation.json）をスライド1枚ずつ書き出す
+
+    スライドは一時ファイルに追記しておき、close() でメタデータ・素材と合わせて
+    json.dump(..., indent=2) と同じ形の1つのJSONにする。
+    """
+
+    def __init__(self, json_path: Path):
+        self.json_path = Path(json_path)
+        self.slides_path = self.json_path.with_name(self.json_path.name + ".slides")
+        self._slides = open(self.slides_path, "w", encoding="utf-8")
+        self.count = 0
+
+    def add(self, slide: dict):
+        """スライドを1枚追記"""
+        text = json.dumps(slide, ensure_ascii=False, indent=2).replace("\n", "\n      ")
+        self._slides.write(("," if self.count else "") + "\n      " + text)
+        self.count += 1
+
+    def close(self, presentation: dict):
+        """presentation（slides 以外）と書き出したスライドを presentation.json にまとめる"""
+        self._slides.close()
+        text = json.dumps(
+            {"presentation": {**presentation, "slides": _SLIDES_PLACEHOLDER}},
+            ensure_ascii=False, indent=2
+        )
+        head, tail = text.split(json.dumps(_SLIDES_PLACEHOLDER), 1)
+        with open(self.json_path, "w", encoding="utf-8") as f:
+            f.write(head)
+            if self.count:
+                f.write("[")
+                with open(self.slides_path, "r", encoding="utf-8") as slides:
+                    shutil.copyfileobj(slides, f)
+                f.write("\n    ]")
+            else:
+                f.write("[]")
+            f.write(tail)
+        self.slides_path.unlink()
 
 
 class Orchestrator:
     """PowerPoint生成オーケストレーター"""
 
-    def __init__(self, project_root: str):
+    def __init__(
+        self,
+        project_root: str,
+        mermaid_renderer: str = "auto",
+        asset_workers: int = None
+    ):
         self.project_root = Path(project_root)
         self.config_dir = self.project_root / "config"
         self.input_dir = self.project_root / "input"
@@ -27,6 +97,9 @@ class Orchestrator:
         self.assets_dir = self.project_root / "assets"
         self.output_dir = self.project_root / "powerpoint-output"
 
+        self.mermaid_renderer = mermaid_renderer
+        self.asset_workers = asset_workers
+
         self.theme = {}
         self.processing_log = []
 
@@ -44,10 +117,10 @@ class Orchestrator:
         else:
             self.processing_log.append("デフォルトテーマを使用")
 
-    def create_build_directory(self) -> Path:
-        """タイムスタンプ付きビルドディレクトリを作成"""
+    def create_build_directory(self, label: str = None) -> Path:
+        """タイムスタンプ付きビルドディレクトリを作成（labelがあれば末尾に付ける）"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        build_dir = self.output_dir / timestamp
+        build_dir = self.output_dir / (f"{timestamp}_{label}" if label else timestamp)
 
         build_dir.mkdir(parents=True, exist_ok=True)
 
@@ -62,64 +135,118 @@ class Orchestrator:
     def run_from_markdown(
         self,
         input_path: str,
-        theme_path: str = None
+        theme_path: str = None,
+        incremental: bool = False,
+        build_label: str = None
     ) -> dict:
-        """Markdownからフル処理を実行"""
+        """Markdownからフル処理を実行（incremental=Trueなら前回の結果を再利用）"""
         print("=" * 60)
         print("PowerPoint自動生成システム")
         print("=" * 60)
 
-        # テーマ読み込み
-        self.load_theme(theme_path)
+        # テーマ読み込み（読み込み済みで指定がなければそのまま使う）
+        if theme_path or not self.theme:
+            self.load_theme(theme_path)
 
         # ビルドディレクトリ作成
-        build_dir = self.create_build_directory()
-
-        # Phase 1: Markdown解析
-        print("\n[Phase 1] Markdown解析...")
-        parsed = parse_markdown_file(input_path)
-
-        # 中間JSON生成
-        intermediate_data = {
-            "presentation": {
-                "metadata": {
-                    **parsed["metadata"],
-                    "generated_at": datetime.now().isoformat()
-                },
-                "theme": self.theme,
-                "assets": parsed["assets"],
-                "slides": parsed["slides"],
-                "processing_log": parsed["processing_log"]
-            }
-        }
+        build_dir = self.create_build_directory(build_label)
+
+        cache = None
+        if incremental:
+            cache = BuildCache(self.output_dir / CACHE_DIR_NAME, input_path)
+        previous = cache.previous if cache else {}
+        theme_key = content_hash(self.theme or {})
+
+        # Markdownは1スライドずつ読み、素材生成・PowerPoint生成まで順に流す
+        # （ファイル全体やスライド全体をメモリに持たない）
+        print(f"\n[Phase 1-3] Markdown解析 → 素材生成 → PowerPoint生成"
+              f"（{STREAM_WINDOW}スライドずつ）...")
+        if not Path(input_path).exists():
+            raise FileNotFoundError(f"入力ファイルが見つかりません: {input_path}")
+        input_stat = file_signature(Path(input_path))
+
+        parser = MarkdownParser()
+        digest = None
+        if (cache and previous.get("input_stat") == input_stat
+                and "parsed" in previous and "input_hash" in previous):
+            # 既存ファイルの素材と同じく、更新日時とサイズが同じなら前回の解析結果を使う
+            parsed = previous["parsed"]
+            parser.metadata = parsed["metadata"]
+            parser.assets = parsed["assets"]
+            parser.processing_log = parsed["processing_log"]
+            slides = iter(parsed["slides"])
+            cache.record("parse", True)
+            print("  キャッシュ再利用（Markdown変更なし）")
+        else:
+            # 内容ハッシュは読みながら計算する
+            digest = hashlib.sha256()
+            slides = iter_markdown_file(input_path, parser, digest)
+            if cache:
+                cache.record("parse", False)
 
         json_path = build_dir / "intermediate" / "presentation.json"
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(intermediate_data, f, ensure_ascii=False, indent=2)
-
-        print(f"  中間JSON出力: {json_path}")
-        print(f"  スライド数: {len(parsed['slides'])}")
+        writer = IntermediateJsonWriter(json_path)
 
-        # Phase 2: 素材生成
-        print("\n[Phase 2] 素材生成...")
         # アセットディレクトリをビルドディレクトリ内に設定
-        asset_generator = AssetGenerator(str(build_dir), self.theme)
-        asset_result = asset_generator.generate_all(parsed["assets"])
-
-        # JSONを更新
-        intermediate_data["presentation"]["assets"] = asset_result["assets"]
-        intermediate_data["presentation"]["processing_log"].extend(
-            asset_result["processing_log"]
+        asset_generator = AssetGenerator(
+            str(build_dir),
+            self.theme,
+            cache_dir=str(asset_store_dir(self.output_dir / CACHE_DIR_NAME)),
+            max_workers=self.asset_workers,
+            mermaid_renderer=self.mermaid_renderer
         )
+        asset_keys = {}
+        keys = []
+        cache_log = []
+        # 素材生成でステータスが書き換わる前の解析結果を保存用に取っておく
+        snapshot = {"diagrams": [], "images": [], "slides": []} if cache else None
+        generated = {"diagrams": 0, "images": 0}
+
+        def prepare_window(window: list):
+            """前回から増えた素材を生成してから、window のスライドを返す"""
+            new_assets = {}
+            for kind in ("diagrams", "images"):
+                new_assets[kind] = parser.assets[kind][generated[kind]:]
+                generated[kind] = len(parser.assets[kind])
+                for asset in new_assets[kind]:
+                    asset_keys[asset["id"]] = asset_key(
+                        asset, self.theme or {}, build_dir, self.mermaid_renderer
+                    )
+                if snapshot is not None:
+                    snapshot[kind].extend(copy.deepcopy(new_assets[kind]))
+
+            pending = new_assets
+            if cache:
+                pending = self._restore_cached_assets(
+                    cache, new_assets, asset_keys, build_dir, cache_log
+                )
+            asset_generator.generate_all(pending)
+            if cache:
+                for kind in ("diagrams", "images"):
+                    for asset in pending.get(kind, []):
+                        if CACHEABLE_STATUS.get(asset["type"]) == asset.get("status"):
+                            cache.store_asset(
+                                asset_keys[asset["id"]], build_dir / asset["output_path"]
+                            )
+
+            keys.extend(slide_keys(window, asset_keys, theme_key))
+            for slide in window:
+                writer.add(slide)
+                if snapshot is not None:
+                    snapshot["slides"].append(slide)
+                yield slide
+
+        def prepare_slides():
+            """STREAM_WINDOW 枚ごとに素材をまとめて生成し（Mermaidは並列）、スライドを順に返す"""
+            window = []
+            for slide in slides:
+                window.append(slide)
+                if len(window) >= STREAM_WINDOW:
+                    yield from prepare_window(window)
+                    window = []
+            # 最後の端数と、どのスライドにも属さない素材
+            yield from prepare_window(window)
 
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(intermediate_data, f, ensure_ascii=False, indent=2)
-
-        for log in asset_result["processing_log"]:
-            print(f"  {log}")
-
-        # Phase 3: PowerPoint生成
-        print("\n[Phase 3] PowerPoint生成...")
         output_config = self.theme.get("output", {})
         filename_prefix = output_config.get("filename_prefix", "presentation")
         filename_suffix = output_config.get("filename_suffix", "")
@@ -131,12 +258,96 @@ class Orchestrator:
             output_filename = f"{filename_prefix}{filename_suffix}.pptx"
 
         output_path = build_dir / output_filename
+        previous_output = Path(previous.get("output_file", ""))
+
+        reuse_output = False
+        if digest is None and previous_output.is_file():
+            # 解析結果が前回と同じなら、素材とテーマのキーだけでデッキ全体を比べられる
+            previous_asset_keys = {
+                asset["id"]: asset_key(asset, self.theme or {}, build_dir, self.mermaid_renderer)
+                for kind in ("diagrams", "images")
+                for asset in parser.assets.get(kind, [])
+            }
+            expected_keys = slide_keys(parsed["slides"], previous_asset_keys, theme_key)
+            reuse_output = previous.get("deck_key") == content_hash(
+                {"slides": expected_keys, "theme": theme_key}
+            )
 
-        renderer = PowerPointRenderer(self.theme, str(build_dir))
-        render_result = renderer.render(
-            intermediate_data["presentation"],
-            str(output_path)
-        )
+        if reuse_output:
+            # python-pptxはスライド単位で差し替えられないため、
+            # 全スライドが前回と同じ場合だけPowerPointを再利用する（素材と中間JSONは作る）
+            for _ in prepare_slides():
+                pass
+            if previous_output.resolve() != output_path.resolve():
+                shutil.copyfile(previous_output, output_path)
+            cache.record("render", True)
+            render_result = {
+                "slide_count": len(keys),
+                "processing_log": [f"PowerPointをキャッシュから再利用: {previous_output}"]
+            }
+            print(f"  キャッシュ再利用: {previous_output}")
+        else:
+            renderer = PowerPointRenderer(self.theme, str(build_dir))
+            render_result = renderer.render(
+                {"assets": parser.assets, "slides": prepare_slides()},
+                str(output_path)
+            )
+            if cache:
+                cache.record("render", False)
+
+        asset_result = {
+            "assets": parser.assets,
+            "processing_log": cache_log + asset_generator.processing_log
+        }
+
+        # 中間JSON生成（スライドは書き出し済み）
+        writer.close({
+            "metadata": {
+                **parser.metadata,
+                "generated_at": datetime.now().isoformat()
+            },
+            "theme": self.theme,
+            "assets": parser.assets,
+            "processing_log": parser.processing_log + asset_result["processing_log"]
+        })
+        print(f"  中間JSON出力: {json_path}")
+        print(f"  スライド数: {len(keys)}")
+        for log in asset_result["processing_log"]:
+            print(f"  {log}")
+
+        input_key = digest.hexdigest() if digest else previous["input_hash"]
+        deck_key = content_hash({"slides": keys, "theme": theme_key})
+
+        if cache:
+            # Mermaid図は AssetGenerator が同じ素材ストアで再利用・保存する
+            cache.record("assets", True, asset_generator.cache_report["hit"])
+            cache.record("assets", False, asset_generator.cache_report["miss"])
+
+            previous_keys = set(previous.get("slide_keys", []))
+            changed = [i + 1 for i, key in enumerate(keys) if key not in previous_keys]
+            cache.record("slides", True, len(keys) - len(changed))
+            cache.record("slides", False, len(changed))
+            if changed:
+                print(f"  変更スライド: {', '.join(f'p.{n}' for n in changed)}")
+
+            cache.save_manifest({
+                "input_file": str(input_path),
+                "input_stat": input_stat,
+                "input_hash": input_key,
+                "theme_hash": theme_key,
+                "parsed": {
+                    "metadata": parser.metadata,
+                    "assets": {
+                        "diagrams": snapshot["diagrams"],
+                        "images": snapshot["images"]
+                    },
+                    "slides": snapshot["slides"],
+                    "processing_log": parser.processing_log
+                },
+                "slide_keys": keys,
+                "deck_key": deck_key,
+                "output_file": str(output_path.resolve())
+            })
 
         # ビルドログを保存
         build_log = {
@@ -147,11 +358,13 @@ class Orchestrator:
             "slide_count": render_result["slide_count"],
             "processing_log": (
                 self.processing_log +
-                parsed["processing_log"] +
+                parser.processing_log +
                 asset_result["processing_log"] +
                 render_result["processing_log"]
             )
         }
+        if cache:
+            build_log["cache_report"] = cache.report
 
         log_path = build_dir / "build_log.json"
         with open(log_path, "w", encoding="utf-8") as f:
@@ -167,6 +380,11 @@ class Orchestrator:
         print(f"ビルドログ: {log_path}")
         print(f"総スライド数: {render_result['slide_count']}")
 
+        if cache:
+            print("\n[キャッシュ]")
+            for line in cache.format_report():
+                print(f"  {line}")
+
         # ファイル場所確認処理
         self._verify_output_file(output_path)
 
@@ -174,9 +392,124 @@ class Orchestrator:
             "build_dir": str(build_dir),
             "output_path": str(output_path),
             "json_path": str(json_path),
-            "slide_count": render_result["slide_count"]
+            "slide_count": render_result["slide_count"],
+            "cache_report": cache.report if cache else None
         }
 
+    def run_batch(
+        self,
+        patterns: list,
+        theme_path: str = None,
+        jobs: int = None,
+        incremental: bool = False
+    ) -> dict:
+        """globに一致する複数のMarkdownを並列プロセスでビルド"""
+        inputs = []
+        for pattern in patterns:
+            for path in sorted(glob.glob(pattern, recursive=True)):
+                if Path(path).is_file() and path not in inputs:
+                    inputs.append(path)
+
+        print("=" * 60)
+        print(f"バッチビルド: {len(inputs)}ファイル")
+        print("=" * 60)
+        if not inputs:
+            print("対象ファイルがありません")
+            return {"decks": [], "failed": 0, "wall_seconds": 0.0}
+
+        # テーマは親プロセスで1回だけ読み、各ワーカーに渡す
+        self.load_theme(theme_path)
+        jobs = max(1, min(jobs or os.cpu_count() or 1, len(inputs)))
+        # mmdcの同時起動数が全体で mermaid.max_workers 程度になるよう分ける
+        asset_workers = self.asset_workers or max(1, self.theme.get("mermaid", {}).get(
+            "max_workers", DEFAULT_MERMAID_WORKERS
+        ) // jobs)
+        print(f"並列数: {jobs}プロセス（Mermaid {asset_workers}スレッド/プロセス）\n")
+
+        start = time.perf_counter()
+        results = {}
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_batch_worker,
+            initargs=(
+                str(self.project_root), self.theme,
+                self.mermaid_renderer, asset_workers
+            )
+        ) as pool:
+            futures = {
+                pool.submit(_build_deck, path, label, incremental): path
+                for path, label in zip(inputs, batch_labels(inputs))
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                results[result["input"]] = result
+                if result["ok"]:
+                    print(f"  OK  {result['input']} "
+                          f"({result['slide_count']}枚, {result['seconds']:.1f}s)")
+                else:
+                    print(f"  NG  {result['input']} ({result['seconds']:.1f}s) - {result['error']}")
+        wall_seconds = time.perf_counter() - start
+
+        decks = [results[path] for path in inputs]
+        failed = [d for d in decks if not d["ok"]]
+        summary = {
+            "build_time": datetime.now().isoformat(),
+            "jobs": jobs,
+            "wall_seconds": wall_seconds,
+            "deck_seconds": sum(d["seconds"] for d in decks),
+            "failed": len(failed),
+            "decks": decks
+        }
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        log_path = self.output_dir / f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(log_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+        print("\n" + "=" * 60)
+        print("バッチビルド完了")
+        print("=" * 60)
+        print(f"{'入力':<48} {'枚数':>4} {'時間(s)':>8}  結果")
+        for deck in decks:
+            name = deck["input"]
+            slides = deck.get("slide_count", "-")
+            print(f"{name:<48} {slides:>4} {deck['seconds']:>8.1f}  "
+                  f"{'OK' if deck['ok'] else 'NG'}")
+        print(f"\n成功: {len(decks) - len(failed)} / 失敗: {len(failed)}")
+        print(f"合計 {summary['deck_seconds']:.1f}s を {wall_seconds:.1f}s で処理（{jobs}プロセス）")
+        for deck in failed:
+            print(f"  失敗: {deck['input']} - {deck['error']}")
+        print(f"バッチログ: {log_path}")
+
+        return summary
+
+    def _restore_cached_assets(
+        self,
+        cache: BuildCache,
+        assets: dict,
+        asset_keys: dict,
+        build_dir: Path,
+        log: list
+    ) -> dict:
+        """キャッシュにある素材をビルドディレクトリに戻し、生成が必要な素材だけを返す"""
+        pending = {"diagrams": [], "images": []}
+        for kind in ("diagrams", "images"):
+            for asset in assets.get(kind, []):
+                status = CACHEABLE_STATUS.get(asset["type"])
+                # 既存ファイルの確認は軽いので毎回行う
+                if status is None:
+                    pending[kind].append(asset)
+                    continue
+                key = asset_keys[asset["id"]]
+                if cache.restore_asset(key, build_dir / asset["output_path"]):
+                    asset["status"] = status
+                    cache.record("assets", True)
+                    log.append(f"キャッシュ再利用: {asset['id']}")
+                else:
+                    pending[kind].append(asset)
+                    cache.record("assets", False)
+        return pending
+
     def _verify_output_file(self, output_path: Path):
         """出力ファイルの場所と存在を確認"""
         print("\n" + "-" * 60)
@@ -252,6 +585,70 @@ class Orchestrator:
         }
 
 
+def batch_labels(inputs: list) -> list:
+    """
+    バッチビルドの各入力のビルドディレクトリ名（入力の共通の親からの相対パス）
+
+    chX/README.md のように同じ名前のファイルが複数あっても、並列に同じ
+    ディレクトリへ書き込まないよう、区切り文字を "_" にしたパスを使う
+    （それでも重複する場合は番号を付ける）。
+    """
+    paths = [Path(path).resolve() for path in inputs]
+    root = Path(os.path.commonpath([path.parent for path in paths])) if paths else None
+    labels = []
+    for path in paths:
+        base = label = "_".join(path.relative_to(root).with_suffix("").parts)
+        number = 2
+        while label in labels:
+            label = f"{base}_{number}"
+            number += 1
+        labels.append(label)
+    return labels
+
+
+# バッチビルドのワーカープロセスごとに1つ作るオーケストレーター
+_batch_orchestrator = None
+
+
+def _init_batch_worker(project_root: str, theme: dict, mermaid_renderer: str, asset_workers: int):
+    """ワーカープロセスの初期化（テーマ・mmdcの確認をプロセスごとに1回だけ行う）"""
+    global _batch_orchestrator
+    _batch_orchestrator = Orchestrator(
+        project_root,
+        mermaid_renderer=mermaid_renderer,
+        asset_workers=asset_workers
+    )
+    _batch_orchestrator.theme = theme
+    mermaid_cli_available()
+
+
+def _build_deck(input_path: str, build_label: str, incremental: bool) -> dict:
+    """ワーカープロセスで1つのデッキをビルド（出力は結果の辞書にまとめる）"""
+    start = time.perf_counter()
+    _batch_orchestrator.processing_log = []
+    try:
+        with redirect_stdout(io.StringIO()):
+            result = _batch_orchestrator.run_from_markdown(
+                input_path,
+                incremental=incremental,
+                build_label=build_label
+            )
+    except Exception as e:
+        return {
+            "input": input_path,
+            "ok": False,
+            "seconds": time.perf_counter() - start,
+            "error": f"{type(e).__name__}: {e}"
+        }
+    return {
+        "input": input_path,
+        "ok": True,
+        "seconds": time.perf_counter() - start,
+        "slide_count": result["slide_count"],
+        "output_path": result["output_path"]
+    }
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="PowerPoint自動生成システム",
@@ -264,6 +661,15 @@ def main():
   # 既存JSONからPowerPoint生成
   python orchestrator.py --json intermediate/presentation.json
 
+  # 複数のMarkdownを並列にビルド
+  python orchestrator.py --batch "../01_lectures/docs/*.md" --jobs 4
+
+  # 前回のビルドから変更のない素材・スライドを再利用
+  python orchestrator.py --input input/content.md --incremental
+
+  # 保存するたびに再ビルド（Ctrl+C で終了）
+  python orchestrator.py --input input/content.md --watch
+
   # 出力JSONのみ生成（PowerPoint生成なし）
   python orchestrator.py --input input/content.md --output-json intermediate/presentation.json
         """
@@ -290,12 +696,73 @@ def main():
         "--output-json",
         help="中間JSONのみを出力（PowerPoint生成なし）"
     )
+    parser.add_argument(
+        "--batch", "-b",
+        nargs="+",
+        metavar="GLOB",
+        help="globに一致する複数のMarkdownを並列にビルド"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="バッチビルドのプロセス数（省略時はCPU数）"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="前回のビルドから変更のない素材・スライドを再利用"
+    )
+    parser.add_argument(
+        "--watch", "-w",
+        action="store_true",
+        help="入力Markdown・テーマの保存を監視して再ビルド（同じビルドディレクトリに上書き）"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.3,
+        help="--watch でファイルを確認する間隔（秒）"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Mermaid図を並列に描画する数（省略時はテーマのmermaid.max_workers）"
+    )
+    parser.add_argument(
+        "--mermaid-renderer",
+        choices=MERMAID_RENDERERS,
+        default="auto",
+        help="Mermaidの描画方法（stub: mmdcなしで単色PNGを出力）"
+    )
 
     args = parser.parse_args()
 
-    orchestrator = Orchestrator(args.project)
+    orchestrator = Orchestrator(
+        args.project,
+        mermaid_renderer=args.mermaid_renderer,
+        asset_workers=args.workers
+    )
+
+    try:
+        run(orchestrator, args, parser)
+    except MarkdownParseError as e:
+        print(f"Markdown解析エラー: {e}")
+        raise SystemExit(1)
 
-    if args.input:
+
+def run(orchestrator: Orchestrator, args, parser):
+    """コマンドライン引数に応じて処理を実行"""
+    if args.batch:
+        summary = orchestrator.run_batch(
+            args.batch, args.theme, jobs=args.jobs, incremental=args.incremental
+        )
+        if summary["failed"]:
+            raise SystemExit(1)
+
+    elif args.input and args.watch:
+        DeckWatcher(orchestrator, args.input, args.theme, interval=args.interval).run()
+
+    elif args.input:
         if args.output_json:
             # JSONのみ出力
             orchestrator.load_theme(args.theme)
@@ -317,7 +784,9 @@ def main():
             print(f"JSON出力完了: {args.output_json}")
         else:
             # フル処理
-            orchestrator.run_from_markdown(args.input, args.theme)
+            orchestrator.run_from_markdown(
+                args.input, args.theme, incremental=args.incremental
+            )
 
     elif args.json:
         orchestrator.run_from_json(args.json, args.theme)
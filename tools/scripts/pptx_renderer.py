@@ -4,16 +4,107 @@ PowerPoint Renderer
 スライドマスターを活用してJSONからPowerPointファイルを生成
 """
 
+import copy
 import json
 from pathlib import Path
 from datetime import datetime
+from xml.sax.saxutils import quoteattr
 
 from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.dml.color import RGBColor
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
 from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
 from pptx.enum.shapes import MSO_SHAPE
-from pptx.oxml.ns import qn
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+
+
+class PreparedStyle:
+    """
+    テーマから解決したスタイルのXML断片を1回だけ作り、複製して使う
+
+    段落（フォント・サイズ・色・太字・配置・段落間隔）と背景は
+    組み合わせごとにXMLを1回だけ組み立て、同じ図形は最初に作ったものを複製する。
+    python-pptx のプロパティを1つずつ設定するより、XMLの操作がずっと少ない。
+    """
+
+    def __init__(self):
+        self._paragraphs = {}
+        self._backgrounds = {}
+        self._shapes = {}
+
+    def paragraph(
+        self,
+        text: str,
+        font_name: str,
+        font_size,
+        color: RGBColor,
+        bold: bool = None,
+        align=None,
+        spacing: tuple = None
+    ):
+        """テキスト1段落分の a:p 要素"""
+        key = (font_name, font_size, str(color), bold, align, spacing)
+        template = self._paragraphs.get(key)
+        if template is None:
+            template = self._paragraphs[key] = self._build_paragraph(*key)
+        p = copy.deepcopy(template)
+        p.r_lst[0].text = text
+        return p
+
+    def _build_paragraph(self, font_name, font_size, color, bold, align, spacing):
+        """段落のXMLを組み立てる"""
+        # 配置も段落間隔もなければ a:pPr は付けない
+        ppr = ""
+        if align is not None or spacing:
+            algn = f' algn="{PP_ALIGN.to_xml(align)}"' if align is not None else ""
+            spacing_xml = ""
+            if spacing:
+                before, after = spacing
+                spacing_xml = (
+                    f'<a:spcBef><a:spcPts val="{before.centipoints}"/></a:spcBef>'
+                    f'<a:spcAft><a:spcPts val="{after.centipoints}"/></a:spcAft>'
+                )
+            ppr = f"<a:pPr{algn}>{spacing_xml}</a:pPr>"
+        b = "" if bold is None else f' b="{int(bold)}"'
+        typeface = quoteattr(font_name)
+        return parse_xml(
+            f'<a:p {nsdecls("a")}>{ppr}'
+            f'<a:r><a:rPr sz="{font_size.centipoints}"{b}>'
+            f'<a:solidFill><a:srgbClr val="{color}"/></a:solidFill>'
+            f'<a:latin typeface={typeface}/><a:ea typeface={typeface}/>'
+            f'</a:rPr><a:t/></a:r></a:p>'
+        )
+
+    def background(self, color: RGBColor):
+        """単色背景の p:bg 要素"""
+        key = str(color)
+        template = self._backgrounds.get(key)
+        if template is None:
+            template = self._backgrounds[key] = parse_xml(
+                f'<p:bg {nsdecls("a", "p")}><p:bgPr>'
+                f'<a:solidFill><a:srgbClr val="{color}"/></a:solidFill>'
+                f'<a:effectLst/></p:bgPr></p:bg>'
+            )
+        return copy.deepcopy(template)
+
+    def clone_shape(self, key: str, slide, build):
+        """
+        key の図形を slide に追加（最初の1回だけ build(slide) で作り、以降は複製）
+        """
+        template = self._shapes.get(key)
+        if template is None:
+            shape = build(slide)
+            self._shapes[key] = copy.deepcopy(shape._element)
+            return shape._element
+
+        sp = copy.deepcopy(template)
+        shape_id = slide.shapes._next_shape_id
+        sp.nvSpPr.cNvPr.id = shape_id
+        sp.nvSpPr.cNvPr.name = f"{key} {shape_id - 1}"
+        slide.shapes._spTree.insert_element_before(sp, "p:extLst")
+        return sp
 
 
 class PowerPointRenderer:
@@ -54,6 +145,21 @@ class PowerPointRenderer:
         self.heading_size = Pt(fonts.get("heading", {}).get("size", 32))
         self.body_size = Pt(fonts.get("body", {}).get("size", 20))
         self.title_slide_size = Pt(fonts.get("title_slide", {}).get("size", 44))
+        self.section_title_size = Pt(40)
+        self.subtitle_size = Pt(24)
+        self.section_subtitle_color = RGBColor(0xCC, 0xCC, 0xCC)
+        self.paragraph_spacing = (Pt(8), Pt(4))
+
+        # 配置
+        decorations = theme.get("decorations", {})
+        self.accent_line_enabled = decorations.get("accent_line", {}).get("enabled", True)
+        self.accent_line_height = Inches(0.08)
+        self.image_width = Inches(8)
+        self.image_left = (self.slide_width - self.image_width) / 2
+
+        self.style = PreparedStyle()
+        # スライドのキー → (レイアウト番号, 描画済みの p:cSld)。同じインスタンスで描画し直すときに使う
+        self.slide_parts = {}
 
     def _parse_color(self, color_str: str) -> RGBColor:
         """カラー文字列をRGBColorに変換"""
@@ -89,21 +195,35 @@ class PowerPointRenderer:
                         for run in paragraph.runs:
                             self._set_japanese_font(run, self.heading_font)
 
-    def render(self, data: dict, output_path: str):
-        """プレゼンテーションを生成"""
+    def render(self, data: dict, output_path: str, slide_keys: list = None):
+        """
+        プレゼンテーションを生成
+
+        slide_keys（build_cache.slide_keys）を渡すと、前回の描画と同じキーのスライドは
+        描画済みのXMLを複製して作る（画像・ノートのないスライドのみ）
+        """
         prs = Presentation()
         prs.slide_width = self.slide_width
         prs.slide_height = self.slide_height
 
+        # slides はリストのほか、MarkdownParser.iter_slides などのイテレータでもよい
         slides_data = data.get("slides", [])
         assets = data.get("assets", {})
+        total = len(slides_data) if hasattr(slides_data, "__len__") else "?"
 
-        print(f"生成開始: {len(slides_data)}枚のスライド")
+        print(f"生成開始: {total}枚のスライド")
 
+        reused = 0
+        parts = {}
         for i, slide_data in enumerate(slides_data, 1):
             layout = slide_data.get("layout", "content")
+            key = slide_keys[i - 1] if slide_keys else None
+            part = self.slide_parts.get(key) if key else None
 
-            if layout == "title":
+            if part is not None:
+                self._add_cached_slide(prs, part)
+                reused += 1
+            elif layout == "title":
                 self._create_title_slide(prs, slide_data, assets)
             elif layout == "section":
                 self._create_section_slide(prs, slide_data, assets)
@@ -114,19 +234,42 @@ class PowerPointRenderer:
             else:
                 self._create_content_slide(prs, slide_data, assets)
 
+            if key:
+                parts[key] = part or self._slide_part(prs, prs.slides[-1])
+
             if i % 20 == 0:
-                print(f"  {i}/{len(slides_data)} 完了...")
+                print(f"  {i}/{total} 完了...")
 
         prs.save(output_path)
         print(f"\n生成完了: {output_path}")
         print(f"総スライド数: {len(prs.slides)}")
+        if slide_keys:
+            # 今回のデッキにあるスライドだけを残す
+            self.slide_parts = {key: part for key, part in parts.items() if part is not None}
 
         return {
             "output_path": output_path,
             "slide_count": len(prs.slides),
+            "reused_slides": reused,
             "processing_log": self.processing_log
         }
 
+    def _slide_part(self, prs, slide):
+        """再利用できるスライドなら (レイアウト番号, p:cSld の複製)。画像・ノートがあればNone"""
+        if any(rel.reltype != RT.SLIDE_LAYOUT for rel in slide.part.rels.values()):
+            return None
+        return prs.slide_layouts.index(slide.slide_layout), copy.deepcopy(slide._element.cSld)
+
+    def _add_cached_slide(self, prs, part):
+        """描画済みの p:cSld を複製してスライドを追加"""
+        layout_index, cSld = part
+        # prs.slides.add_slide はレイアウトのプレースホルダーを複製するが、
+        # すぐに置き換えるので、スライドのパートだけを追加する
+        rId, slide = prs.part.add_slide(prs.slide_layouts[layout_index])
+        prs.slides._sldIdLst.add_sldId(rId)
+        slide._element.replace(slide._element.cSld, copy.deepcopy(cSld))
+        return slide
+
     def _create_title_slide(self, prs, slide_data: dict, assets: dict):
         """タイトルスライドを作成（レイアウト0: タイトルスライド）"""
         slide_layout = prs.slide_layouts[self.LAYOUT_TITLE]
@@ -153,7 +296,8 @@ class PowerPointRenderer:
                     if elem["type"] == "subtitle" or elem["type"] == "text":
                         self._set_text_with_font(
                             shape, elem["content"],
-                            self.body_font, Pt(24), self.text_secondary, align=PP_ALIGN.CENTER
+                            self.body_font, self.subtitle_size, self.text_secondary,
+                            align=PP_ALIGN.CENTER
                         )
                         break
 
@@ -175,7 +319,7 @@ class PowerPointRenderer:
                 if elem["type"] == "title":
                     self._set_text_with_font(
                         title_shape, elem["content"],
-                        self.heading_font, Pt(40), self.text_light, bold=True
+                        self.heading_font, self.section_title_size, self.text_light, bold=True
                     )
                     break
 
@@ -186,7 +330,8 @@ class PowerPointRenderer:
                     if elem["type"] == "subtitle" or elem["type"] == "text":
                         self._set_text_with_font(
                             shape, elem["content"],
-                            self.body_font, Pt(24), RGBColor(0xCC, 0xCC, 0xCC), align=PP_ALIGN.CENTER
+                            self.body_font, self.subtitle_size, self.section_subtitle_color,
+                            align=PP_ALIGN.CENTER
                         )
                         break
 
@@ -223,48 +368,20 @@ class PowerPointRenderer:
                 break
 
         if body_shape:
-            tf = body_shape.text_frame
-            tf.clear()
-            first_para = True
-
+            body_texts = []
             for elem in slide_data.get("elements", []):
                 if elem["type"] == "bullet_list":
-                    for item in elem["content"]:
-                        if first_para:
-                            p = tf.paragraphs[0]
-                            first_para = False
-                        else:
-                            p = tf.add_paragraph()
-                        p.level = 0
-                        # 明示的にrunを作成してフォントを設定
-                        run = p.add_run()
-                        run.text = item
-                        self._set_japanese_font(run, self.body_font)
-                        run.font.size = self.body_size
-                        run.font.color.rgb = self.text_color
-                        p.space_before = Pt(8)
-                        p.space_after = Pt(4)
-
-                elif elem["type"] == "text" and elem["type"] != "title":
-                    if first_para:
-                        p = tf.paragraphs[0]
-                        first_para = False
-                    else:
-                        p = tf.add_paragraph()
-                    p.level = 0
-                    # 明示的にrunを作成してフォントを設定
-                    run = p.add_run()
-                    run.text = elem["content"]
-                    self._set_japanese_font(run, self.body_font)
-                    run.font.size = self.body_size
-                    run.font.color.rgb = self.text_color
-                    p.space_before = Pt(8)
-                    p.space_after = Pt(4)
+                    body_texts.extend(elem["content"])
+
+                elif elem["type"] == "text":
+                    body_texts.append(elem["content"])
 
                 elif elem["type"] == "diagram" or elem["type"] == "image":
                     # 画像は本文の下に追加
                     self._add_image_to_slide(slide, elem, assets)
 
+            self._fill_body_paragraphs(body_shape, body_texts)
+
         if slide_data.get("notes"):
             slide.notes_slide.notes_text_frame.text = slide_data["notes"]
 
@@ -344,37 +461,52 @@ class PowerPointRenderer:
 
     def _set_slide_background(self, slide, color: RGBColor):
         """スライドの背景色を設定"""
-        background = slide.background
-        fill = background.fill
-        fill.solid()
-        fill.fore_color.rgb = color
+        cSld = slide._element.cSld
+        if cSld.bg is not None:
+            cSld.remove(cSld.bg)
+        cSld.insert(0, self.style.background(color))
 
     def _add_accent_line(self, slide):
         """上部アクセントラインを追加"""
-        decorations = self.theme.get("decorations", {})
-        if not decorations.get("accent_line", {}).get("enabled", True):
+        if not self.accent_line_enabled:
             return
 
-        accent_line = slide.shapes.add_shape(
-            MSO_SHAPE.RECTANGLE, 0, 0, self.slide_width, Inches(0.08)
-        )
-        accent_line.fill.solid()
-        accent_line.fill.fore_color.rgb = self.primary
-        accent_line.line.fill.background()
+        def build(target):
+            accent_line = target.shapes.add_shape(
+                MSO_SHAPE.RECTANGLE, 0, 0, self.slide_width, self.accent_line_height
+            )
+            accent_line.fill.solid()
+            accent_line.fill.fore_color.rgb = self.primary
+            accent_line.line.fill.background()
+            return accent_line
+
+        self.style.clone_shape("Rectangle", slide, build)
+
+    def _replace_paragraphs(self, shape, paragraphs: list):
+        """テキストフレームの段落を置き換える（空なら空の段落を1つ残す）"""
+        txBody = shape.text_frame._txBody
+        for p in txBody.p_lst:
+            txBody.remove(p)
+        for p in paragraphs:
+            txBody.append(p)
+        if not paragraphs:
+            txBody.add_p()
+
+    def _fill_body_paragraphs(self, shape, texts: list):
+        """本文の段落を設定"""
+        self._replace_paragraphs(shape, [
+            self.style.paragraph(
+                text, self.body_font, self.body_size, self.text_color,
+                spacing=self.paragraph_spacing
+            )
+            for text in texts
+        ])
 
     def _set_text_with_font(self, shape, text: str, font_name: str, font_size, color, bold: bool = False, align=None):
         """テキストを設定し、明示的にフォントを適用"""
-        tf = shape.text_frame
-        tf.clear()
-        p = tf.paragraphs[0]
-        if align:
-            p.alignment = align
-        run = p.add_run()
-        run.text = text
-        self._set_japanese_font(run, font_name)
-        run.font.size = font_size
-        run.font.bold = bold
-        run.font.color.rgb = color
+        self._replace_paragraphs(shape, [
+            self.style.paragraph(text, font_name, font_size, color, bold=bold, align=align)
+        ])
 
     def _format_title_placeholder(self, shape, font_size, color):
         """タイトルプレースホルダーのフォーマット（後方互換用）"""
@@ -412,22 +544,7 @@ class PowerPointRenderer:
 
     def _fill_content_placeholder(self, shape, items):
         """コンテンツプレースホルダーを埋める（明示的にフォント設定）"""
-        tf = shape.text_frame
-        tf.clear()
-        for i, item in enumerate(items):
-            if i == 0:
-                p = tf.paragraphs[0]
-            else:
-                p = tf.add_paragraph()
-            p.level = 0
-            # 明示的にrunを作成してフォントを設定
-            run = p.add_run()
-            run.text = item
-            self._set_japanese_font(run, self.body_font)
-            run.font.size = self.body_size
-            run.font.color.rgb = self.text_color
-            p.space_before = Pt(8)
-            p.space_after = Pt(4)
+        self._fill_body_paragraphs(shape, items)
 
     def _add_image_to_slide(self, slide, elem, assets, y_offset=Inches(2.0)):
         """スライドに画像を追加"""
@@ -455,14 +572,12 @@ class PowerPointRenderer:
             full_path = self.project_root / image_path
             if full_path.exists():
                 # 中央配置
-                img_width = Inches(8)
-                img_left = (self.slide_width - img_width) / 2
                 try:
                     slide.shapes.add_picture(
                         str(full_path),
-                        img_left,
+                        self.image_left,
                         y_offset,
-                        width=img_width
+                        width=self.image_width
                     )
                 except Exception as e:
                     print(f"  警告: 画像追加失敗 {asset_ref}: {e}")
@@ -481,19 +596,83 @@ def render_presentation(json_path: str, output_path: str, theme: dict, project_r
     return renderer.render(data, output_path)
 
 
+def benchmark_render(slide_count: int, theme: dict, repeat: int = 3) -> dict:
+    """合成したデッキをレンダリングして1秒あたりのスライド数を計測"""
+    import tempfile
+    import time
+    from contextlib import redirect_stdout
+    from io import StringIO
+
+    from asset_generator import render_mermaid_stub
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        render_mermaid_stub("graph TD\n  A --> B", Path(temp_dir) / "assets/diagrams/diagram_001.png")
+        slides = [{"layout": "title", "elements": [
+            {"type": "title", "content": "ベンチマーク用デッキ"},
+            {"type": "text", "content": "サブタイトル"}
+        ]}]
+        for i in range(1, slide_count):
+            if i % 20 == 0:
+                slides.append({"layout": "section", "elements": [
+                    {"type": "title", "content": f"第{i // 20}章"}
+                ]})
+                continue
+            elements = [
+                {"type": "title", "content": f"スライド {i}: ゲームAIの設計"},
+                {"type": "text", "content": "AIは能力ではなく増幅器である。"},
+                {"type": "bullet_list", "content": [f"項目 {i}-{n}" for n in range(5)]}
+            ]
+            if i % 10 == 0:
+                elements.append({"type": "diagram", "asset_ref": "diagram_001"})
+            slides.append({"layout": "content", "elements": elements})
+        data = {
+            "slides": slides,
+            "assets": {"diagrams": [{
+                "id": "diagram_001",
+                "output_path": "assets/diagrams/diagram_001.png"
+            }], "images": []}
+        }
+
+        times = []
+        for n in range(repeat):
+            renderer = PowerPointRenderer(theme, temp_dir)
+            start = time.perf_counter()
+            with redirect_stdout(StringIO()):
+                renderer.render(data, str(Path(temp_dir) / f"bench_{n}.pptx"))
+            times.append(time.perf_counter() - start)
+
+    best = min(times)
+    return {"slides": slide_count, "seconds": best, "slides_per_second": slide_count / best}
+
+
 if __name__ == "__main__":
     import argparse
 
     arg_parser = argparse.ArgumentParser(description="PowerPoint Renderer")
-    arg_parser.add_argument("--input", "-i", required=True, help="入力JSONファイル")
-    arg_parser.add_argument("--output", "-o", required=True, help="出力PowerPointファイル")
-    arg_parser.add_argument("--theme", "-t", required=True, help="テーマYAMLファイル")
+    arg_parser.add_argument("--input", "-i", help="入力JSONファイル")
+    arg_parser.add_argument("--output", "-o", help="出力PowerPointファイル")
+    arg_parser.add_argument("--theme", "-t", help="テーマYAMLファイル")
     arg_parser.add_argument("--project", "-p", default=".", help="プロジェクトルート")
+    arg_parser.add_argument(
+        "--benchmark", type=int, metavar="N",
+        help="N枚の合成デッキのレンダリング速度（枚/秒）を計測"
+    )
 
     args = arg_parser.parse_args()
 
     import yaml
-    with open(args.theme, "r", encoding="utf-8") as f:
-        theme = yaml.safe_load(f)
+    theme = {}
+    if args.theme:
+        with open(args.theme, "r", encoding="utf-8") as f:
+            theme = yaml.safe_load(f)
+
+    if args.benchmark:
+        result = benchmark_render(args.benchmark, theme)
+        print(f"{result['slides']}枚: {result['seconds']:.2f}s "
+              f"({result['slides_per_second']:.0f} 枚/秒)")
+        raise SystemExit(0)
+
+    if not (args.input and args.output and args.theme):
+        arg_parser.error("--input, --output, --theme を指定してください")
 
     render_presentation(args.input, args.output, theme, args.project)